@@ -10,27 +10,17 @@ if page == "Data Preprocess and Analysis":
 
     import pandas as pd
     import numpy as np
-    import time
     import os
     import re
-    import string
     import unicodedata
     import nltk
-    from nltk.corpus import stopwords
-    from nltk.stem import WordNetLemmatizer
-    from nltk.sentiment import SentimentIntensityAnalyzer
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.cluster import KMeans
     import plotly.express as px
     import plotly.graph_objects as go
-    from wordcloud import WordCloud
     import matplotlib.pyplot as plt
     from dotenv import load_dotenv
     from newsapi import NewsApiClient
     import boto3
-    from transformers import pipeline
 
-    import nltk
     from nltk.data import find
 
     def download_nltk_data():
@@ -48,70 +38,81 @@ if page == "Data Preprocess and Analysis":
 
     load_dotenv()
 
+    from senticonomy import config, storage
+    from senticonomy.config import QUERY_KEYWORDS
+    from senticonomy.ingestion import collect_rows, fetch_news
+    from senticonomy.link_index import LinkIndex, append_new_articles
+    from senticonomy.model_store import ModelStore
+    from senticonomy.bundle import BundleStore, enrich
+    from senticonomy.cascade import configured_threshold
+    from senticonomy.near_duplicates import NearDuplicateIndex, drop_near_duplicates
+    from senticonomy.parallel import polarity_parallel, preprocess_parallel
+    from senticonomy.rollups import rollup_store
+    from senticonomy.preprocessing import PREPROCESS_VERSION
+    from senticonomy.query_planner import plan_queries, summarize
+    from senticonomy.response_cache import ResponseCache
+    from senticonomy.text_cache import cached_apply, shared_cache
+
     if st.button("\U0001F680 Preprocess and Upload News Data"):
         try:
             st.info("Initializing API and environment variables...")
             newsapi = NewsApiClient(api_key=os.getenv("API_KEY"))
+            response_cache = ResponseCache()
             s3_client = boto3.client('s3', aws_access_key_id=os.getenv('AWS_access_key'), aws_secret_access_key=os.getenv('AWS_secret_key'))
 
-            s3_client.download_file('projectsenticonomy', 'updated_news.csv', 'updated_news.csv')
-            master_file = 'updated_news.csv'
-            st.success("Downloaded existing news data from AWS S3.")
-
-
-            if os.path.exists(master_file):
-                existing_news = pd.read_csv(master_file)
-            else:
-                existing_news = pd.DataFrame(columns=['link', 'headline', 'category', 'short_description', 'authors', 'date'])
-
-            query_keywords = {
-                'TECH': ['technology', 'tech news', 'gadgets', 'AI'],
-                'SPORTS': ['sports', 'football', 'cricket', 'NBA'],
-                'ENTERTAINMENT': ['movies', 'celebrity', 'music', 'entertainment'],
-                'POLITICS': ['politics', 'government', 'elections'],
-                'EDUCATION': ['education', 'students', 'schools', 'university'],
-                'ENVIRONMENT': ['climate change', 'environment', 'pollution'],
-                'SCIENCE': ['science', 'research', 'NASA', 'discovery'],
-                'CRIME': ['crime', 'murder', 'theft', 'arrest'],
-                'BUSINESS': ['business', 'finance', 'stocks', 'economy'],
-                'TRAVEL': ['travel', 'tourism', 'vacation', 'flights'],
-                'STYLE & BEAUTY': ['fashion', 'style', 'makeup', 'beauty']
-            }
-
-            news_data = []
-
-            for category, keywords in query_keywords.items():
-                for keyword in keywords:
-                    try:
-                        articles = newsapi.get_everything(q=keyword, language='en', sort_by='publishedAt', page_size=20)
-                        for article in articles.get('articles', []):
-                            news_data.append({
-                                'link': article['url'],
-                                'headline': article['title'],
-                                'category': category,
-                                'short_description': article['description'],
-                                'authors': article.get('author', 'Unknown'),
-                                'date': article['publishedAt']
-                            })
-                    except Exception as e:
-                        print(f"Error fetching keyword '{keyword}' for {category}: {e}")
-                    time.sleep(1.5)
-
+            # Persistent index of stored links; the S3 copies are only needed to seed it on a new host
+            # (legacy CSV files are migrated to partitioned Parquet once)
+            link_index = LinkIndex()
+            if link_index.is_empty():
+                for dataset in (storage.MASTER_DATASET, storage.CLEANED_DATASET):
+                    storage.download_dataset(s3_client, 'projectsenticonomy', dataset)
+                    if not storage.exists(dataset):
+                        s3_client.download_file('projectsenticonomy', f"{dataset}.csv", f"{dataset}.csv")
+                        storage.ensure_dataset(dataset, f"{dataset}.csv")
+                link_index.bootstrap()
+                st.success("Downloaded existing news data from AWS S3.")
+
+            query_keywords = QUERY_KEYWORDS
+
+            # Plan one paginated OR-query per category, then fetch them concurrently behind the API rate limiter
+            queries = plan_queries(query_keywords, since=link_index.latest_published())
+            fetch_progress = st.progress(0.0, text="Fetching news...")
+            results = []
+            fetched = 0
+            for result in fetch_news(newsapi.get_everything, queries, seen=link_index, cache=response_cache):
+                if result.error is not None:
+                    print(f"Error fetching keyword '{result.query.q}' for {result.query.category}: {result.error}")
+                results.append(result)
+                fetched += len(result.articles)
+                fetch_progress.progress(len(results) / len(queries),
+                                        text=f"Fetched {fetched} articles ({len(results)}/{len(queries)} queries)")
+            news_data = collect_rows(results)
+            plan_report = summarize(results, link_index, query_keywords)
+            st.info(f"{plan_report.calls} API calls instead of {plan_report.baseline_calls} "
+                    f"({plan_report.calls_saved} saved); {plan_report.new} new and {plan_report.duplicates} duplicate articles "
+                    f"(at most {plan_report.duplicates_saved} fewer duplicates than one call per keyword).")
+            cache_stats = response_cache.stats()
+            st.info(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries on disk).")
+
+            # Append only the articles whose link has never been stored; downstream stages get just this delta
             new_news_df = pd.DataFrame(news_data)
-            combined_news = pd.concat([existing_news, new_news_df], ignore_index=True)
-            combined_news.drop_duplicates(subset='link', keep='last', inplace=True)
-            combined_news['category'] = combined_news['category'].str.upper()
-            combined_news.to_csv(master_file, index=False)
+            new_news = append_new_articles(new_news_df, link_index)
+            # Upload the delta straight away: the link index already records these links, so a failure later in
+            # the run must not leave them only on this host
+            storage.upload_dataset(s3_client, 'projectsenticonomy', storage.MASTER_DATASET)
+            st.info(f"{len(new_news)} new articles appended to the {storage.MASTER_DATASET} dataset.")
 
             filtered_categories = list(query_keywords.keys())
-            filtered_news = combined_news[combined_news['category'].isin(filtered_categories)]
+            filtered_news = new_news[new_news['category'].isin(filtered_categories)]
             filtered_file = 'test_data.csv'
             filtered_news.to_csv(filtered_file, index=False)
             st.success("News fetched and saved locally.")
 
             st.info("Uploading raw data to AWS S3...")
             s3_client = boto3.client('s3', aws_access_key_id=os.getenv('AWS_access_key'), aws_secret_access_key=os.getenv('AWS_secret_key'))
-            s3_client.upload_file(filtered_file, 'projectsenticonomy', 'raw_news_data.csv')
+            batch_key = f"raw_news_data/{pd.Timestamp.now(tz='UTC').strftime('%Y%m%dT%H%M%S')}.csv"
+            s3_client.upload_file(filtered_file, 'projectsenticonomy', batch_key)
             st.success("raw_news_data Uploaded to AWS S3.")
 
             st.info("🧼 Cleaning data...")
@@ -147,16 +148,46 @@ if page == "Data Preprocess and Analysis":
                 return text
 
             df['short_description'] = df['short_description'].apply(clean_unicode)
-            
-            # Save cleaned data
-            # Save cleaned data
-            cleaned_filename = "Cleaned_News_DataSet.csv"
-            df.to_csv(cleaned_filename, index=False)
 
-            st.info("Uploading cleaned data to AWS S3...")
-            s3_client = boto3.client('s3', aws_access_key_id=os.getenv('AWS_access_key'), aws_secret_access_key=os.getenv('AWS_secret_key'))
-            s3_client.upload_file(cleaned_filename, 'projectsenticonomy', 'Cleaned_News_DataSet.csv')
-            st.success("Uploaded to AWS S3.")
+            # Collapse near-duplicate wire copies, within the batch and against everything already cleaned
+            near_dup_index = NearDuplicateIndex()
+            if near_dup_index.is_empty():
+                near_dup_index.bootstrap()
+            df, near_dup_report = drop_near_duplicates(df, near_dup_index)
+            seconds_saved = near_dup_report.seconds_saved(shared_cache('preprocess', PREPROCESS_VERSION).seconds_per_entry())
+            st.info(f"Near-duplicates: {near_dup_report.collapsed} of {near_dup_report.rows} rows collapsed "
+                    f"({near_dup_report.within_batch} within the batch, {near_dup_report.of_stored} already stored), "
+                    f"~{seconds_saved:.2f}s of preprocessing saved.")
+            
+            # Append the cleaned delta and upload it before the model, sentiment and bundle stages
+            storage.write_dataset(df, storage.CLEANED_DATASET)
+            storage.upload_dataset(s3_client, 'projectsenticonomy', storage.CLEANED_DATASET)
+            st.success("Cleaned data uploaded to AWS S3.")
+
+            descriptions = df['short_description'].astype(str)
+            cleaned = cached_apply(descriptions, preprocess_parallel, shared_cache('preprocess', PREPROCESS_VERSION))
+
+            # Fold the new articles into the current cluster model (cluster IDs stay stable)
+            if config.CLUSTER_UPDATE_MODE == 'streaming' and not df.empty:
+                cluster_model = ModelStore().update(cleaned, df['category'], articles=df)
+                if cluster_model is not None:
+                    st.info(f"Cluster model updated with {len(df)} articles (version {cluster_model.version}).")
+
+            # Fold their sentiment into the dashboard rollups (scoring also warms the dashboard's score caches)
+            rollup_model = ModelStore().load()
+            if rollup_model is not None and not df.empty:
+                threshold = configured_threshold()
+                enriched, features = enrich(df.assign(short_description_clean=cleaned.to_numpy()), rollup_model,
+                                            threshold, vader_compute=polarity_parallel)
+                if rollup_store().add(enriched['date'], enriched['category'], enriched['cluster'],
+                                          enriched['sentiment_score'], rollup_model.version, threshold,
+                                          parent=rollup_model.metadata.get('parent')):
+                    st.info(f"Sentiment rollups updated with {len(df)} articles.")
+                # Publish the current artifact bundle extended with them; dashboard workers attach on their next rerun
+                bundle = BundleStore().append(enriched, features, rollup_model, threshold,
+                                              start=storage.date_range(config.DASHBOARD_DAYS)[0])
+                if bundle is not None:
+                    st.info(f"Artifact bundle {bundle.version} published ({bundle.manifest['rows']} articles).")
 
         except Exception as e:
             st.error(f"❌ Error during preprocessing: {e}")
@@ -167,23 +198,16 @@ elif page == "Web Application":
     import os
     import pandas as pd
     import re
-    import string
+    import uuid
     import nltk
     import streamlit as st
-    from nltk.corpus import stopwords
-    from nltk.stem import WordNetLemmatizer
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.cluster import KMeans
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
     import plotly.graph_objects as go
     import sqlalchemy as sa
-    from sqlalchemy import create_engine, text
+    from sqlalchemy import text
     from dotenv import load_dotenv
     import boto3
-    from transformers import pipeline
 
 
-    import nltk
     from nltk.data import find
 
     def download_nltk_data():
@@ -198,71 +222,123 @@ elif page == "Web Application":
             nltk.download('wordnet')
 
     download_nltk_data()
+    load_dotenv()
 
-
-    # Stopwords and lemmatizer
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-
-    # Text preprocessing function
-    def preprocess_text(text):
-        text = text.lower()
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        text = re.sub(r'<.*?>', '', text)
-        text = re.sub(r'[%s]' % re.escape(string.punctuation), '', text)
-        text = re.sub(r'\d+', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        tokens = text.split()
-        cleaned_tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words]
-        return ' '.join(cleaned_tokens)
-
-    # Load data and preprocess
-    @st.cache_data
+    from senticonomy import config, storage
+    from senticonomy.k_selection import recommended_k
+    from senticonomy.model_store import ModelStore
+    from senticonomy.out_of_core import dataset_chunks
+    from senticonomy.parallel import polarity_parallel, preprocess_parallel
+    from senticonomy.preprocessing import PREPROCESS_VERSION, preprocess_text
+    from senticonomy.cascade import cascade_scores, configured_threshold
+    from senticonomy.rollups import rollup_store
+    from senticonomy.sentiment import score_text
+    from senticonomy.bundle import BundleStore, build as build_bundle
+    from senticonomy.charts import PayloadReport, box_figure, box_summary, downsample, grid_bins
+    from senticonomy.timeseries import long_format
+    from senticonomy.text_cache import cached_apply, shared_cache
+
+    # Load data and preprocess (not cached itself: the artifact bundle keeps the only long-lived copy)
     def load_data():
         s3_client = boto3.client('s3', aws_access_key_id=os.getenv('AWS_access_key'), aws_secret_access_key=os.getenv('AWS_secret_key'))
-        s3_client.download_file('projectsenticonomy', 'Cleaned_News_DataSet.csv', 'preprocessed.csv')
-        df = pd.read_csv("preprocessed.csv", encoding='utf-8')
+        storage.download_dataset(s3_client, 'projectsenticonomy', storage.CLEANED_DATASET)
+        # Deployments that have not uploaded Parquet yet still keep the legacy CSV in S3
+        if not storage.exists(storage.CLEANED_DATASET):
+            legacy_csv = f"{storage.CLEANED_DATASET}.csv"
+            s3_client.download_file('projectsenticonomy', legacy_csv, legacy_csv)
+            storage.ensure_dataset(storage.CLEANED_DATASET, legacy_csv)
+        # Partitioned Parquet: read only the configured columns and date range
+        start, end = storage.date_range(config.DASHBOARD_DAYS)
+        df = storage.read_dataset(storage.CLEANED_DATASET, columns=config.DASHBOARD_COLUMNS, start=start, end=end)
         df.drop_duplicates(subset='short_description', inplace=True)
         df.dropna(subset=['short_description'], inplace=True)
-        df['short_description_clean'] = df['short_description'].astype(str).apply(preprocess_text)
-        return df
-
-    df = load_data()
-
-    # Compute clusters
+        # Only descriptions never seen by this version of the preprocessing rules are lemmatized, on all cores
+        preprocess_cache = shared_cache('preprocess', PREPROCESS_VERSION)
+        before = preprocess_cache.stats()
+        df['short_description_clean'] = cached_apply(df['short_description'].astype(str), preprocess_parallel, preprocess_cache)
+        return df, preprocess_cache.stats(since=before)
+
+    def retrain_clusters(model_store):
+        # Hashed features stream the whole archive from disk; TF-IDF fits on the loaded frame
+        if config.CLUSTER_FEATURES == 'hashing':
+            return model_store.retrain_out_of_core(dataset_chunks())
+        data, _ = load_data()
+        return model_store.retrain(data['short_description_clean'], data['category'], articles=data)
+
+    # Load the current clustering model (reloaded when ingestion or a retrain switches versions);
+    # it is only fitted when no version has been stored yet
+    @st.cache_resource
+    def load_cluster_model(version):
+        model_store = ModelStore()
+        model = model_store.load(version)
+        if model is None:
+            model = retrain_clusters(model_store)
+        return model
+
+    # Enriched articles come from the current artifact bundle (see senticonomy.bundle): read-only, memory-mapped
+    # and shared by every session and every worker process on the host. The first worker that finds no bundle for
+    # this cluster model version and cascade threshold builds one: clusters, then sentiment scores (VADER on every
+    # description, only those missing from the score cache, on all cores; the transformer only on near-neutral
+    # ones, the 'model' column records which one scored each row). Workers attach to bundles published later
+    # (e.g. by ingestion) on their next rerun
+    @st.cache_resource(max_entries=1)
+    def load_bundle(bundle_version, model_version, threshold):
+        store = BundleStore()
+        bundle = store.load(bundle_version)
+        if bundle is None or not bundle.matches(model_version, threshold):
+            # One worker builds; workers starting at the same time wait for it and attach to its bundle
+            with store.lock():
+                bundle = store.load()
+                if bundle is None or not bundle.matches(model_version, threshold):
+                    data, preprocess_stats = load_data()
+                    bundle = build_bundle(data, load_cluster_model(model_version), threshold, store=store,
+                                          vader_compute=polarity_parallel, stats={'preprocess': preprocess_stats})
+        return bundle
+
+    cluster_model = load_cluster_model(ModelStore().current_version())
+    cascade_threshold = configured_threshold()
+    bundle = load_bundle(BundleStore().current_version(), cluster_model.version, cascade_threshold)
+    # A zero-copy view per rerun; session state only holds the current page and widget values
+    df = bundle.articles.frame()
+
+    # Map clusters to categories (stored with the model)
+    cluster_to_category = cluster_model.cluster_to_category
+
+    # Sentiment rollups behind the Sentiment Scores page: kept current by ingestion, reloaded from the bundle's
+    # cells only when they were built for another cluster model version or cascade threshold
     @st.cache_resource
-    def compute_clusters(data):
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-        X = vectorizer.fit_transform(data['short_description_clean'])
-        k = KMeans(n_clusters=11, random_state=0)
-        clusters = k.fit_predict(X)
-        return vectorizer, k, clusters
-
-    vectorizer, k, cluster_preds = compute_clusters(df)
-    df['cluster'] = cluster_preds
-
-    # Map clusters to categories
-    cluster_to_category = df.groupby('cluster')['category'].agg(lambda x: x.value_counts().index[0] if not x.empty else "Unknown").to_dict()
-
-    # Compute sentiment scores
-    @st.cache_data
-    def compute_sentiment(data):
-        analyzer = SentimentIntensityAnalyzer()
-        sentiments = data['short_description'].apply(lambda x: analyzer.polarity_scores(str(x)))
-        sentiment_df = pd.DataFrame(list(sentiments))
-        sentiment_df['sentiment_score'] = sentiment_df['compound']
-        data = pd.concat([data.reset_index(drop=True), sentiment_df.reset_index(drop=True)], axis=1)
-        return data
-
-    df = compute_sentiment(df)
-
-    # Derive 'category_cluster' field
-    if 'category_cluster' not in df.columns:
-        df['category_cluster'] = df['category'].astype(str) + "-" + df['cluster'].astype(str)
-
-    # Store data in session state
-    if 'df' not in st.session_state:
-        st.session_state['df'] = df
+    def load_rollups(model_version, threshold):
+        rollups = rollup_store()
+        if not rollups.is_current(model_version, threshold):
+            rollups.replace(bundle.cells(), model_version, threshold)
+        return rollups
+
+    rollups = load_rollups(cluster_model.version, cascade_threshold)
+    rollup_range = storage.date_range(config.DASHBOARD_DAYS)
+
+    def with_derived_columns(frame):
+        # The enriched columns of rows read from storage (those the full-data export always had, plus ``model``);
+        # cleaned text and scores come from the text caches for known articles
+        descriptions = frame['short_description'].fillna('').astype(str)
+        cleaned = cached_apply(descriptions, preprocess_parallel, shared_cache('preprocess', PREPROCESS_VERSION))
+        scores = cascade_scores(descriptions, cascade_threshold, vader_compute=polarity_parallel)
+        derived = frame.assign(short_description_clean=cleaned.to_numpy(),
+                               cluster=cluster_model.predict(cleaned) if len(frame) else [],
+                               **{column: scores[column].to_numpy() for column in scores.columns})
+        derived['category_cluster'] = derived['category'].astype(str) + "-" + derived['cluster'].astype(str)
+        return derived
+
+    def export_bytes(write):
+        # Exports are written to a temporary file by ``write(path)``; only the (compressed) file is read back
+        os.makedirs(config.EXPORT_DIR, exist_ok=True)
+        path = os.path.join(config.EXPORT_DIR, f"export-{uuid.uuid4().hex}")
+        try:
+            write(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
 
     # Web Interface
     st.markdown("<h1 style='text-align: center;'>\U0001F9E0 Senticonomy Clustering & Sentiment WebApp</h1>", unsafe_allow_html=True)
@@ -273,17 +349,52 @@ elif page == "Web Application":
     user_input = st.sidebar.text_area("Enter a short description to analyze:")
     if user_input:
         cleaned_input = preprocess_text(user_input)
-        user_vec = vectorizer.transform([cleaned_input])
-        cluster = k.predict(user_vec)[0]
+        cluster = cluster_model.predict([cleaned_input])[0]
         category = cluster_to_category.get(cluster, "Unknown")
-        analyzer = SentimentIntensityAnalyzer()
-        sentiment = analyzer.polarity_scores(user_input)
+        sentiment = score_text(user_input)
 
         st.sidebar.markdown(f"**Cluster:** {cluster}")
         st.sidebar.markdown(f"**Predicted Category:** {category}")
         st.sidebar.markdown("**Sentiment Scores:**")
         st.sidebar.json(sentiment)
 
+        # Most similar stored articles, from the index saved with the cluster model
+        if cluster_model.has_similarity_index:
+            similar = cluster_model.similar_articles(cleaned_input)
+            st.sidebar.markdown("**Similar Articles:**")
+            for _, article in similar.iterrows():
+                title = article.get('headline') or article.get('short_description')
+                link = article.get('link')
+                st.sidebar.markdown(f"- [{title}]({link}) ({article['similarity']:.2f})" if link else
+                                    f"- {title} ({article['similarity']:.2f})")
+
+    # Startup cache statistics (of the run that built the bundle)
+    with st.sidebar.expander("\u26A1 Startup cache"):
+        st.write(f"Artifact bundle {bundle.version}: {bundle.manifest['rows']} articles, "
+                 f"built {bundle.manifest['created']}")
+        for name, stats in (("Preprocessing", bundle.manifest['stats'].get('preprocess')),
+                            ("Sentiment", bundle.manifest['stats'].get('sentiment'))):
+            if stats:
+                st.write(f"{name}: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['hit_rate']:.0%} hit rate), ~{stats['seconds_saved']:.1f}s saved")
+        if 'memory' in bundle.manifest['stats']:
+            memory = bundle.manifest['stats']['memory']
+            st.write(f"Article frame: {memory['bytes_after'] / 2 ** 20:.0f} MB with compact column types "
+                     f"({memory['bytes_before'] / 2 ** 20:.0f} MB before)")
+        model_counts = df['model'].value_counts()
+        st.write(f"Sentiment cascade (|compound| < {cascade_threshold}): {model_counts.get('vader', 0)} VADER, "
+                 f"{model_counts.get('transformer', 0)} transformer scores")
+
+    # Explicit retrain: fit a new model version on the current data and switch to it
+    with st.sidebar.expander("\U0001F9E9 Cluster model"):
+        st.write(f"Version {cluster_model.version}: {cluster_model.metadata['n_clusters']} clusters, "
+                 f"{cluster_model.metadata['rows']} rows, fitted in {cluster_model.metadata['fit_seconds']:.1f}s")
+        # Retrains use the k recommended by `python -m senticonomy.k_selection` when its report exists
+        st.caption(f"Next retrain: k = {recommended_k()}")
+        if st.button("Retrain clusters"):
+            retrain_clusters(ModelStore())
+            st.rerun()
+
     # Upload to AWS RDS
     st.sidebar.subheader("\U0001F4BE Upload to RDS")
     if st.sidebar.button("Upload Data to RDS"):
@@ -316,36 +427,31 @@ elif page == "Web Application":
     import streamlit as st
     import matplotlib.pyplot as plt
     import numpy as np
-    from transformers import pipeline
+    from senticonomy.transformer_sentiment import score_corpus, sentiment_engine
     import plotly.express as px
-    import plotly.graph_objects as go
     import pandas as pd
 
-    # Sentiment analysis model from Hugging Face
-    # sentiment_analyzer = pipeline(
-    #     "sentiment-analysis",
-    #     model="distilbert/distilbert-base-uncased-finetuned-sst-2-english",
-    #     revision="714eb0f"
-    # )
+    # Transformer sentiment model: one process-wide engine, loaded on the first analysis
+    transformer_engine = sentiment_engine()
 
-    # # Sentiment analysis and return insights
-    # def analyze_sentiment(texts):
-    #     results = sentiment_analyzer(texts)
+    # Sentiment analysis and return insights
+    def analyze_sentiment(texts):
+        results = transformer_engine.predict(texts)
 
-    #     # Aggregate sentiment counts and collect confidence scores
-    #     sentiment_counts = {"POSITIVE": 0, "NEGATIVE": 0}
-    #     confidence_scores = {"POSITIVE": [], "NEGATIVE": []}
-    #     text_lengths = []
+        # Aggregate sentiment counts and collect confidence scores
+        sentiment_counts = {"POSITIVE": 0, "NEGATIVE": 0}
+        confidence_scores = {"POSITIVE": [], "NEGATIVE": []}
+        text_lengths = []
 
-    #     for result, text in zip(results, texts):
-    #         sentiment_counts[result['label']] += 1
-    #         confidence_scores[result['label']].append(result['score'])
-    #         text_lengths.append(len(text))
+        for result, text in zip(results, texts):
+            sentiment_counts[result['label']] += 1
+            confidence_scores[result['label']].append(result['score'])
+            text_lengths.append(len(text))
 
-    #     positive_confidence = np.mean(confidence_scores["POSITIVE"]) if sentiment_counts["POSITIVE"] > 0 else 0
-    #     negative_confidence = np.mean(confidence_scores["NEGATIVE"]) if sentiment_counts["NEGATIVE"] > 0 else 0
+        positive_confidence = np.mean(confidence_scores["POSITIVE"]) if sentiment_counts["POSITIVE"] > 0 else 0
+        negative_confidence = np.mean(confidence_scores["NEGATIVE"]) if sentiment_counts["NEGATIVE"] > 0 else 0
 
-    #     return sentiment_counts, confidence_scores, positive_confidence, negative_confidence, text_lengths, results
+        return sentiment_counts, confidence_scores, positive_confidence, negative_confidence, text_lengths, results
 
     # Initialize page view state
     if "page_view" not in st.session_state:
@@ -356,7 +462,7 @@ elif page == "Web Application":
 
     # Navigation buttons
     st.markdown("---")
-    cols = st.columns(4)
+    cols = st.columns(5)
     with cols[0]:
         if st.button("\U0001F3E0 Home"): set_page("Home")
     with cols[1]:
@@ -364,14 +470,13 @@ elif page == "Web Application":
     with cols[2]:
         if st.button("\U0001F52C Cluster Analysis"): set_page("Cluster Analysis")
     with cols[3]:
+        if st.button("\U0001F916 Sentiment Model"): set_page("Sentiment Model")
+    with cols[4]:
         if st.button("\U0001F4C1 Dataset"): set_page("Dataset")
     st.markdown("---")
 
     current = st.session_state.page_view
 
-    # Dummy check to load df if available
-    if 'df' in st.session_state:
-        df = st.session_state['df']
 
     # Home Page
     if current == "Home":
@@ -408,56 +513,68 @@ elif page == "Web Application":
         """, height=40)
 
     # Sentiment Model Page
-    # elif current == "Sentiment Model":
-    #     st.title("Interactive Sentiment Analysis and Visualization")
+    elif current == "Sentiment Model":
+        st.title("Interactive Sentiment Analysis and Visualization")
 
-    #     user_input = st.text_area("Enter your text for sentiment analysis (separate sentences by a newline):")
+        user_input = st.text_area("Enter your text for sentiment analysis (separate sentences by a newline):")
 
-    #     if st.button("Analyze Sentiment"):
-    #         if user_input:
-    #             texts = user_input.split("\n")
-    #             sentiment_counts, confidence_scores, positive_confidence, negative_confidence, text_lengths, results = analyze_sentiment(texts)
+        if st.button("Analyze Sentiment"):
+            if user_input:
+                texts = user_input.split("\n")
+                sentiment_counts, confidence_scores, positive_confidence, negative_confidence, text_lengths, results = analyze_sentiment(texts)
 
-    #             st.write("Sentiment Analysis Results")
-    #             for idx, result in enumerate(results):
-    #                 st.write(f"Text {idx + 1}: {texts[idx]}")
-    #                 st.write(f"Sentiment: {result['label']} with Confidence: {result['score']:.2f}")
+                st.write("Sentiment Analysis Results")
+                for idx, result in enumerate(results):
+                    st.write(f"Text {idx + 1}: {texts[idx]}")
+                    st.write(f"Sentiment: {result['label']} with Confidence: {result['score']:.2f}")
 
-    #             labels = list(sentiment_counts.keys())
-    #             sizes = list(sentiment_counts.values())
+                labels = list(sentiment_counts.keys())
+                sizes = list(sentiment_counts.values())
 
-    #             fig1, ax1 = plt.subplots(figsize=(5, 5))
-    #             ax1.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=['green', 'red'])
-    #             ax1.set_title("Sentiment Distribution")
-    #             st.pyplot(fig1)
+                fig1, ax1 = plt.subplots(figsize=(5, 5))
+                ax1.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=['green', 'red'])
+                ax1.set_title("Sentiment Distribution")
+                st.pyplot(fig1)
 
-    #             confidence_values = [positive_confidence, negative_confidence]
+                confidence_values = [positive_confidence, negative_confidence]
 
-    #             fig2, ax2 = plt.subplots(figsize=(6, 6))
-    #             ax2.bar(labels, confidence_values, color=['green', 'red'])
-    #             ax2.set_title("Average Confidence Scores for Sentiment")
-    #             ax2.set_xlabel("Sentiment")
-    #             ax2.set_ylabel("Average Confidence Score")
-    #             st.pyplot(fig2)
+                fig2, ax2 = plt.subplots(figsize=(6, 6))
+                ax2.bar(labels, confidence_values, color=['green', 'red'])
+                ax2.set_title("Average Confidence Scores for Sentiment")
+                ax2.set_xlabel("Sentiment")
+                ax2.set_ylabel("Average Confidence Score")
+                st.pyplot(fig2)
 
-    #             sentiments_numeric = [1 if result['label'] == 'POSITIVE' else 0 for result in results]
+                sentiments_numeric = [1 if result['label'] == 'POSITIVE' else 0 for result in results]
 
-    #             fig3, ax3 = plt.subplots(figsize=(5, 5))
-    #             ax3.scatter(text_lengths, sentiments_numeric, color=['green' if sentiment == 1 else 'red' for sentiment in sentiments_numeric])
-    #             ax3.set_title("Text Length vs Sentiment")
-    #             ax3.set_xlabel("Text Length")
-    #             ax3.set_ylabel("Sentiment (1: Positive, 0: Negative)")
-    #             st.pyplot(fig3)
+                fig3, ax3 = plt.subplots(figsize=(5, 5))
+                ax3.scatter(text_lengths, sentiments_numeric, color=['green' if sentiment == 1 else 'red' for sentiment in sentiments_numeric])
+                ax3.set_title("Text Length vs Sentiment")
+                ax3.set_xlabel("Text Length")
+                ax3.set_ylabel("Sentiment (1: Positive, 0: Negative)")
+                st.pyplot(fig3)
 
-    #         else:
-    #             st.warning("Please enter some text for analysis.")
+            else:
+                st.warning("Please enter some text for analysis.")
+
+        # Whole-corpus scoring: only articles missing from the transformer score cache run through the model
+        with st.expander(f"Score the cleaned corpus ({transformer_engine.backend} backend)"):
+            if st.button("Score corpus"):
+                progress = st.empty()
+                report = score_corpus(transformer_engine, progress=lambda rows: progress.text(f"{rows} rows processed"))
+                st.info(f"{report['rows']} rows: {report['cached']} cached, {report['scored']} scored at "
+                        f"{report['texts_per_second']:.0f} texts/s (model load {report['load_seconds']:.1f}s, "
+                        f"{report['seconds']:.1f}s total).")
 
     # Sentiment Scores Page
     elif current == "Sentiment Scores":
         st.subheader("📈 Sentiment Score Overview")
+        # Figures are reduced to the configured budgets before they are sent; their JSON size is reported below
+        payload = PayloadReport()
 
+        # Every chart reads the precomputed day x category x cluster rollups, not the article frame
         # 1. Diverging Bar Chart for Cluster Sentiment
-        sentiment_avg = df.groupby('cluster')['sentiment_score'].mean().reset_index()
+        sentiment_avg = rollups.rollup('cluster', *rollup_range)
         sentiment_avg['sentiment_type'] = sentiment_avg['sentiment_score'].apply(lambda x: 'Positive' if x > 0 else ('Negative' if x < 0 else 'Neutral'))
         sentiment_avg['color'] = sentiment_avg['sentiment_type'].map({'Positive': 'green', 'Negative': 'red', 'Neutral': 'gray'})
         st.markdown("### Diverging Sentiment Bar Chart by Cluster")
@@ -469,20 +586,32 @@ elif page == "Web Application":
             text=sentiment_avg['sentiment_score'].round(2),
             textposition='auto'))
         fig1.update_layout(title="Sentiment Score by Cluster", xaxis_title="Sentiment Score", yaxis_title="Cluster")
-        st.plotly_chart(fig1)
+        st.plotly_chart(payload.add("cluster bars", fig1))
 
-        # 2. Time Series Line Graph with Category Labels
-        if {'date', 'category'}.issubset(df.columns):
+        # 2. Time Series Line Graph with Category Labels, from the daily per-category series (volume-weighted)
+        series = rollups.series()
+        if series.days:
             st.markdown("### Sentiment Over Time by Category")
-            df['date'] = pd.to_datetime(df['date'])
-            time_sentiment = df.groupby(['date', 'category'])['sentiment_score'].mean().reset_index()
-            fig2 = px.line(time_sentiment, x='date', y='sentiment_score', color='category', markers=True,
+            smoothing = {("Daily mean" if window == 1 else f"{window}-day rolling mean"): window
+                         for window in config.TIMESERIES_WINDOWS}
+            smoothing[f"EWMA ({config.TIMESERIES_HALFLIFE:g}-day half-life)"] = None
+            window = smoothing[st.selectbox("Smoothing", list(smoothing))]
+            if window is None:
+                wide = series.ewma(config.TIMESERIES_HALFLIFE, *rollup_range)
+            else:
+                wide = series.rolling_mean(window, *rollup_range)
+                wide['ALL (volume-weighted)'] = series.composite(window, *rollup_range)
+            time_sentiment = long_format(wide).dropna()
+            plotted = downsample(time_sentiment, 'date', 'sentiment_score', config.CHART_POINT_BUDGET, group='category')
+            fig2 = px.line(plotted, x='date', y='sentiment_score', color='category', markers=True,
                         title='Average Sentiment Over Time by Category')
-            st.plotly_chart(fig2)
+            st.plotly_chart(payload.add("time series", fig2))
+            st.download_button("Download Series", data=time_sentiment.to_csv(index=False),
+                               file_name="Sentiment_Over_Time.csv")
 
         # 3. Radar Chart for Average Sentiment per Category
         st.markdown("### Radar Sentiment View by Category")
-        radar_df = df.groupby('category')['sentiment_score'].mean().reset_index()
+        radar_df = rollups.rollup('category', *rollup_range)
         fig_radar = go.Figure()
         fig_radar.add_trace(go.Scatterpolar(
             r=radar_df['sentiment_score'],
@@ -491,29 +620,34 @@ elif page == "Web Application":
             name='Category Sentiment'))
         fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[-1, 1])),
                                 title="Sentiment Radar by Category")
-        st.plotly_chart(fig_radar)
+        st.plotly_chart(payload.add("radar", fig_radar))
 
         # 4. Heatmap by Category and Cluster
         st.markdown("### Heatmap: Sentiment Score by Category and Cluster")
-        heatmap_data = df.groupby(['category', 'cluster'])['sentiment_score'].mean().unstack()
+        heatmap_data = rollups.rollup(['category', 'cluster'], *rollup_range).pivot(
+            index='category', columns='cluster', values='sentiment_score')
         fig3 = px.imshow(heatmap_data, text_auto=True, aspect="auto", color_continuous_scale='RdYlGn')
-        st.plotly_chart(fig3)
+        st.plotly_chart(payload.add("heatmap", fig3))
 
         # 5. Geographical Sentiment Map (if location exists)
         if {'lat', 'lon'}.issubset(df.columns):
             st.markdown("### Sentiment by Location")
-            map_data = df[['lat', 'lon', 'sentiment_score']]
-            fig4 = px.scatter_mapbox(map_data, lat="lat", lon="lon", color="sentiment_score",
+            # One point per grid cell (mean score, sized by article count) instead of one per article
+            map_data = grid_bins(df, 'lat', 'lon', 'sentiment_score', config.CHART_MAP_CELLS)
+            fig4 = px.scatter_mapbox(map_data, lat="lat", lon="lon", color="sentiment_score", size='count',
                                     color_continuous_scale='RdYlGn', zoom=3,
                                     mapbox_style="carto-positron", title="Geographical Sentiment Scores")
-            st.plotly_chart(fig4)
+            st.plotly_chart(payload.add("location map", fig4))
 
         # Optional: Filter and Show Detailed Sentiment
-        selected_cluster = st.selectbox("Select Cluster for Sentiment Details", options=sorted(df['cluster'].unique()))
-        cluster_data = df[df['cluster'] == selected_cluster]
+        selected_cluster = st.selectbox("Select Cluster for Sentiment Details", options=sorted(sentiment_avg['cluster']))
+        cluster_row = sentiment_avg.set_index('cluster').loc[selected_cluster]
         st.markdown(f"### Sentiment Distribution for Cluster {selected_cluster}")
-        sentiment_dist = cluster_data['sentiment_score'].apply(lambda x: 'Positive' if x > 0 else ('Negative' if x < 0 else 'Neutral')).value_counts()
+        sentiment_dist = pd.Series({'Positive': cluster_row['positive'], 'Negative': cluster_row['negative'],
+                                    'Neutral': cluster_row['count'] - cluster_row['positive'] - cluster_row['negative']})
+        sentiment_dist = sentiment_dist[sentiment_dist > 0].sort_values(ascending=False)
         st.bar_chart(sentiment_dist)
+        st.caption(payload.summary())
 
         
 
@@ -523,21 +657,23 @@ elif page == "Web Application":
         import pandas as pd
         import numpy as np
         st.subheader("🧪 Cluster-Based Sentiment Analysis")
+        payload = PayloadReport()
 
         @st.cache_data
         def get_cluster_sentiment_stats(df):
             """Cache the sentiment statistics for clusters to speed up rendering"""
-            avg_sentiment = df.groupby('cluster')['sentiment_score'].mean()
-            cluster_category_dist = df.groupby(['cluster', 'category']).size().unstack(fill_value=0)
+            avg_sentiment = df.groupby('cluster', observed=True)['sentiment_score'].mean()
+            cluster_category_dist = df.groupby(['cluster', 'category'], observed=True).size().unstack(fill_value=0)
             return avg_sentiment, cluster_category_dist
 
         @st.cache_data
-        def sample_data(df, num_rows=1000):
-            """Sample a subset of the dataset for performance testing"""
+        def sample_data(bundle_version, num_rows=1000):
+            """Sample a subset of the dataset for performance testing (keyed by bundle version, not by hashing the frame;
+            the bundle fixes the model version and threshold, and appends publish a new one)"""
             return df.sample(n=min(num_rows, len(df)), random_state=42)
 
         # Cache the statistics
-        df_sampled = sample_data(df, num_rows=1000)  # Limit to 1000 rows for performance testing
+        df_sampled = sample_data(bundle.version, num_rows=1000)  # Limit to 1000 rows for performance testing
         avg_sentiment, cluster_category_dist = get_cluster_sentiment_stats(df_sampled)
 
         # Average Sentiment Score per Cluster
@@ -550,8 +686,33 @@ elif page == "Web Application":
 
         # Cluster Sentiment Boxplot
         st.markdown("### Sentiment Boxplot by Cluster")
-        fig_boxplot = px.box(df_sampled, x="cluster", y="sentiment_score", points="all", title="Sentiment Score Boxplot by Cluster")
-        st.plotly_chart(fig_boxplot)
+        @st.cache_data
+        def get_cluster_box_summary(bundle_version):
+            """Quartiles and whiskers per cluster over every article (six numbers per box are sent)"""
+            return box_summary(df[['cluster', 'sentiment_score']], 'cluster', 'sentiment_score')
+
+        fig_boxplot = box_figure(get_cluster_box_summary(bundle.version), 'cluster',
+                                 title="Sentiment Score Boxplot by Cluster")
+        st.plotly_chart(payload.add("boxplot", fig_boxplot))
+
+        # 2-D cluster map from the stored SVD embeddings of the sampled articles
+        st.markdown("### Cluster Map")
+        if cluster_model.reduced:
+            @st.cache_data
+            def get_cluster_map(bundle_version):
+                """Map positions of the sampled articles, stored in the bundle (rows are indexed by bundle position)"""
+                df = sample_data(bundle_version)[['short_description', 'short_description_clean', 'category', 'cluster']]
+                coords = bundle.coordinates[df.index.to_numpy()] if bundle.has_coordinates else \
+                    cluster_model.map_coordinates(df['short_description_clean'])
+                return df.assign(x=coords[:, 0], y=coords[:, 1], cluster=df['cluster'].astype(str))
+
+            map_df = get_cluster_map(bundle.version)
+            fig_map = px.scatter(map_df, x='x', y='y', color='cluster', hover_data=['category', 'short_description'],
+                                 title="Articles by Cluster (truncated SVD, 2-D projection)")
+            st.plotly_chart(payload.add("cluster map", fig_map))
+        else:
+            st.info("Set CLUSTER_SVD_RANK and retrain the clusters to enable the cluster map.")
+        st.caption(payload.summary())
 
         # Filtered Data for Specific Cluster
         cluster_filter = st.selectbox("Select a Cluster to View", options=sorted(df['cluster'].unique()))
@@ -562,14 +723,45 @@ elif page == "Web Application":
 
         st.markdown(f"Showing {len(filtered_data_sampled)} entries in Cluster {cluster_filter}")
         st.dataframe(filtered_data_sampled[['short_description', 'sentiment_score', 'category']])
-        st.download_button("Download Filtered Data", data=filtered_data.to_csv(index=False), file_name=f"Cluster_{cluster_filter}_Data.csv")
+        # The CSV is only written when asked for, in chunks
+        if st.button("Prepare Download"):
+            st.download_button("Download Filtered Data", data=export_bytes(
+                lambda path: storage.export_frame(filtered_data, path, 'csv')), file_name=f"Cluster_{cluster_filter}_Data.csv")
 
 
 
     # Dataset Page
     elif current == "Dataset":
         st.subheader("🗃 Full Dataset View")
-        st.dataframe(df)
-        st.download_button("Download Full Data", data=df.to_csv(index=False), file_name="Senticonomy_Data.csv")
+        # Filters, sorting and paging run in the storage layer: one page of rows is read per render
+        filter_cols = st.columns([2, 2, 1, 1])
+        search = filter_cols[0].text_input("Search headlines and descriptions").strip() or None
+        categories = filter_cols[1].multiselect("Categories", options=sorted(rollups.rollup('category')['category']))
+        sort_by = filter_cols[2].selectbox("Sort by", options=[None, 'date', 'category', 'headline', 'authors'],
+                                           format_func=lambda c: "Storage order" if c is None else c)
+        descending = filter_cols[3].checkbox("Descending", value=True)
+        filters = dict(start=rollup_range[0], end=rollup_range[1], categories=categories or None, search=search)
+
+        @st.cache_data
+        def count_dataset_rows(dataset_signature, **filters):
+            return storage.count_rows(storage.CLEANED_DATASET, **filters)
+
+        # Keyed on the dataset's files: ingestion can append rows without publishing a model or bundle version
+        total_rows = count_dataset_rows(storage.signature(storage.CLEANED_DATASET), **filters)
+        pages = max((total_rows - 1) // config.DATASET_PAGE_SIZE + 1, 1)
+        page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+        page_df = storage.read_page(storage.CLEANED_DATASET, offset=(page_number - 1) * config.DATASET_PAGE_SIZE,
+                                    limit=config.DATASET_PAGE_SIZE, sort_by=sort_by, descending=descending, **filters)
+        st.markdown(f"Showing {len(page_df)} of {total_rows} rows")
+        st.dataframe(with_derived_columns(page_df))
+
+        # Exports stream the filtered dataset batch by batch, adding the derived columns to each batch
+        export_cols = st.columns([1, 3])
+        export_format = export_cols[0].selectbox("Export format", options=storage.EXPORT_FORMATS)
+        if export_cols[1].button("Prepare Export"):
+            with st.spinner(f"Exporting {total_rows} rows..."):
+                data = export_bytes(lambda path: storage.export(storage.CLEANED_DATASET, path, export_format,
+                                                                transform=with_derived_columns, **filters))
+            st.download_button("Download Full Data", data=data, file_name=f"Senticonomy_Data.{export_format}")
 
 
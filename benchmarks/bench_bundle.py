@@ -0,0 +1,116 @@
+"""Dashboard worker startup and host memory: every worker enriching the articles itself vs. attaching to a bundle.
+
+K worker processes start together. ``build`` workers do what each replica did at startup, with warm text
+caches: read the dataset, look up the preprocessed text, predict clusters and score sentiment. ``attach``
+workers map the published bundle. Each worker then touches every column, as the dashboard pages do.
+Memory is the sum of the workers' proportional set size (PSS), which charges each shared page to its
+sharers in equal parts, so it adds up to the physical memory the workers use together.
+
+Sentiment uses VADER only (cascade threshold 0), so the transformer model is not needed.
+
+    python -m benchmarks.bench_bundle --rows 200000 --workers 1 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_storage import synthetic_cleaned
+from senticonomy import config
+
+
+def lowercase(texts):
+    # Stand-in preprocessing: workers only hit the warm cache, so the rules themselves do not matter
+    return [text.lower() for text in texts]
+
+
+def memory():
+    with open('/proc/self/smaps_rollup') as f:
+        fields = {line.split(':')[0]: line.split()[1] for line in f if ':' in line}
+    return {name: int(fields[name]) / 1024 for name in ('Rss', 'Pss')}
+
+
+def worker(mode, root, barrier, results):
+    from senticonomy import storage
+    from senticonomy.bundle import BundleStore, enrich
+    from senticonomy.model_store import ModelStore
+    from senticonomy.preprocessing import PREPROCESS_VERSION
+    from senticonomy.text_cache import cached_apply, shared_cache
+
+    config.DATA_DIR = os.path.join(root, 'data')
+    baseline = memory()
+    start = time.perf_counter()
+    if mode == 'build':
+        frame = storage.read_dataset(storage.CLEANED_DATASET)
+        frame = frame.drop_duplicates(subset='short_description').dropna(subset=['short_description'])
+        frame['short_description_clean'] = cached_apply(frame['short_description'].astype(str), lowercase,
+                                                        shared_cache('preprocess', PREPROCESS_VERSION))
+        articles, _ = enrich(frame, ModelStore(os.path.join(root, 'models')).load(), 0.0)
+    else:
+        bundle = BundleStore(os.path.join(root, 'bundles')).load()
+        articles = bundle.articles.frame()
+        bundle.cells()
+    seconds = time.perf_counter() - start
+    for column in articles.columns:
+        values = articles[column]
+        values.str.len().sum() if pd.api.types.is_string_dtype(values) else values.max()
+    barrier.wait()
+    used = memory()
+    results.put({'seconds': seconds, 'Rss': used['Rss'] - baseline['Rss'], 'Pss': used['Pss'] - baseline['Pss']})
+    barrier.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        # Workers inherit the cache location through the environment
+        os.environ['SENTICONOMY_CACHE_DIR'] = os.path.join(root, 'cache')
+        os.environ['TEXT_CACHE_PATH'] = os.path.join(root, 'cache', 'text_cache.sqlite')
+        config.CACHE_DIR, config.TEXT_CACHE_PATH = os.environ['SENTICONOMY_CACHE_DIR'], os.environ['TEXT_CACHE_PATH']
+        config.DATA_DIR = os.path.join(root, 'data')
+        from senticonomy import storage
+        from senticonomy.bundle import BundleStore, build
+        from senticonomy.model_store import ModelStore
+        from senticonomy.preprocessing import PREPROCESS_VERSION
+        from senticonomy.text_cache import cached_apply, shared_cache
+
+        storage.write_dataset(synthetic_cleaned(args.rows), storage.CLEANED_DATASET)
+        frame = storage.read_dataset(storage.CLEANED_DATASET)
+        frame = frame.drop_duplicates(subset='short_description').dropna(subset=['short_description'])
+        frame['short_description_clean'] = cached_apply(frame['short_description'].astype(str), lowercase,
+                                                        shared_cache('preprocess', PREPROCESS_VERSION))
+        model = ModelStore(os.path.join(root, 'models')).retrain(frame['short_description_clean'], frame['category'],
+                                                                 n_clusters=11, svd_rank=0)
+        start = time.perf_counter()
+        bundle = build(frame, model, 0.0, BundleStore(os.path.join(root, 'bundles')))
+        print(f"{bundle.manifest['rows']} articles; bundle built in {time.perf_counter() - start:.1f}s")
+        del frame
+
+        context = multiprocessing.get_context('spawn')
+        print(f"{'mode':<7} {'workers':>7} {'startup':>9} {'RSS sum':>8} {'PSS sum':>8}")
+        for mode in ('build', 'attach'):
+            for workers in args.workers:
+                barrier, results = context.Barrier(workers + 1), context.Queue()
+                processes = [context.Process(target=worker, args=(mode, root, barrier, results))
+                             for _ in range(workers)]
+                for process in processes:
+                    process.start()
+                barrier.wait()
+                reports = [results.get() for _ in processes]
+                barrier.wait()
+                for process in processes:
+                    process.join()
+                startup = max(report['seconds'] for report in reports)
+                print(f"{mode:<7} {workers:>7} {startup * 1000:>7.0f}ms {sum(r['Rss'] for r in reports):>6.0f}MB "
+                      f"{sum(r['Pss'] for r in reports):>6.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
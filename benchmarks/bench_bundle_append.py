@@ -0,0 +1,97 @@
+"""Ingestion-time bundle extension: rewriting the whole bundle vs. appending a segment.
+
+Publishes a bundle of ``--rows`` synthetic enriched articles with sparse features, then extends it
+``--runs`` times with ``--batch`` new articles each, as ingestion does. ``rewrite`` is the previous
+``BundleStore.append``: concatenate the current bundle with the batch and publish everything again.
+``segment`` is the current one. Reports the time and bytes written per run (``wchar`` from
+``/proc/self/io``), the segment count and the cost of a dashboard view of the final bundle, and checks
+that both end with the same articles and cells (sums within float32 precision).
+
+    python -m benchmarks.bench_bundle_append --rows 100000 400000 --batch 2000 --runs 16
+"""
+import argparse
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from benchmarks.bench_sessions import enriched
+from senticonomy.bundle import BundleStore
+from senticonomy.rollups import CELL_KEYS
+
+MODEL = SimpleNamespace(version='1', metadata={}, reduced=False,
+                        kmeans=SimpleNamespace(cluster_centers_=np.zeros((11, 1000))))
+
+
+def batch(rows, seed, terms=10):
+    """Enriched articles and TF-IDF-like features with ``terms`` non-zeros per row out of 1000."""
+    frame = enriched(rows)
+    frame['link'] = frame['link'] + f"/{seed}"
+    rng = np.random.default_rng(seed)
+    features = sp.csr_matrix((rng.random(rows * terms), rng.integers(0, 1000, rows * terms),
+                              np.arange(0, rows * terms + 1, terms)), shape=(rows, 1000))
+    features.sum_duplicates()
+    return frame, features
+
+
+def rewrite_append(store, articles, features):
+    current = store.load()
+    previous = current.articles.frame()
+    combined = pd.concat([previous.astype({column: object for column in previous.columns
+                                           if isinstance(previous[column].dtype, pd.CategoricalDtype)}),
+                          articles[previous.columns]], ignore_index=True)
+    return store.publish(combined, sp.vstack([current.features, features], format='csr'), MODEL, 0.0)
+
+
+def written():
+    with open('/proc/self/io') as f:
+        return int(dict(line.split(': ') for line in f)['wchar'])
+
+
+def run(mode, rows, batch_rows, runs):
+    with tempfile.TemporaryDirectory() as root:
+        store = BundleStore(root)
+        store.publish(*batch(rows, 0), MODEL, 0.0)
+        seconds, bytes_written = [], []
+        for run_index in range(1, runs + 1):
+            articles, features = batch(batch_rows, run_index)
+            before, start = written(), time.perf_counter()
+            bundle = rewrite_append(store, articles, features) if mode == 'rewrite' else \
+                store.append(articles, features, MODEL, 0.0)
+            seconds.append(time.perf_counter() - start)
+            bytes_written.append(written() - before)
+        start = time.perf_counter()
+        frame = bundle.articles.frame()
+        view = time.perf_counter() - start
+        cells = bundle.cells().sort_values(CELL_KEYS).reset_index(drop=True)
+        return {'seconds': seconds, 'bytes': bytes_written, 'segments': len(bundle.segments), 'view': view,
+                'links': frame['link'].tolist(), 'cells': cells}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 400_000])
+    parser.add_argument('--batch', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'mode':<8} {'mean/run':>9} {'max/run':>9} {'MB/run':>7} {'segments':>8} {'view':>8} {'same':>5}")
+    for rows in args.rows:
+        results = {mode: run(mode, rows, args.batch, args.runs) for mode in ('rewrite', 'segment')}
+        same = results['rewrite']['links'] == results['segment']['links']
+        try:
+            pd.testing.assert_frame_equal(results['rewrite']['cells'], results['segment']['cells'],
+                                          check_dtype=False, rtol=1e-5, atol=1e-4)
+        except AssertionError:
+            same = False
+        for mode, result in results.items():
+            print(f"{rows:>8} {mode:<8} {np.mean(result['seconds']) * 1000:>7.0f}ms "
+                  f"{max(result['seconds']) * 1000:>7.0f}ms {np.mean(result['bytes']) / 2 ** 20:>7.1f} "
+                  f"{result['segments']:>8} {result['view'] * 1000:>6.1f}ms {'yes' if same else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Plotly payload and build time: raw-row figures vs. the reduced ones from ``senticonomy.charts``.
+
+Time series: 11 categories x ``days`` daily points. Boxplot: ``points="all"``
+over every article vs. quantile summaries. Map: one point per article vs.
+grid cells.
+
+    python -m benchmarks.bench_charts --rows 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from benchmarks.bench_rollups import CATEGORIES
+from senticonomy.charts import box_figure, box_summary, downsample, figure_bytes, grid_bins
+
+# The app's map call; renamed to scatter_map in Plotly 6+
+scatter_map = getattr(px, 'scatter_mapbox', None) or px.scatter_map
+
+
+def measure(build):
+    start = time.perf_counter()
+    figure = build()
+    size = figure_bytes(figure)
+    return time.perf_counter() - start, size
+
+
+def report(name, raw, reduced):
+    (raw_time, raw_size), (reduced_time, reduced_size) = raw, reduced
+    print(f"  {name:<12} raw {raw_size / 1024:>9.0f} KB {raw_time:>6.2f}s   reduced {reduced_size / 1024:>6.0f} KB "
+          f"{reduced_time:>6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--days', type=int, default=3650)
+    parser.add_argument('--budget', type=int, default=2000)
+    parser.add_argument('--cells', type=int, default=2500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2015-01-01', periods=args.days, freq='D')
+    series = pd.DataFrame({'date': np.repeat(dates, len(CATEGORIES)), 'category': np.tile(CATEGORIES, args.days),
+                           'sentiment_score': rng.normal(0, 0.2, args.days * len(CATEGORIES))})
+    print(f"time series, {len(series)} points")
+    report('line', measure(lambda: px.line(series, x='date', y='sentiment_score', color='category')),
+           measure(lambda: px.line(downsample(series, 'date', 'sentiment_score', args.budget, group='category'),
+                                   x='date', y='sentiment_score', color='category')))
+
+    for rows in args.rows:
+        articles = pd.DataFrame({'cluster': rng.integers(0, 11, rows), 'sentiment_score': rng.uniform(-1, 1, rows),
+                                 'lat': rng.normal(39, 5, rows), 'lon': rng.normal(-95, 12, rows)})
+        print(f"{rows} articles")
+        report('boxplot', measure(lambda: px.box(articles, x='cluster', y='sentiment_score', points='all')),
+               measure(lambda: box_figure(box_summary(articles, 'cluster', 'sentiment_score'), 'cluster')))
+        report('map', measure(lambda: scatter_map(articles, lat='lat', lon='lon', color='sentiment_score')),
+               measure(lambda: scatter_map(grid_bins(articles, 'lat', 'lon', 'sentiment_score', args.cells),
+                                                 lat='lat', lon='lon', color='sentiment_score', size='count')))
+
+
+if __name__ == '__main__':
+    main()
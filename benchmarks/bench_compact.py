@@ -0,0 +1,85 @@
+"""Enriched article frame memory and page operations before and after compaction to typed columns.
+
+``as read``: the frame as enrichment produces it. ``object``: the same frame with Python object strings,
+as pandas before 3.0 loads it. ``compact``: ``senticonomy.compact.compact`` of it. Prints the per-column
+memory report, then times what the dashboard pages do with the frame on each version and checks the
+results agree (sentiment sums within float32 precision).
+
+    python -m benchmarks.bench_compact --rows 200000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_sessions import enriched
+from senticonomy.charts import box_summary
+from senticonomy.compact import compact, memory_report
+from senticonomy.rollups import cells
+
+PAGE_OPERATIONS = {
+    'cluster stats': lambda df: df.groupby(['cluster', 'category'], observed=True).size().unstack(fill_value=0),
+    'cluster means': lambda df: df.groupby('cluster', observed=True)['sentiment_score'].mean(),
+    'box summary': lambda df: box_summary(df[['cluster', 'sentiment_score']], 'cluster', 'sentiment_score'),
+    'model counts': lambda df: df['model'].value_counts(),
+    'cluster filter': lambda df: df[df['cluster'] == 3][['short_description', 'sentiment_score', 'category']],
+    'rollup cells': lambda df: cells(df['date'], df['category'], df['cluster'], df['sentiment_score']),
+    'csv page': lambda df: df.iloc[:1000].to_csv(index=False),
+}
+
+
+def timed(operation, frame, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = operation(frame)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def same(a, b):
+    if isinstance(a, str):
+        # float32 columns print fewer digits, so CSV text is compared by shape
+        return a.count('\n') == b.count('\n') and a.splitlines()[0] == b.splitlines()[0]
+    check = pd.testing.assert_frame_equal if isinstance(a, pd.DataFrame) else pd.testing.assert_series_equal
+    try:
+        options = {'check_column_type': False} if isinstance(a, pd.DataFrame) else {'check_names': False}
+        check(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False, check_categorical=False,
+              check_index_type=False, rtol=1e-5, atol=1e-3, **options)
+    except AssertionError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    frame = enriched(args.rows)
+    frame['date'] = frame['date'].astype(str)
+    objects = frame.astype({column: object for column in frame.columns if pd.api.types.is_string_dtype(frame[column])})
+    start = time.perf_counter()
+    compacted = compact(objects)
+    print(f"{args.rows} rows; compacted in {time.perf_counter() - start:.2f}s")
+    with pd.option_context('display.width', 200, 'display.float_format', '{:.2f}'.format):
+        report = memory_report(objects, compacted)
+        report[['bytes_before', 'bytes_after']] = report[['bytes_before', 'bytes_after']].astype(np.int64) // 1024
+        print(report.rename(columns={'bytes_before': 'KB_object', 'bytes_after': 'KB_compact'}))
+    as_read = memory_report(frame, compacted).loc['total']
+    print(f"as read: {as_read['bytes_before'] / 2 ** 20:.0f}MB -> compact {as_read['bytes_after'] / 2 ** 20:.0f}MB")
+
+    print(f"{'operation':<15} {'object':>9} {'as read':>9} {'compact':>9} {'same':>5}")
+    for name, operation in PAGE_OPERATIONS.items():
+        seconds = {}
+        results = {}
+        for label, version in (('object', objects), ('as read', frame), ('compact', compacted)):
+            seconds[label], results[label] = timed(operation, version)
+        agree = same(results['object'], results['compact'])
+        print(f"{name:<15} {seconds['object'] * 1000:>7.1f}ms {seconds['as read'] * 1000:>7.1f}ms "
+              f"{seconds['compact'] * 1000:>7.1f}ms {'yes' if agree else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    main()
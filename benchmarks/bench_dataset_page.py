@@ -0,0 +1,77 @@
+"""Dataset page render time and peak memory: full frame plus in-memory CSV vs. one page read from storage.
+
+Each case runs in a fresh interpreter so its peak RSS (Linux ``VmHWM``) is its own; "export" streams the whole filtered dataset
+to a file instead of building the CSV string.
+
+    python -m benchmarks.bench_dataset_page --sizes 200000 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_storage import synthetic_cleaned
+from senticonomy import config, storage
+
+CASES = {
+    'full frame + to_csv': lambda: len(storage.read_dataset(storage.CLEANED_DATASET).to_csv(index=False)),
+    'page, storage order': lambda: len(storage.read_page(storage.CLEANED_DATASET, offset=5000, limit=50)),
+    'page, newest first': lambda: len(storage.read_page(storage.CLEANED_DATASET, offset=5000, limit=50,
+                                                        sort_by='date', descending=True)),
+    'page, by headline': lambda: len(storage.read_page(storage.CLEANED_DATASET, offset=5000, limit=50,
+                                                       sort_by='headline')),
+    'page, search + count': lambda: (storage.count_rows(storage.CLEANED_DATASET, search='policy risk'),
+                                     len(storage.read_page(storage.CLEANED_DATASET, search='policy risk'))),
+    'export csv.gz': lambda: storage.export(storage.CLEANED_DATASET, os.path.join(config.DATA_DIR, 'out.csv.gz'),
+                                            'csv.gz'),
+    'export parquet': lambda: storage.export(storage.CLEANED_DATASET, os.path.join(config.DATA_DIR, 'out.parquet'),
+                                             'parquet'),
+}
+
+
+def peak_rss():
+    # VmHWM belongs to this process image; ru_maxrss is inherited from the parent across exec on Linux
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) * 1024
+
+
+def run_case(name):
+    """Child process: time one case and report its peak RSS above the interpreter's baseline."""
+    baseline = peak_rss()
+    start = time.perf_counter()
+    CASES[name]()
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_mb': (peak_rss() - baseline) / 2 ** 20}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200_000, 1_000_000])
+    parser.add_argument('--case', choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        return run_case(args.case)
+
+    print(f"{'rows':>8} {'case':<22} {'time':>8} {'peak RSS':>9} {'file':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            config.DATA_DIR = tmp
+            storage.write_dataset(synthetic_cleaned(size), storage.CLEANED_DATASET)
+            for name in CASES:
+                out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_dataset_page', '--case', name],
+                                     env={**os.environ, 'SENTICONOMY_DATA_DIR': tmp}, check=True,
+                                     capture_output=True, text=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                exported = [f for f in os.listdir(tmp) if f.startswith('out.')]
+                size_note = f"{os.path.getsize(os.path.join(tmp, exported[0])) / 2 ** 20:.1f}MB" if exported else ''
+                for f in exported:
+                    os.remove(os.path.join(tmp, f))
+                print(f"{size:>8} {name:<22} {result['seconds'] * 1000:>6.0f}ms {result['peak_mb']:>7.0f}MB "
+                      f"{size_note:>8}")
+
+
+if __name__ == '__main__':
+    main()
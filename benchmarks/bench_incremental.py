@@ -0,0 +1,75 @@
+"""Per-run ingestion cost as the master grows: full CSV reload + dedupe vs. append-only with a link index.
+
+Every run ingests the same-sized batch (half of it already stored). The full
+strategy's time grows with the history; the incremental one stays flat.
+
+    python -m benchmarks.bench_incremental --sizes 10000 100000 1000000 --batch 400
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from senticonomy import config, storage
+from senticonomy.link_index import MASTER_COLUMNS, LinkIndex, append_new_articles
+
+
+def synthetic_news(start, count):
+    ids = np.arange(start, start + count)
+    return pd.DataFrame({
+        'link': [f"https://example.com/article/{i}" for i in ids],
+        'headline': [f"Headline number {i}" for i in ids],
+        'category': np.array(['TECH', 'SPORTS', 'POLITICS', 'BUSINESS'])[ids % 4],
+        'short_description': [f"Short description of article {i} with a few more words of text" for i in ids],
+        'authors': [f"Author {i % 97}" for i in ids],
+        'date': pd.Timestamp('2025-01-01T00:00:00Z').strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }, columns=MASTER_COLUMNS)
+
+
+def full_reload(batch, master_file):
+    """The original strategy: read everything, concat, dedupe the whole history, rewrite."""
+    existing = pd.read_csv(master_file)
+    combined = pd.concat([existing, batch], ignore_index=True)
+    combined.drop_duplicates(subset='link', keep='last', inplace=True)
+    combined['category'] = combined['category'].str.upper()
+    combined.to_csv(master_file, index=False)
+    return combined
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--batch', type=int, default=400)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'full reload':>12}  {'incremental':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_DIR = tmp
+        for size in args.sizes:
+            history = synthetic_news(0, size)
+            batch = synthetic_news(size - args.batch // 2, args.batch)
+
+            full_file = os.path.join(tmp, f"full_{size}.csv")
+            history.to_csv(full_file, index=False)
+            start = time.perf_counter()
+            full_reload(batch, full_file)
+            full_time = time.perf_counter() - start
+
+            dataset = f"incremental_{size}"
+            storage.write_dataset(history, dataset)
+            index = LinkIndex(os.path.join(tmp, f"index_{size}.sqlite"))
+            index.add(history)
+            start = time.perf_counter()
+            delta = append_new_articles(batch, index, dataset)
+            incremental_time = time.perf_counter() - start
+            index.close()
+
+            assert len(delta) == args.batch - args.batch // 2
+            print(f"{size:>10}  {full_time:>11.3f}s  {incremental_time:>11.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Sequential vs. concurrent NewsAPI ingestion against the local fake server.
+
+    python -m benchmarks.bench_ingestion --latency 0.3 --sleep 1.5 --rate 5
+"""
+import argparse
+import time
+
+from senticonomy.fake_newsapi import FakeNewsApiClient, start_server
+from senticonomy.ingestion import collect_rows, fetch_news, keyword_queries
+
+
+def sequential(client, queries, sleep):
+    """The original loop: one call per keyword with a fixed pause after each."""
+    rows = []
+    for query in queries:
+        try:
+            articles = client.get_everything(q=query.q, language='en', sort_by='publishedAt', page_size=query.page_size)
+            rows.extend(articles.get('articles', []))
+        except Exception as e:
+            print(f"Error fetching keyword '{query.q}' for {query.category}: {e}")
+        time.sleep(sleep)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--sleep', type=float, default=1.5, help="pause used by the sequential baseline")
+    parser.add_argument('--rate', type=float, default=5.0, help="token bucket rate (requests/sec)")
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, error_rate=args.error_rate)
+    client = FakeNewsApiClient(server.base_url)
+    queries = keyword_queries()
+    try:
+        start = time.perf_counter()
+        baseline = sequential(client, queries, args.sleep)
+        baseline_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = list(fetch_news(client.get_everything, queries, rate=args.rate, burst=args.burst,
+                                  workers=args.workers, backoff=0.1))
+        concurrent_time = time.perf_counter() - start
+        rows = collect_rows(results)
+        errors = sum(result.error is not None for result in results)
+    finally:
+        server.shutdown()
+
+    print(f"queries:     {len(queries)}")
+    print(f"sequential:  {baseline_time:7.2f}s  {len(baseline)} articles  {len(queries) / baseline_time:6.2f} queries/s")
+    print(f"concurrent:  {concurrent_time:7.2f}s  {len(rows)} articles  {len(queries) / concurrent_time:6.2f} queries/s"
+          f"  ({errors} failed)")
+    print(f"speed-up:    {baseline_time / concurrent_time:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Near-duplicate detection: throughput, recall on planted wire-story copies and false collapses.
+
+A share of the rows are copies of other rows with a word replaced, a word
+dropped and a source tag appended, under a new link.
+
+    python -m benchmarks.bench_near_duplicates --sizes 50000 100000 200000 --copies 0.2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_streaming_clusters import synthetic_texts, word
+from senticonomy import config
+from senticonomy.near_duplicates import NearDuplicateIndex, drop_near_duplicates
+
+SOURCES = ['(Reuters)', '(AP)', '- AFP', '| Bloomberg']
+
+
+def syndicated(text, rng):
+    words = text.split()
+    words[rng.integers(len(words))] = word(int(rng.integers(100_000, 200_000)))
+    del words[rng.integers(len(words))]
+    return ' '.join(words) + ' ' + SOURCES[rng.integers(len(SOURCES))]
+
+
+def corpus(size, copies, rng):
+    originals = int(size / (1 + copies))
+    texts = synthetic_texts(originals, rng, words_per_text=30)
+    source = rng.integers(0, originals, size - originals)
+    frame = pd.DataFrame({
+        'link': [f"https://example.com/{i}" for i in range(size)],
+        'headline': [' '.join(t.split()[:6]) for t in texts] + [' '.join(texts[s].split()[:6]) for s in source],
+        'short_description': texts + [syndicated(texts[s], rng) for s in source],
+        'original': np.concatenate([np.arange(originals), source]),
+    })
+    return frame.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50_000, 100_000, 200_000])
+    parser.add_argument('--copies', type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"threshold {config.NEAR_DUP_THRESHOLD}, {config.NEAR_DUP_PERMUTATIONS} permutations")
+    print(f"{'rows':>9}  {'time':>8}  {'rows/s':>8}  {'collapsed':>9}  {'recall':>7}  {'false':>6}")
+    for size in args.sizes:
+        frame = corpus(size, args.copies, np.random.default_rng(0))
+        with tempfile.TemporaryDirectory() as tmp:
+            index = NearDuplicateIndex(os.path.join(tmp, 'near_duplicates.sqlite'))
+            start = time.perf_counter()
+            kept, report = drop_near_duplicates(frame, index)
+            seconds = time.perf_counter() - start
+            index.close()
+        planted = size - frame['original'].nunique()
+        # Collapsing is right when the kept rows still cover every original story once
+        missed = len(kept) - kept['original'].nunique()
+        false = frame['original'].nunique() - kept['original'].nunique()
+        print(f"{size:>9}  {seconds:>7.1f}s  {size / seconds:>8.0f}  {report.collapsed:>9}  "
+              f"{(planted - missed) / planted:>7.1%}  {false:>6}")
+
+
+if __name__ == '__main__':
+    main()
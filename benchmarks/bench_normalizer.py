@@ -0,0 +1,55 @@
+"""Throughput of per-row ``preprocess_text`` vs. the batch normalizer, with an output equality check.
+
+Descriptions are drawn from a Zipfian distribution over WordNet lemma names plus
+URLs, tags, digits and punctuation. Needs the NLTK ``stopwords`` and ``wordnet`` data.
+
+    python -m benchmarks.bench_normalizer --sizes 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from nltk.corpus import wordnet
+
+from senticonomy.preprocessing import lemma_table, normalize_series, preprocess_text
+
+NOISE = np.array(['https://example.com/story?id=42', '<b>', '</b>', '2025', '3.5%', 'U.S.', "it's", '--', 'The', 'AND'])
+
+
+def synthetic_descriptions(n, words_per_text=25, vocabulary=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    lemmas = np.array([name.replace('_', ' ') for name in wordnet.all_lemma_names()][:vocabulary])
+    ranks = rng.zipf(1.2, size=(n, words_per_text)) - 1
+    words = np.where(ranks < len(lemmas), lemmas[np.minimum(ranks, len(lemmas) - 1)], 'news')
+    noise = rng.random((n, words_per_text)) < 0.08
+    words = np.where(noise, NOISE[rng.integers(0, len(NOISE), (n, words_per_text))], words)
+    return pd.Series([' '.join(row) for row in words])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        texts = synthetic_descriptions(size)
+
+        start = time.perf_counter()
+        expected = texts.astype(str).apply(preprocess_text)
+        row_time = time.perf_counter() - start
+
+        lemma_table.cache_clear()
+        start = time.perf_counter()
+        actual = normalize_series(texts)
+        batch_time = time.perf_counter() - start
+
+        assert (expected.values == actual.values).all(), "batch normalizer output differs from preprocess_text"
+        info = lemma_table().cache_info()
+        print(f"{size:>9} texts  per-row {size / row_time:>9.0f} texts/s  batch {size / batch_time:>9.0f} texts/s  "
+              f"({row_time / batch_time:.1f}x, lemma table {info.currsize} tokens, "
+              f"{info.hits / max(1, info.hits + info.misses):.1%} hits)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Peak RSS and time of out-of-core clustering per chunk size, vs. the in-memory TF-IDF + KMeans fit.
+
+A synthetic cleaned dataset is written to a temporary Parquet directory once;
+every configuration then runs in a fresh subprocess so its peak RSS is its own.
+
+    python -m benchmarks.bench_out_of_core --rows 2000000 --chunk-sizes 10000 50000 200000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_streaming_clusters import synthetic_texts
+from senticonomy import config, storage
+from senticonomy.out_of_core import fit_out_of_core
+
+DATASET = 'bench_out_of_core'
+
+
+def write_corpus(rows, chunk=100_000):
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        storage.write_dataset(pd.DataFrame({
+            'short_description': synthetic_texts(n, rng),
+            'category': rng.choice(list(config.QUERY_KEYWORDS), n),
+            'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(np.arange(start, start + n) % 365, unit='D'),
+        }), DATASET)
+
+
+def memory_mb(field):
+    """``VmRSS``/``VmHWM`` of this process in MB.
+
+    ``ru_maxrss`` is not used on Linux: a child started with fork + exec starts
+    from the parent's peak, which would hide the worker's own.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(chunk_size):
+    """Fit in this process and return ``(seconds, RSS after imports, peak RSS)`` in seconds and MB."""
+    imported = memory_mb('VmRSS')
+    start = time.perf_counter()
+    if chunk_size:
+        batches = storage.iter_batches(DATASET, columns=['short_description', 'category'], batch_size=chunk_size,
+                                       use_threads=False)
+        fit_out_of_core((batch['short_description'], batch['category']) for batch in batches)
+    else:
+        from senticonomy.model_store import fit_clusters
+        frame = storage.read_dataset(DATASET, columns=['short_description', 'category'])
+        fit_clusters(frame['short_description'], frame['category'])
+    return time.perf_counter() - start, imported, memory_mb('VmHWM')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--skip-in-memory', action='store_true')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run(args.worker)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SENTICONOMY_DATA_DIR=tmp)
+        config.DATA_DIR = tmp
+        write_corpus(args.rows)
+        print(f"{args.rows} rows, {config.HASHING_FEATURES} hash features")
+        print(f"{'chunk size':>12}  {'time':>9}  {'peak RSS':>10}  {'above imports':>14}")
+        for chunk_size in args.chunk_sizes + ([] if args.skip_in_memory else [0]):
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_out_of_core', '--worker', str(chunk_size)],
+                                 env=env, capture_output=True, text=True, check=True).stdout
+            seconds, imported, peak = json.loads(out.strip().splitlines()[-1])
+            label = chunk_size or 'in-memory'
+            print(f"{label:>12}  {seconds:>8.1f}s  {peak:>8.0f}MB  {peak - imported:>12.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""API calls and duplicate articles: one call per keyword vs. the query planner.
+
+A previous run is simulated by marking everything older than ``--known-after``
+(article index within a category pool) as already ingested.
+
+    python -m benchmarks.bench_query_planner --known-after 40
+"""
+import argparse
+
+from senticonomy.fake_newsapi import FakeCorpus, FakeNewsApiClient, start_server
+from senticonomy.ingestion import fetch_news, keyword_queries
+from senticonomy.query_planner import plan_queries, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--known-after', type=int, default=40,
+                        help="articles past this position of each category pool count as already ingested")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--max-pages', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = FakeCorpus()
+    known = [corpus.article(category, n)
+             for category in corpus.query_keywords for n in range(args.known_after, corpus.pool_size)]
+    seen = {article['url'] for article in known}
+    since = {}
+    for category in corpus.query_keywords:
+        since[category] = corpus.article(category, args.known_after)['publishedAt']
+
+    server = start_server(corpus=corpus)
+    client = FakeNewsApiClient(server.base_url)
+    try:
+        baseline = summarize(list(fetch_news(client.get_everything, keyword_queries(), rate=100, burst=10)), seen)
+        planned = summarize(list(fetch_news(client.get_everything, plan_queries(page_size=args.page_size,
+                                                                                 max_pages=args.max_pages,
+                                                                                 since=since),
+                                            rate=100, burst=10, seen=seen)), seen)
+    finally:
+        server.shutdown()
+
+    print(f"{'':22}{'baseline':>10}{'planner':>10}")
+    print(f"{'API calls':22}{baseline.calls:>10}{planned.calls:>10}")
+    print(f"{'articles fetched':22}{baseline.fetched:>10}{planned.fetched:>10}")
+    print(f"{'new articles':22}{baseline.new:>10}{planned.new:>10}")
+    print(f"{'duplicate articles':22}{baseline.duplicates:>10}{planned.duplicates:>10}")
+    print()
+    print(f"calls saved: {baseline.calls - planned.calls}, duplicates saved: {baseline.duplicates - planned.duplicates}"
+          f" (planner's upper bound: {planned.duplicates_saved})")
+
+
+if __name__ == '__main__':
+    main()
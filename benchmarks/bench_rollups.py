@@ -0,0 +1,82 @@
+"""Sentiment Scores page aggregation time: groupbys over the article frame vs. reads of the precomputed rollups.
+
+Also times folding one ingestion-sized delta into the rollups.
+
+    python -m benchmarks.bench_rollups --sizes 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from senticonomy.rollups import SentimentRollups
+
+CATEGORIES = ['TECH', 'SPORTS', 'ENTERTAINMENT', 'POLITICS', 'EDUCATION', 'ENVIRONMENT', 'SCIENCE', 'CRIME',
+              'BUSINESS', 'TRAVEL', 'STYLE & BEAUTY']
+
+
+def articles(n, days, rng):
+    return pd.DataFrame({'date': (pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, days, n), 'D'))
+                                 .strftime('%Y-%m-%d'),
+                         'category': rng.choice(CATEGORIES, n), 'cluster': rng.integers(0, 11, n),
+                         'sentiment_score': rng.uniform(-1, 1, n)})
+
+
+def frame_charts(df):
+    """What the page computed on every render."""
+    df = df.copy()
+    df.groupby('cluster')['sentiment_score'].mean().reset_index()
+    df['date'] = pd.to_datetime(df['date'])
+    df.groupby(['date', 'category'])['sentiment_score'].mean().reset_index()
+    df.groupby('category')['sentiment_score'].mean().reset_index()
+    return df.groupby(['category', 'cluster'])['sentiment_score'].mean().unstack()
+
+
+def rollup_charts(rollups):
+    rollups.rollup('cluster')
+    rollups.rollup(['date', 'category'])
+    rollups.rollup('category')
+    return rollups.rollup(['category', 'cluster']).pivot(index='category', columns='cluster', values='sentiment_score')
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--delta', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'articles':>9} {'groupbys':>10} {'rollups':>9} {'add delta':>10} {'cells':>7}")
+    for size in args.sizes:
+        df = articles(size, args.days, rng)
+        delta = articles(args.delta, args.days, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            rollups = SentimentRollups(os.path.join(tmp, 'rollups.sqlite'))
+            rollups.rebuild(df['date'], df['category'], df['cluster'], df['sentiment_score'], 'v1', 0.05)
+            frame_time, expected = timed(lambda: frame_charts(df))
+            rollup_time, actual = timed(lambda: rollup_charts(rollups))
+            assert np.allclose(expected.to_numpy(), actual.to_numpy(), equal_nan=True)
+            start = time.perf_counter()
+            rollups.add(delta['date'], delta['category'], delta['cluster'], delta['sentiment_score'], 'v1', 0.05)
+            add_time = time.perf_counter() - start
+            cells = len(rollups.frame())
+            rollups.close()
+        print(f"{size:>9} {frame_time * 1000:>8.0f}ms {rollup_time * 1000:>7.0f}ms {add_time * 1000:>8.0f}ms "
+              f"{cells:>7}")
+
+
+if __name__ == '__main__':
+    main()
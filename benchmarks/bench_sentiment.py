@@ -0,0 +1,70 @@
+"""Sentiment scoring: per-row ``polarity_scores`` vs. ``score_texts`` with a cold and a warm score cache.
+
+Also reports what the sidebar paid per input for building a new analyzer.
+
+The warm run is what a restarted dashboard pays; ``--new`` is the fraction of
+texts that are new to the cache on that run (a freshly ingested delta).
+
+    python -m benchmarks.bench_sentiment --sizes 50000 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from benchmarks.bench_streaming_clusters import synthetic_texts
+from senticonomy.sentiment import SENTIMENT_VERSION, SCORE_COLUMNS, score_texts
+from senticonomy.text_cache import TextCache
+
+MOOD = ['good', 'great', 'bad', 'terrible', 'strong', 'weak', 'growth', 'crisis', 'win', 'loss']
+
+
+def corpus(n, rng):
+    texts = synthetic_texts(n, rng, topics=11, vocabulary=20_000, words_per_text=20)
+    return pd.Series([f"{text} {MOOD[i % len(MOOD)]}" for i, text in enumerate(texts)])
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50_000, 200_000])
+    parser.add_argument('--new', type=float, default=0.05)
+    args = parser.parse_args()
+
+    construct_time, _ = timed(lambda: [SentimentIntensityAnalyzer() for _ in range(20)])
+    print(f"new analyzer per sidebar input: {construct_time / 20 * 1000:.0f}ms")
+
+    rng = np.random.default_rng(0)
+    print(f"{'texts':>9} {'per-row':>9} {'cold':>9} {'warm':>9} {'delta':>9}   (delta = warm + {args.new:.0%} new texts)")
+    for size in args.sizes:
+        texts = corpus(size, rng)
+        delta = pd.concat([texts[:int(size * (1 - args.new))], corpus(int(size * args.new), rng) + ' fresh'],
+                          ignore_index=True)
+
+        # Baseline: the dashboard's original per-row apply
+        analyzer = SentimentIntensityAnalyzer()
+        row_time, expected = timed(lambda: pd.DataFrame(
+            texts.apply(analyzer.polarity_scores).tolist())[SCORE_COLUMNS])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TextCache('sentiment', SENTIMENT_VERSION, path=os.path.join(tmp, 'cache.sqlite'))
+            cold_time, cold = timed(lambda: score_texts(texts, cache=cache))
+            warm_time, warm = timed(lambda: score_texts(texts, cache=cache))
+            delta_time, _ = timed(lambda: score_texts(delta, cache=cache))
+            cache.close()
+
+        assert np.array_equal(expected.values, cold.values) and np.array_equal(cold.values, warm.values)
+        print(f"{size:>9} {row_time:>8.1f}s {cold_time:>8.1f}s {warm_time:>8.2f}s {delta_time:>8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
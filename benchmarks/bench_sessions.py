@@ -0,0 +1,122 @@
+"""Dashboard memory under N concurrent sessions: per-session frame copies vs. one shared, memory-mapped frame.
+
+Each session is a thread, as in Streamlit, and renders once while all sessions are alive:
+
+* ``copies``: unpickle the ``st.cache_data`` frame, keep it in session state, convert ``date`` in place
+  and aggregate (the old app)
+* ``shared``: take a ``SharedFrame`` view, convert ``date`` on the view and aggregate; session state only
+  holds the page and filters
+
+Every (mode, sessions) run is a fresh interpreter; RSS is split into anonymous (private heap) and
+file-backed (mapped, shared with other processes through the page cache) memory.
+
+    python -m benchmarks.bench_sessions --rows 200000 --sessions 1 5 20
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_storage import synthetic_cleaned
+from senticonomy.shared_frame import SharedFrame
+
+
+def enriched(rows):
+    rng = np.random.default_rng(0)
+    frame = synthetic_cleaned(rows)
+    frame['short_description_clean'] = frame['short_description'].str.upper()
+    frame['cluster'] = rng.integers(0, 11, rows)
+    for column in ('neg', 'neu', 'pos', 'compound', 'sentiment_score'):
+        frame[column] = rng.uniform(-1, 1, rows)
+    frame['model'] = 'vader'
+    frame['category_cluster'] = frame['category'] + '-' + frame['cluster'].astype(str)
+    return frame
+
+
+def memory():
+    with open('/proc/self/status') as f:
+        fields = dict(line.split(':', 1) for line in f)
+    return {name: int(fields[name].split()[0]) / 1024 for name in ('VmRSS', 'RssAnon', 'RssFile', 'VmHWM')}
+
+
+def render(frame):
+    """What a page render does with the frame."""
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame.groupby(['date', 'category'])['sentiment_score'].mean()
+    return frame.groupby('cluster')['sentiment_score'].mean()
+
+
+def run(mode, sessions, path):
+    """Child process: ``sessions`` concurrent renders; prints memory and time per render as JSON."""
+    if mode == 'copies':
+        blob = pickle.dumps(pd.read_parquet(path))
+    else:
+        shared = SharedFrame(path)
+    baseline = memory()
+    states, seconds = [], []
+    alive = threading.Barrier(sessions + 1)
+
+    def session():
+        start = time.perf_counter()
+        if mode == 'copies':
+            state = {'df': pickle.loads(blob)}
+            render(state['df'])
+        else:
+            state = {'page_view': 'Sentiment Scores', 'filters': {'categories': None}}
+            view = shared.frame()
+            render(view)
+        seconds.append(time.perf_counter() - start)
+        states.append(state)
+        alive.wait()  # stay alive until every session has rendered
+        alive.wait()
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    alive.wait()
+    peak = memory()
+    alive.wait()
+    for thread in threads:
+        thread.join()
+    print(json.dumps({'baseline': baseline, 'peak': peak, 'render_seconds': float(np.mean(seconds))}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        mode, sessions, path = args.child
+        return run(mode, int(sessions), path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frame = enriched(args.rows)
+        paths = {'copies': os.path.join(tmp, 'articles.parquet'), 'shared': os.path.join(tmp, 'articles.arrow')}
+        frame.to_parquet(paths['copies'])
+        SharedFrame.publish(frame, paths['shared'])
+        del frame
+        print(f"{args.rows} rows; memory above the loaded interpreter, MB")
+        print(f"{'mode':<7} {'sessions':>8} {'RSS':>7} {'anon':>7} {'file':>7} {'render':>8}")
+        for mode in ('copies', 'shared'):
+            for sessions in args.sessions:
+                out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_sessions',
+                                      '--child', mode, str(sessions), paths[mode]],
+                                     check=True, capture_output=True, text=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                delta = {name: result['peak'][name] - result['baseline'][name] for name in result['peak']}
+                print(f"{mode:<7} {sessions:>8} {delta['VmRSS']:>7.0f} {delta['RssAnon']:>7.0f} "
+                      f"{delta['RssFile']:>7.0f} {result['render_seconds'] * 1000:>6.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Similar-article lookup latency: brute-force ``cosine_similarity`` scan vs. the persisted similarity index.
+
+Covers both index layouts: the CSC inverted index over raw TF-IDF rows and the
+blocked scan over truncated-SVD embeddings.
+
+    python -m benchmarks.bench_similarity --rows 1000000 --rank 100
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from benchmarks.bench_streaming_clusters import synthetic_texts
+from senticonomy.similarity import SimilarityIndex, top_n, write_index
+
+
+def per_query_ms(search, queries):
+    start = time.perf_counter()
+    results = [search(q) for q in queries]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def compare(name, X, queries, n):
+    with tempfile.TemporaryDirectory() as tmp:
+        articles = pd.DataFrame({'link': [f"https://example.com/{i}" for i in range(X.shape[0])]})
+        write_index(tmp, X, articles)
+        index = SimilarityIndex(tmp)
+        index.search(queries[0], n)  # load the files once
+
+        brute_ms, brute = per_query_ms(lambda q: top_n(cosine_similarity(q, X).ravel(), n), queries)
+        index_ms, found = per_query_ms(lambda q: index.search(q, n)[0], queries)
+    agree = np.mean([len(set(a) & set(b)) / n for a, b in zip(brute, found)])
+    print(f"{name:>12}  brute force {brute_ms:>8.2f} ms/query  index {index_ms:>7.2f} ms/query  "
+          f"({brute_ms / index_ms:.1f}x, {agree:.0%} same top-{n})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--rank', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    texts = synthetic_texts(args.rows, rng)
+    query_texts = synthetic_texts(args.queries, rng)
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+    X = vectorizer.fit_transform(texts)
+    print(f"{args.rows} rows, {X.nnz / args.rows:.1f} non-zero TF-IDF terms per row")
+    compare('tfidf', X, [vectorizer.transform([q]) for q in query_texts], args.top)
+
+    svd = TruncatedSVD(n_components=args.rank, algorithm='randomized', random_state=0).fit(X)
+    E = normalize(svd.transform(X)).astype(np.float32)
+    queries = [normalize(svd.transform(vectorizer.transform([q]))).astype(np.float32) for q in query_texts]
+    compare(f"svd {args.rank}", E, queries, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Cold-load time of the cleaned dataset: full CSV parse vs. Parquet with projection and a date range.
+
+    python -m benchmarks.bench_storage --rows 1000000 --days 30
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from senticonomy import config, storage
+
+CATEGORIES = np.array(list(config.QUERY_KEYWORDS))
+WORDS = np.array('the market rallied after strong growth figures while analysts warned of policy risk'.split())
+
+
+def synthetic_cleaned(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    words = WORDS[rng.integers(0, len(WORDS), size=(rows, 25))]
+    return pd.DataFrame({
+        'link': [f"https://example.com/article/{i}" for i in range(rows)],
+        'headline': [' '.join(w[:8]) for w in words],
+        'category': CATEGORIES[rng.integers(0, len(CATEGORIES), rows)],
+        'short_description': [' '.join(w) for w in words],
+        'authors': [f"Author {i % 211}" for i in range(rows)],
+        'date': (pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D')).strftime('%Y-%m-%d'),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    frame = synthetic_cleaned(args.rows)
+    columns = ['short_description', 'category', 'date']
+    end = pd.Timestamp('2024-12-31')
+    start = end - pd.Timedelta(days=args.days - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_DIR = tmp
+        csv_path = os.path.join(tmp, 'Cleaned_News_DataSet.csv')
+        frame.to_csv(csv_path, index=False)
+        storage.write_dataset(frame, storage.CLEANED_DATASET)
+        del frame
+
+        runs = [
+            ("CSV, all columns", lambda: pd.read_csv(csv_path)),
+            ("Parquet, all columns", lambda: storage.read_dataset(storage.CLEANED_DATASET)),
+            ("Parquet, 3 columns", lambda: storage.read_dataset(storage.CLEANED_DATASET, columns=columns)),
+            (f"Parquet, 3 columns, {args.days} days",
+             lambda: storage.read_dataset(storage.CLEANED_DATASET, columns=columns, start=start, end=end)),
+        ]
+        for label, fn in runs:
+            seconds, rows = timed(fn)
+            print(f"{label:32} {seconds:7.3f}s  {rows:>9} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Daily cluster update cost on a growing corpus: full KMeans refit vs. streaming ``partial_fit`` update.
+
+Both strategies share one vectorizer fitted on the first day, so their inertia
+(sum of squared distances of every article so far to its centroid) is
+comparable. ``stable`` is the share of previously seen articles that keep their
+cluster ID after the update.
+
+    python -m benchmarks.bench_streaming_clusters --days 10 --per-day 20000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from senticonomy.streaming_clusters import update_kmeans
+
+N_CLUSTERS = 11
+
+
+def word(i):
+    """Letters-only token for word id ``i`` (digits would be stripped by the preprocessing)."""
+    letters = ''
+    while True:
+        i, r = divmod(i, 26)
+        letters += chr(97 + r)
+        if i == 0:
+            return 'x' + letters
+
+
+def synthetic_texts(n, rng, topics=N_CLUSTERS, vocabulary=5000, words_per_text=20):
+    """Texts mixing words of one topic (a slice of the vocabulary) with common words."""
+    topic = rng.integers(0, topics, n)
+    own = rng.zipf(1.3, (n, words_per_text)) % (vocabulary // topics) + (topic * (vocabulary // topics))[:, None]
+    common = rng.zipf(1.3, (n, words_per_text)) % vocabulary
+    words = np.where(rng.random((n, words_per_text)) < 0.7, own, common)
+    return [' '.join(word(w) for w in row) for row in words]
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=10)
+    parser.add_argument('--per-day', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectorizer = TfidfVectorizer(max_features=1000)
+    X = vectorizer.fit_transform(synthetic_texts(args.per_day, rng))
+    kmeans = KMeans(n_clusters=N_CLUSTERS, random_state=0).fit(X)
+    full_labels = stream_labels = kmeans.labels_
+    centers, sizes = kmeans.cluster_centers_, np.bincount(kmeans.labels_, minlength=N_CLUSTERS).astype(float)
+
+    print(f"{'rows':>9}  {'full fit':>9} {'peak MB':>8} {'inertia':>10} {'stable':>7}   "
+          f"{'stream':>9} {'peak MB':>8} {'inertia':>10} {'stable':>7}")
+    for _ in range(1, args.days):
+        new = vectorizer.transform(synthetic_texts(args.per_day, rng))
+        X = sp.vstack([X, new], format='csr')
+
+        full, full_time, full_peak = measure(lambda: KMeans(n_clusters=N_CLUSTERS, random_state=0).fit(X))
+        (stream, new_labels), stream_time, stream_peak = measure(
+            lambda: update_kmeans(centers, sizes, new, args.batch_size))
+        centers = stream.cluster_centers_
+        sizes = sizes + np.bincount(new_labels, minlength=N_CLUSTERS)
+
+        old = len(full_labels)
+        full_stable = (full.labels_[:old] == full_labels).mean()
+        stream_all = stream.predict(X)
+        stream_stable = (stream_all[:old] == stream_labels).mean()
+        full_labels, stream_labels = full.labels_, stream_all
+        print(f"{X.shape[0]:>9}  {full_time:>8.2f}s {full_peak:>8.1f} {full.inertia_:>10.1f} {full_stable:>7.1%}   "
+              f"{stream_time:>8.2f}s {stream_peak:>8.1f} {-stream.score(X):>10.1f} {stream_stable:>7.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""KMeans on raw TF-IDF vs. on truncated-SVD embeddings: fit/predict time and silhouette.
+
+Silhouette is computed on the same random sample for every configuration, in
+the raw TF-IDF space (so the label sets are comparable) and in the space the
+model clustered in.
+
+    python -m benchmarks.bench_svd --rows 100000 --ranks 50 100 200
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import silhouette_score
+from sklearn.pipeline import make_pipeline
+
+from benchmarks.bench_streaming_clusters import N_CLUSTERS, synthetic_texts
+from senticonomy.embeddings import reduction_pipeline
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--ranks', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--sample', type=int, default=5_000)
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.rows, np.random.default_rng(0))
+    sample = np.random.default_rng(1).choice(args.rows, min(args.sample, args.rows), replace=False)
+    tfidf = TfidfVectorizer(stop_words='english', max_features=1000)
+    raw = tfidf.fit_transform(texts)
+
+    print(f"{args.rows} rows, {N_CLUSTERS} clusters, silhouette on {len(sample)} rows")
+    print(f"{'features':>10}  {'vectorize':>10}  {'kmeans fit':>10}  {'predict':>9}  {'sil. tfidf':>10}  {'sil. own':>9}")
+    for rank in [0] + args.ranks:
+        vectorizer = reduction_pipeline(rank=rank) if rank else make_pipeline(TfidfVectorizer(stop_words='english',
+                                                                                              max_features=1000))
+        X, vectorize_time = timed(lambda: vectorizer.fit_transform(texts))
+        kmeans, fit_time = timed(lambda: KMeans(n_clusters=N_CLUSTERS, random_state=0).fit(X))
+        _, predict_time = timed(lambda: kmeans.predict(X))
+        labels = kmeans.labels_[sample]
+        on_tfidf = silhouette_score(raw[sample], labels)
+        own = silhouette_score(X[sample], labels)
+        label = f"svd {rank}" if rank else 'tfidf'
+        print(f"{label:>10}  {vectorize_time:>9.2f}s  {fit_time:>9.2f}s  {predict_time:>8.2f}s  "
+              f"{on_tfidf:>10.3f}  {own:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
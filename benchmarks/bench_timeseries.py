@@ -0,0 +1,75 @@
+"""Sentiment time-series queries: ``SentimentSeries`` vs. pandas rolling/ewm over the daily frame, by history length.
+
+Each query asks for the last 90 days of a 30-day rolling mean and of a 7-day
+half-life EWMA for all categories. "append" is folding one new day of cells
+into a series whose indices were already computed.
+
+    python -m benchmarks.bench_timeseries --years 1 10 50
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_rollups import CATEGORIES
+from senticonomy.timeseries import SentimentSeries
+
+
+def daily_cells(days, rng, start='1980-01-01'):
+    dates = pd.date_range(start, periods=days, freq='D')
+    index = pd.MultiIndex.from_product([dates, CATEGORIES], names=['date', 'category'])
+    counts = rng.poisson(20, len(index))
+    return pd.DataFrame({'total': rng.normal(0, 0.3, len(index)) * counts, 'count': counts},
+                        index=index).reset_index()
+
+
+def pandas_queries(cells, start):
+    wide = cells.pivot(index='date', columns='category', values=['total', 'count'])
+    rolling = wide['total'].rolling(30, min_periods=1).sum() / wide['count'].rolling(30, min_periods=1).sum()
+    ewma = wide['total'].ewm(halflife=7).mean() / wide['count'].ewm(halflife=7).mean()
+    return rolling[rolling.index >= start], ewma[ewma.index >= start]
+
+
+def engine_queries(series, start):
+    return series.rolling_mean(30, start=start), series.ewma(7, start=start)
+
+
+def best_ms(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - begin)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 10, 50])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'days':>7} {'pandas':>10} {'engine':>9} {'append':>9}")
+    for years in args.years:
+        cells = daily_cells(years * 365, rng)
+        start = cells['date'].max() - pd.Timedelta(days=89)
+        series = SentimentSeries.from_cells(cells)
+        pandas_ms, expected = best_ms(lambda: pandas_queries(cells, start))
+        engine_queries(series, start)
+        engine_ms, actual = best_ms(lambda: engine_queries(series, start))
+        for want, got in zip(expected, actual):
+            assert np.allclose(want.to_numpy(), got.to_numpy(), equal_nan=True)
+
+        appends = []
+        for day in range(20):
+            new = daily_cells(1, rng, start=cells['date'].max() + pd.Timedelta(days=day + 1))
+            begin = time.perf_counter()
+            series.add(new)
+            engine_queries(series, start)
+            appends.append(time.perf_counter() - begin)
+        print(f"{years * 365:>7} {pandas_ms:>8.1f}ms {engine_ms:>7.2f}ms {np.median(appends) * 1000:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Transformer sentiment throughput (texts/s): the default ``pipeline`` vs. each ``SentimentEngine`` backend.
+
+Texts are descriptions from the cleaned dataset when it exists, otherwise
+synthetic sentences of news-like length. Labels of every backend are compared
+with the full-precision model. The ``onnx`` backend needs
+``optimum[onnxruntime]`` and is skipped when it is not installed.
+
+    python -m benchmarks.bench_transformer --texts 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from senticonomy import storage
+from senticonomy.transformer_sentiment import BACKENDS, SentimentEngine
+
+WORDS = ['market', 'shares', 'rally', 'team', 'wins', 'final', 'storm', 'damage', 'film', 'praised', 'critics',
+         'election', 'results', 'delayed', 'students', 'protest', 'new', 'record', 'losses', 'growth']
+
+
+def corpus(n, seed=0):
+    if storage.exists(storage.CLEANED_DATASET):
+        for batch in storage.iter_batches(storage.CLEANED_DATASET, columns=['short_description'], batch_size=n):
+            texts = batch['short_description'].dropna().astype(str).tolist()
+            if len(texts) >= n:
+                return texts[:n]
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(5, 60, size=n)
+    return [' '.join(rng.choice(WORDS, size=length)) for length in lengths]
+
+
+def throughput(score, texts):
+    score(texts[:8])  # warm-up (model load, first allocations)
+    start = time.perf_counter()
+    labels = score(texts)
+    return len(texts) / (time.perf_counter() - start), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--max-length', type=int, default=None)
+    args = parser.parse_args()
+
+    texts = corpus(args.texts)
+    print(f"{len(texts)} texts, mean {np.mean([len(text.split()) for text in texts]):.0f} words")
+
+    from transformers import pipeline
+    engine = SentimentEngine(backend='pytorch', batch_size=args.batch_size, max_length=args.max_length)
+    baseline = pipeline("sentiment-analysis", model=engine.model_name, revision=engine.revision)
+    rate, expected = throughput(lambda batch: [r['label'] for r in baseline(batch)], texts)
+    print(f"{'pipeline':>10} {rate:>9.1f} texts/s")
+
+    for backend in BACKENDS:
+        engine = SentimentEngine(backend=backend, batch_size=args.batch_size, max_length=args.max_length)
+        try:
+            rate, labels = throughput(lambda batch: [r['label'] for r in engine.predict(batch)], texts)
+        except ImportError as exc:
+            print(f"{backend:>10}  skipped ({exc})")
+            continue
+        agreement = np.mean([a == b for a, b in zip(labels, expected)])
+        print(f"{backend:>10} {rate:>9.1f} texts/s  ({agreement:.1%} labels agree with the pipeline, "
+              f"load {engine.load_seconds:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Reusable building blocks for the Senticonomy news pipeline and dashboard."""
@@ -0,0 +1,450 @@
+"""Immutable artifact bundles that dashboard worker processes memory-map and share.
+
+Every Streamlit replica on a host used to read the dataset, preprocess it,
+predict clusters and score sentiment on its own at startup. A bundle holds the
+results once, on disk, in formats that map straight into memory:
+
+* ``segments/<name>/``: the articles, in one or more segments of consecutive rows, each with
+
+  * ``articles.arrow``: the enriched articles with compact column types (Arrow IPC; all segments are read
+    as one ``SharedFrame``, see ``senticonomy.compact``)
+  * ``features.npy``, or ``features_{data,indices,indptr}.npy`` for sparse TF-IDF:
+    the rows KMeans assigned clusters from
+  * ``coordinates.npy``: 2-D cluster map positions (reduced models only)
+  * ``cells.arrow``: the sentiment rollup cells of the segment's articles
+
+* ``centroids.npy``: the KMeans centroids
+* ``cells.arrow``: the sentiment rollup cells of all articles
+* ``manifest.json``: cluster model version, cascade threshold, segments, shapes, build statistics
+
+Attaching only opens and maps these files, so a worker starts in milliseconds,
+and every process on the host shares the same physical pages through the page
+cache. Bundles live in ``bundles/<version>/`` beside a ``CURRENT`` pointer,
+like model versions. A publish writes a staging directory, renames it into
+place and then switches ``CURRENT`` atomically. Workers read ``CURRENT`` on each
+rerun and attach to a new bundle as soon as one appears. Ingestion publishes a
+bundle extended with the new articles; a full build runs only when the cluster
+model or cascade threshold changes in a way a streaming update does not cover.
+
+An extension writes the new articles as one more segment: the existing segments
+are hard-linked into the new version rather than rewritten, and the bundle's
+cells are the previous cells plus the new segment's. A segment no larger than
+the one after it is merged with it (like the carries of a binary counter), so a
+bundle has O(log n) segments and each article is rewritten O(log n) times over
+its life instead of on every ingestion run. Segments whose newest article is
+older than the dashboard window are dropped whole, their cells subtracted.
+Builds and appends hold the store's lock file, so of several workers starting
+together one builds and the others attach to its bundle::
+
+    python -m senticonomy.bundle
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import scipy.sparse as sp
+
+from senticonomy import config, storage
+from senticonomy.cascade import cascade_scores, configured_threshold
+from senticonomy.compact import ARTICLE_SCHEMA, compact, memory_report
+from senticonomy.model_store import CURRENT, ModelStore
+from senticonomy.rollups import cells, combine_cells
+from senticonomy.sentiment import polarity_batch, score_cache
+from senticonomy.shared_frame import SharedFrame
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MANIFEST = 'manifest.json'
+LOCK = '.lock'
+SEGMENTS = 'segments'
+SPARSE_PARTS = ('data', 'indices', 'indptr')
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def enrich(frame, model, threshold, vader_compute=polarity_batch):
+    """``frame`` (with ``short_description_clean``) plus cluster, cascade sentiment and ``category_cluster``.
+
+    Returns ``(articles, features)``, where ``features`` are the rows the clusters were predicted from.
+    """
+    features = model.features(frame['short_description_clean'])
+    articles = frame.reset_index(drop=True)
+    articles['cluster'] = model.kmeans.predict(features)
+    scores = cascade_scores(articles['short_description'].astype(str), threshold, vader_compute=vader_compute)
+    articles = pd.concat([articles, scores.reset_index(drop=True)], axis=1)
+    articles['category_cluster'] = articles['category'].astype(str) + "-" + articles['cluster'].astype(str)
+    return articles, features
+
+
+def _save_features(path, features):
+    if sp.issparse(features):
+        features = sp.csr_matrix(features)
+        for part in SPARSE_PARTS:
+            np.save(os.path.join(path, f"features_{part}.npy"), getattr(features, part))
+        return {'sparse': True, 'shape': list(features.shape)}
+    features = np.asarray(features, dtype=np.float32)
+    np.save(os.path.join(path, 'features.npy'), features)
+    return {'sparse': False, 'shape': list(features.shape)}
+
+
+def _compact_like(articles, schema=None):
+    """``compact`` of ``articles``, keeping the string/category choice of an existing segment's Arrow
+    ``schema`` (a small batch would otherwise store low-cardinality columns as strings, or the reverse)."""
+    if schema is None:
+        return compact(articles)
+    kinds = {column: 'string' if kind == 'category' and column in schema.names
+             and not pa.types.is_dictionary(schema.field(column).type) else kind
+             for column, kind in ARTICLE_SCHEMA.items()}
+    articles = compact(articles, {column: kind for column, kind in kinds.items() if kind != 'category'})
+    return compact(articles, {column: kind for column, kind in kinds.items() if kind == 'category'},
+                   category_ratio=1.0)
+
+
+def _write_segment(root, articles, features, coordinates, segment_cells, schema=None):
+    """Write one segment of ``root`` and return its manifest entry."""
+    name = uuid.uuid4().hex[:16]
+    path = os.path.join(root, SEGMENTS, name)
+    os.makedirs(path)
+    articles = _compact_like(articles, schema)
+    SharedFrame.publish(articles, os.path.join(path, 'articles.arrow'))
+    features_info = _save_features(path, features)
+    if coordinates is not None:
+        np.save(os.path.join(path, 'coordinates.npy'), np.asarray(coordinates, dtype=np.float32))
+    SharedFrame.publish(segment_cells, os.path.join(path, 'cells.arrow'))
+    dates = pd.to_datetime(articles['date'], errors='coerce').dropna()
+    return {'name': name, 'rows': len(articles), 'features': features_info,
+            'first': dates.min().strftime('%Y-%m-%d') if len(dates) else None,
+            'last': dates.max().strftime('%Y-%m-%d') if len(dates) else None}
+
+
+def _link_segment(source, target):
+    """Hard-link the files of segment directory ``source`` into ``target`` (copied where links fail)."""
+    os.makedirs(target)
+    for name in os.listdir(source):
+        try:
+            os.link(os.path.join(source, name), os.path.join(target, name))
+        except OSError:
+            shutil.copy2(os.path.join(source, name), os.path.join(target, name))
+
+
+class Segment:
+    """Consecutive articles of a bundle and their features; arrays are memory-mapped on first access."""
+
+    def __init__(self, path, info):
+        self.path = path
+        self.info = info
+        self._loaded = {}
+
+    def _array(self, name):
+        if name not in self._loaded:
+            self._loaded[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self._loaded[name]
+
+    @property
+    def articles_path(self):
+        return os.path.join(self.path, 'articles.arrow')
+
+    @property
+    def features(self):
+        """A dense memmap or a CSR matrix over memmaps."""
+        if not self.info['features']['sparse']:
+            return self._array('features')
+        if 'features' not in self._loaded:
+            data, indices, indptr = (self._array(f"features_{part}") for part in SPARSE_PARTS)
+            self._loaded['features'] = sp.csr_matrix((data, indices, indptr),
+                                                     shape=tuple(self.info['features']['shape']), copy=False)
+        return self._loaded['features']
+
+    @property
+    def has_coordinates(self):
+        return os.path.exists(os.path.join(self.path, 'coordinates.npy'))
+
+    @property
+    def coordinates(self):
+        return self._array('coordinates')
+
+    def cells(self):
+        return SharedFrame(os.path.join(self.path, 'cells.arrow')).frame()
+
+
+def _merge_segments(root, infos, schema):
+    """Replace consecutive segments ``infos`` of ``root`` by one segment with their rows; return its entry."""
+    segments = [Segment(os.path.join(root, SEGMENTS, info['name']), info) for info in infos]
+    frames = [SharedFrame(segment.articles_path).frame() for segment in segments]
+    # Categories differ between the segments; the merged segment is compacted again
+    articles = pd.concat([frame.astype({column: object for column in frame.columns
+                                        if isinstance(frame[column].dtype, pd.CategoricalDtype)})
+                          for frame in frames], ignore_index=True)
+    parts = [segment.features for segment in segments]
+    features = sp.vstack(parts, format='csr') if sp.issparse(parts[0]) else np.vstack(parts)
+    coordinates = np.concatenate([segment.coordinates for segment in segments]) \
+        if segments[0].has_coordinates else None
+    info = _write_segment(root, articles, features, coordinates,
+                          combine_cells([segment.cells() for segment in segments]), schema)
+    paths = [segment.path for segment in segments]
+    del segments, frames, parts, features, coordinates
+    for path in paths:
+        shutil.rmtree(path)
+    return info
+
+
+class Bundle:
+    """One published bundle; arrays and frames are memory-mapped on first access."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+        self.model_version = self.manifest['model_version']
+        self.threshold = self.manifest['threshold']
+        # Bundles written before segments keep their article files at the top level
+        self.segments = [Segment(os.path.join(path, SEGMENTS, info['name']), info)
+                         for info in self.manifest['segments']] if 'segments' in self.manifest else \
+            [Segment(path, self.manifest)]
+        self._loaded = {}
+
+    def matches(self, model_version, threshold):
+        """Whether the bundle was built with cluster model ``model_version`` and cascade ``threshold``."""
+        return self.model_version == str(model_version) and self.threshold == float(threshold)
+
+    @property
+    def articles(self):
+        """``SharedFrame`` of the enriched articles of all segments."""
+        if 'articles' not in self._loaded:
+            self._loaded['articles'] = SharedFrame([segment.articles_path for segment in self.segments])
+        return self._loaded['articles']
+
+    @property
+    def features(self):
+        """Cluster features of the articles, row-aligned: a dense memmap or a CSR matrix over memmaps
+        (stacked into memory when there are several segments)."""
+        if 'features' not in self._loaded:
+            parts = [segment.features for segment in self.segments]
+            self._loaded['features'] = parts[0] if len(parts) == 1 else \
+                sp.vstack(parts, format='csr') if sp.issparse(parts[0]) else np.vstack(parts)
+        return self._loaded['features']
+
+    @property
+    def has_coordinates(self):
+        return self.segments[0].has_coordinates
+
+    @property
+    def coordinates(self):
+        """2-D cluster map position of each article."""
+        if 'coordinates' not in self._loaded:
+            parts = [segment.coordinates for segment in self.segments]
+            self._loaded['coordinates'] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return self._loaded['coordinates']
+
+    @property
+    def centroids(self):
+        if 'centroids' not in self._loaded:
+            self._loaded['centroids'] = np.load(os.path.join(self.path, 'centroids.npy'), mmap_mode='r')
+        return self._loaded['centroids']
+
+    def cells(self):
+        """Sentiment rollup cells (``date``, ``category``, ``cluster``, sums and counts)."""
+        if 'cells' not in self._loaded:
+            self._loaded['cells'] = SharedFrame(os.path.join(self.path, 'cells.arrow'))
+        return self._loaded['cells'].frame()
+
+
+class BundleStore:
+    """Directory of bundles plus the ``CURRENT`` pointer."""
+
+    def __init__(self, root=None):
+        self.root = config.BUNDLE_DIR if root is None else root
+        os.makedirs(self.root, exist_ok=True)
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        """Published bundles, oldest first (``.<version>.tmp`` staging directories are not bundles yet)."""
+        return sorted(name for name in os.listdir(self.root)
+                      if not name.startswith('.') and os.path.isfile(os.path.join(self.root, name, MANIFEST)))
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Exclusive lock across processes and threads for building or appending; not reentrant."""
+        with open(os.path.join(self.root, LOCK), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:  # LK_LOCK gives up after ten seconds
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def load(self, version=None):
+        """``Bundle`` for ``version`` (default: current), or ``None`` if nothing is published."""
+        version = version or self.current_version()
+        if version is None or not os.path.isfile(os.path.join(self.root, version, MANIFEST)):
+            return None
+        return Bundle(os.path.join(self.root, version))
+
+    def _staging(self):
+        version = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        staging = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(os.path.join(staging, SEGMENTS))
+        return version, staging
+
+    def _finish(self, version, staging, segments, all_cells, model, threshold, stats):
+        """Write the bundle-level files of ``staging``, rename it into place and switch ``CURRENT`` to it."""
+        np.save(os.path.join(staging, 'centroids.npy'), np.asarray(model.kmeans.cluster_centers_))
+        SharedFrame.publish(all_cells, os.path.join(staging, 'cells.arrow'))
+        rows = sum(segment['rows'] for segment in segments)
+        features_info = {'sparse': segments[0]['features']['sparse'],
+                         'shape': [rows, segments[0]['features']['shape'][1]]}
+        manifest = {'version': version, 'model_version': model.version, 'threshold': float(threshold),
+                    'rows': rows, 'features': features_info, 'segments': segments, 'stats': stats or {},
+                    'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')}
+        _write_atomic(os.path.join(staging, MANIFEST), json.dumps(manifest, indent=2))
+        os.replace(staging, os.path.join(self.root, version))
+        _write_atomic(os.path.join(self.root, CURRENT), version)
+        self.prune()
+        return self.load(version)
+
+    def publish(self, articles, features, model, threshold, stats=None):
+        """Write a bundle of enriched ``articles`` and their ``features``, switch ``CURRENT`` to it and return it."""
+        version, staging = self._staging()
+        article_cells = cells(articles['date'], articles['category'], articles['cluster'], articles['sentiment_score'])
+        coordinates = model.project(np.asarray(features)) if model.reduced else None
+        segment = _write_segment(staging, articles, features, coordinates, article_cells)
+        return self._finish(version, staging, [segment], article_cells, model, threshold, stats)
+
+    def append(self, articles, features, model, threshold, start=None):
+        """Publish the current bundle extended with new enriched ``articles`` and their ``features``.
+
+        New rows dated before ``start`` are dropped, and so are existing segments with no row from ``start`` on.
+        Returns ``None`` without publishing when there is no current bundle, when it predates segments, or when
+        it was built for another threshold or for a model version that is neither ``model``'s nor its streaming
+        parent; the next dashboard worker then builds a fresh one.
+        """
+        with self.lock():
+            return self._append(articles, features, model, threshold, start)
+
+    def _append(self, articles, features, model, threshold, start):
+        current = self.load()
+        if current is None or 'segments' not in current.manifest or current.threshold != float(threshold) or \
+                current.model_version not in (model.version, model.metadata.get('parent')):
+            return None
+        schema = current.articles.table.schema
+        if set(schema.names) - set(articles.columns):
+            return None
+        articles = articles[schema.names].reset_index(drop=True)
+        start = None if start is None else pd.Timestamp(start).strftime('%Y-%m-%d')
+        if start is not None:
+            keep = (pd.to_datetime(articles['date'], errors='coerce') >= pd.Timestamp(start)).to_numpy()
+            articles, features = articles[keep].reset_index(drop=True), features[keep]
+
+        version, staging = self._staging()
+        segments, dropped = [], []
+        for segment in current.segments:
+            if start is not None and segment.info['last'] is not None and segment.info['last'] < start:
+                dropped.append(segment.cells())
+                continue
+            _link_segment(segment.path, os.path.join(staging, SEGMENTS, segment.info['name']))
+            segments.append(segment.info)
+        added = []
+        if len(articles):
+            added.append(cells(articles['date'], articles['category'], articles['cluster'],
+                               articles['sentiment_score']))
+            coordinates = model.project(np.asarray(features)) if model.reduced else None
+            segments.append(_write_segment(staging, articles, features, coordinates, added[0], schema))
+        if not segments:
+            shutil.rmtree(staging)
+            return None
+        while len(segments) > 1 and segments[-2]['rows'] <= segments[-1]['rows']:
+            segments[-2:] = [_merge_segments(staging, segments[-2:], schema)]
+        return self._finish(version, staging, segments, combine_cells([current.cells()] + added, dropped),
+                            model, threshold, dict(current.manifest['stats'], appended=len(articles)))
+
+    def prune(self, keep=None):
+        """Delete the oldest bundles beyond ``keep``, never the current one.
+
+        Workers that still map a deleted bundle keep reading it until they attach to a newer one.
+        """
+        keep = config.BUNDLE_KEEP_VERSIONS if keep is None else keep
+        current = self.current_version()
+        old = [v for v in self.versions() if v != current]
+        for version in old[:max(0, len(old) - max(0, keep - 1))]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+
+def build(frame, model, threshold=None, store=None, vader_compute=polarity_batch, stats=None):
+    """Enrich a preprocessed article ``frame`` with ``model`` and publish it as the current bundle.
+
+    Callers hold ``store.lock()`` when other workers may build at the same time.
+    """
+    threshold = configured_threshold() if threshold is None else threshold
+    store = BundleStore() if store is None else store
+    articles, features = enrich(frame, model, threshold, vader_compute)
+    report = memory_report(articles, compact(articles)).loc['total']
+    stats = dict(stats or {}, sentiment=score_cache().stats(),
+                 memory={'bytes_before': int(report['bytes_before']), 'bytes_after': int(report['bytes_after'])})
+    return store.publish(articles, features, model, threshold, stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=config.DASHBOARD_DAYS, help="date range (0 = everything)")
+    args = parser.parse_args()
+
+    from senticonomy.parallel import polarity_parallel, preprocess_parallel
+    from senticonomy.preprocessing import PREPROCESS_VERSION
+    from senticonomy.text_cache import cached_apply, shared_cache
+
+    start_time = time.perf_counter()
+    model = ModelStore().load()
+    if model is None:
+        raise SystemExit("No cluster model stored yet: retrain from the dashboard first")
+    start, end = storage.date_range(args.days)
+    frame = storage.read_dataset(storage.CLEANED_DATASET, columns=config.DASHBOARD_COLUMNS, start=start, end=end)
+    frame = frame.drop_duplicates(subset='short_description').dropna(subset=['short_description'])
+    preprocess_cache = shared_cache('preprocess', PREPROCESS_VERSION)
+    frame['short_description_clean'] = cached_apply(frame['short_description'].astype(str), preprocess_parallel,
+                                                    preprocess_cache)
+    store = BundleStore()
+    with store.lock():
+        bundle = build(frame, model, store=store, vader_compute=polarity_parallel,
+                       stats={'preprocess': preprocess_cache.stats()})
+    print(f"Bundle {bundle.version}: {bundle.manifest['rows']} articles, model {bundle.model_version}, "
+          f"threshold {bundle.threshold}, built in {time.perf_counter() - start_time:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
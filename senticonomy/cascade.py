@@ -0,0 +1,168 @@
+"""VADER -> transformer sentiment cascade.
+
+Every article is scored by VADER, which is cheap and cached. Only ambiguous
+articles are rescored by the transformer: those whose ``|compound|`` falls below
+the cascade threshold, i.e. near-neutral or low-confidence lexicon scores. The
+``model`` column records which model produced each ``sentiment_score``. A
+transformer score is the positive minus the negative class probability, so it
+lies in [-1, 1] like VADER's compound.
+
+The tuning sweep scores a sample of the corpus with both models. For each
+candidate threshold it reports the share of articles routed to the
+transformer, the resulting throughput and the agreement with transformer-only
+labels. The recommended threshold is the cheapest one that reaches
+``CASCADE_TARGET_AGREEMENT``::
+
+    python -m senticonomy.cascade --sample 5000
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from senticonomy import config, storage
+from senticonomy.sentiment import polarity_batch, score_texts
+from senticonomy.transformer_sentiment import BACKENDS, sentiment_engine
+
+# Threshold used while no tuning report exists: VADER only, so dashboard starts and ingestion runs do not load
+# the transformer until a tuning run (or CASCADE_THRESHOLD) turns the cascade on
+DEFAULT_THRESHOLD = 0.0
+THRESHOLDS = [0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.75, 1.01]
+
+
+def transformer_polarity(frame):
+    """Positive minus negative class probability of a ``SentimentEngine.score_texts`` frame."""
+    columns = {str(label).upper()[:3]: label for label in frame.columns}
+    return frame[columns['POS']] - frame[columns['NEG']]
+
+
+def cascade_scores(texts, threshold=None, engine=None, vader_compute=polarity_batch):
+    """VADER ``SCORE_COLUMNS`` plus ``sentiment_score`` and ``model`` for ``texts`` (a Series).
+
+    Rows with ``|compound| < threshold`` take their ``sentiment_score`` from the transformer.
+    """
+    threshold = configured_threshold() if threshold is None else threshold
+    scores = score_texts(texts, vader_compute)
+    scores['sentiment_score'] = scores['compound']
+    scores['model'] = 'vader'
+    ambiguous = (scores['compound'].abs() < threshold).to_numpy()
+    if ambiguous.any():
+        engine = sentiment_engine() if engine is None else engine
+        rescored = engine.score_texts(texts[ambiguous].astype(str))
+        scores.loc[ambiguous, 'sentiment_score'] = transformer_polarity(rescored).to_numpy()
+        scores.loc[ambiguous, 'model'] = 'transformer'
+    return scores
+
+
+def sweep(compound, polarity, vader_seconds, transformer_seconds, thresholds=THRESHOLDS,
+          target_agreement=None):
+    """Trade-off report for VADER ``compound`` and transformer ``polarity`` scores of the same sample.
+
+    ``*_seconds`` are the uncached times to score the whole sample with each model.
+    """
+    target_agreement = config.CASCADE_TARGET_AGREEMENT if target_agreement is None else target_agreement
+    compound, polarity = np.asarray(compound), np.asarray(polarity)
+    n = len(compound)
+    reference = polarity > 0
+    rows = []
+    for threshold in thresholds:
+        routed = np.abs(compound) < threshold
+        cascade = np.where(routed, polarity, compound)
+        seconds = vader_seconds + transformer_seconds * routed.mean()
+        rows.append({'threshold': threshold, 'routed': float(routed.mean()),
+                     'agreement': float(np.mean((cascade > 0) == reference)),
+                     'texts_per_second': n / seconds if seconds else 0.0})
+    reached = [row for row in rows if row['agreement'] >= target_agreement]
+    best = min(reached, key=lambda row: row['routed']) if reached else max(rows, key=lambda row: row['agreement'])
+    return {'created': datetime.datetime.now(datetime.timezone.utc).isoformat(), 'sample_rows': n,
+            'target_agreement': target_agreement, 'vader_texts_per_second': n / vader_seconds,
+            'transformer_texts_per_second': n / transformer_seconds, 'thresholds': rows,
+            'recommended_threshold': best['threshold']}
+
+
+def sample_texts(size, dataset=storage.CLEANED_DATASET, seed=0):
+    """Uniform random sample of ``size`` distinct descriptions of ``dataset``, streamed chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    keys, texts = np.empty(0), []
+    for batch in storage.iter_batches(dataset, columns=['short_description'], use_threads=False):
+        batch_texts = batch['short_description'].dropna().astype(str).drop_duplicates().tolist()
+        # Bottom-k of uniform random keys is a uniform sample of everything seen so far
+        keys = np.concatenate([keys, rng.random(len(batch_texts))])
+        texts.extend(batch_texts)
+        if len(texts) > size:
+            keep = np.argsort(keys)[:size]
+            keys, texts = keys[keep], [texts[i] for i in keep]
+    return pd.Series(texts, dtype=object)
+
+
+def tune(texts, engine=None, thresholds=THRESHOLDS, target_agreement=None):
+    """Score ``texts`` with both models (uncached, to measure their cost) and sweep ``thresholds``."""
+    engine = sentiment_engine() if engine is None else engine
+    start = time.perf_counter()
+    compound = [scores['compound'] for scores in polarity_batch(texts)]
+    vader_seconds = time.perf_counter() - start
+
+    engine.load()
+    start = time.perf_counter()
+    probs = engine.probabilities(texts)
+    transformer_seconds = time.perf_counter() - start
+    polarity = transformer_polarity(pd.DataFrame(probs, columns=engine.labels))
+
+    report = sweep(compound, polarity, vader_seconds, transformer_seconds, thresholds, target_agreement)
+    report['backend'] = engine.backend
+    return report
+
+
+def write_report(report, path=None):
+    path = config.CASCADE_REPORT if path is None else path
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_report(path=None):
+    path = config.CASCADE_REPORT if path is None else path
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def configured_threshold(path=None, default=DEFAULT_THRESHOLD):
+    """``CASCADE_THRESHOLD`` when set, else the threshold recommended by the last tuning run, else ``default``."""
+    if config.CASCADE_THRESHOLD is not None:
+        return config.CASCADE_THRESHOLD
+    report = read_report(path)
+    return float(report['recommended_threshold']) if report else default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sample', type=int, default=5000)
+    parser.add_argument('--backend', choices=BACKENDS, default=None)
+    parser.add_argument('--target', type=float, default=None, help="agreement the recommendation must reach")
+    args = parser.parse_args()
+
+    texts = sample_texts(args.sample)
+    report = tune(texts, sentiment_engine(args.backend), target_agreement=args.target)
+    write_report(report)
+    print(f"VADER {report['vader_texts_per_second']:.0f} texts/s, transformer ({report['backend']}) "
+          f"{report['transformer_texts_per_second']:.0f} texts/s on {report['sample_rows']} sampled rows")
+    for row in report['thresholds']:
+        print(f"|compound| < {row['threshold']:<5}  routed {row['routed']:>6.1%}  agreement {row['agreement']:>6.1%}  "
+              f"{row['texts_per_second']:>9.0f} texts/s")
+    print(f"Recommended threshold: {report['recommended_threshold']} "
+          f"(target agreement {report['target_agreement']:.0%})")
+
+
+if __name__ == '__main__':
+    main()
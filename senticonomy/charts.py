@@ -0,0 +1,122 @@
+"""Server-side reduction of chart data before it reaches Plotly.
+
+Every point of a Plotly figure is serialized to JSON and rendered in the
+browser, so figures built from raw rows grow with the corpus. These helpers
+shrink the data to a fixed budget first:
+
+* ``downsample``: Largest-Triangle-Three-Buckets per line. It keeps the points
+  that carry the shape of a time series, not every n-th point.
+* ``box_summary`` / ``box_figure``: quantiles and whiskers per group, drawn
+  from precomputed statistics instead of ``points="all"``.
+* ``grid_bins``: mean value and count per lat/lon grid cell for maps.
+
+``PayloadReport`` records the JSON size of each figure a page sends.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def lttb(x, y, n_out):
+    """Positions of the ``n_out`` points that Largest-Triangle-Three-Buckets keeps of ``x``, ``y`` (sorted by x)."""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # First and last points are kept; the rest is split into n_out - 2 buckets
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        # Twice the area of the triangle (previous kept point, candidate, mean of the next bucket)
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(frame, x, y, budget, group=None):
+    """Rows of ``frame`` kept by LTTB, at most about ``budget`` points in total (split evenly across ``group``)."""
+    frame = frame.dropna(subset=[y]).sort_values(x)
+    if len(frame) <= budget:
+        return frame
+    groups = [frame] if group is None else [part for _, part in frame.groupby(group, sort=False, observed=True)]
+    per_group = max(budget // len(groups), 3)
+    kept = []
+    for part in groups:
+        values = part[x]
+        numeric = values.astype('int64') if pd.api.types.is_datetime64_any_dtype(values) else values
+        kept.append(part.iloc[lttb(numeric.to_numpy(), part[y].to_numpy(), per_group)])
+    return pd.concat(kept)
+
+
+def box_summary(frame, by, value):
+    """Per ``by`` group: count, mean, quartiles and Tukey whiskers (furthest values within 1.5 IQR)."""
+    grouped = frame.dropna(subset=[value]).groupby(by, observed=True)[value]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ['q1', 'median', 'q3']
+    summary['mean'] = grouped.mean()
+    summary['count'] = grouped.size()
+    iqr = summary['q3'] - summary['q1']
+    limits = frame[[by, value]].join(pd.DataFrame({'low': summary['q1'] - 1.5 * iqr,
+                                                   'high': summary['q3'] + 1.5 * iqr}), on=by)
+    inside = limits[(limits[value] >= limits['low']) & (limits[value] <= limits['high'])]
+    whiskers = inside.groupby(by, observed=True)[value].agg(['min', 'max'])
+    summary['lowerfence'], summary['upperfence'] = whiskers['min'], whiskers['max']
+    return summary.reset_index()
+
+
+def box_figure(summary, by, title=None):
+    """Box plot of a ``box_summary`` frame; the browser receives six numbers per group."""
+    figure = go.Figure(go.Box(x=summary[by].astype(str), q1=summary['q1'], median=summary['median'],
+                              q3=summary['q3'], mean=summary['mean'], lowerfence=summary['lowerfence'],
+                              upperfence=summary['upperfence'], boxpoints=False))
+    figure.update_layout(title=title, xaxis_title=str(by))
+    return figure
+
+
+def grid_bins(frame, lat, lon, value, cells):
+    """Mean ``value`` and row count per cell of a lat/lon grid with about ``cells`` cells over the data's extent."""
+    frame = frame.dropna(subset=[lat, lon, value])
+    if len(frame) <= cells:
+        return frame.assign(count=1)[[lat, lon, value, 'count']]
+    side = max(int(np.sqrt(cells)), 1)
+    binned = {}
+    for column in (lat, lon):
+        low, high = frame[column].min(), frame[column].max()
+        step = (high - low) / side or 1.0
+        binned[column] = np.minimum(((frame[column] - low) / step).astype(np.int64), side - 1) * step + low + step / 2
+    grouped = pd.DataFrame({lat: binned[lat], lon: binned[lon], value: frame[value]}).groupby(
+        [lat, lon], observed=True)[value]
+    return pd.DataFrame({value: grouped.mean(), 'count': grouped.size()}).reset_index()
+
+
+def figure_bytes(figure):
+    """Size of the JSON Plotly sends to the browser for ``figure``."""
+    return len(figure.to_json().encode('utf-8'))
+
+
+class PayloadReport:
+    """Chart payload sizes of one page render."""
+
+    def __init__(self):
+        self.charts = []
+
+    def add(self, name, figure):
+        """Record ``figure`` and return it, so calls can wrap ``st.plotly_chart``."""
+        self.charts.append((name, figure_bytes(figure)))
+        return figure
+
+    @property
+    def total(self):
+        return sum(size for _, size in self.charts)
+
+    def summary(self):
+        parts = ', '.join(f"{name} {size / 1024:.0f} KB" for name, size in self.charts)
+        return f"Chart payload: {self.total / 1024:.0f} KB ({parts})"
@@ -0,0 +1,72 @@
+"""Compact column types for the enriched article frame.
+
+The enriched frame used to carry several wide types: ``category``, ``authors``,
+``category_cluster`` and ``date`` as Python object strings, ``cluster`` as
+int64, the sentiment columns as float64, and both description columns as full
+object strings. ``ARTICLE_SCHEMA`` gives every known column a kind, and
+``compact`` converts a frame to it:
+
+* ``category``: pandas Categorical (a dictionary in Arrow), used only while
+  distinct values stay below ``COMPACT_CATEGORY_RATIO`` of the rows, else stored
+  as ``string``
+* ``string``: Arrow-backed strings
+* ``datetime``: ``datetime64``
+* ``int``: the smallest integer type holding the column's range (int8 for
+  cluster IDs)
+* ``float32``: sentiment scores, which VADER rounds to four decimals and
+  probabilities do not need beyond float32
+
+Columns without a kind are left as they are. ``memory_report`` compares the
+deep memory use per column before and after.
+"""
+import numpy as np
+import pandas as pd
+
+from senticonomy import config
+
+SENTIMENT_COLUMNS = ['neg', 'neu', 'pos', 'compound', 'sentiment_score']
+
+ARTICLE_SCHEMA = {
+    'link': 'string', 'headline': 'string', 'short_description': 'string', 'short_description_clean': 'string',
+    'category': 'category', 'authors': 'category', 'category_cluster': 'category', 'model': 'category',
+    'date': 'datetime', 'cluster': 'int', **{column: 'float32' for column in SENTIMENT_COLUMNS},
+}
+
+
+def _convert(values, kind, category_ratio):
+    if kind == 'category':
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values.cat.remove_unused_categories()
+        if values.nunique(dropna=True) <= category_ratio * len(values):
+            return values.astype('category')
+        kind = 'string'
+    if kind == 'string':
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        return values.astype(pd.StringDtype('pyarrow', na_value=np.nan))
+    if kind == 'datetime':
+        return pd.to_datetime(values, errors='coerce')
+    if kind == 'int':
+        return pd.to_numeric(values, downcast='integer') if values.notna().all() else values
+    if kind == 'float32':
+        return values.astype(np.float32)
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+def compact(frame, schema=None, category_ratio=None):
+    """Copy of ``frame`` with the columns named in ``schema`` (default ``ARTICLE_SCHEMA``) converted to their kind."""
+    schema = ARTICLE_SCHEMA if schema is None else schema
+    category_ratio = config.COMPACT_CATEGORY_RATIO if category_ratio is None else category_ratio
+    return frame.assign(**{column: _convert(frame[column], kind, category_ratio)
+                           for column, kind in schema.items() if column in frame.columns})
+
+
+def memory_report(before, after):
+    """Deep bytes and dtype per column of two versions of a frame, with a total row."""
+    report = pd.DataFrame({'dtype_before': before.dtypes.astype(str),
+                           'bytes_before': before.memory_usage(deep=True, index=False),
+                           'dtype_after': after.dtypes.astype(str),
+                           'bytes_after': after.memory_usage(deep=True, index=False)})
+    report.loc['total'] = ['', report['bytes_before'].sum(), '', report['bytes_after'].sum()]
+    report['saved'] = 1 - report['bytes_after'] / report['bytes_before']
+    return report
@@ -0,0 +1,136 @@
+"""Shared settings for the Senticonomy pipeline.
+
+Every value can be overridden through an environment variable (the apps load
+``.env`` before importing this module), the same way the API and AWS
+credentials are configured.
+"""
+import os
+
+# Local directory for caches and derived artifacts
+CACHE_DIR = os.getenv("SENTICONOMY_CACHE_DIR", ".cache")
+
+# Partitioned Parquet datasets (see senticonomy.storage)
+DATA_DIR = os.getenv("SENTICONOMY_DATA_DIR", "data")
+
+# Dashboard load: days of history to read (0 = all) and comma separated columns (empty = all)
+DASHBOARD_DAYS = int(os.getenv("DASHBOARD_DAYS", "0"))
+DASHBOARD_COLUMNS = [c.strip() for c in os.getenv("DASHBOARD_COLUMNS", "").split(',') if c.strip()] or None
+
+# Category to keywords mapping used for NewsAPI ingestion
+QUERY_KEYWORDS = {
+    'TECH': ['technology', 'tech news', 'gadgets', 'AI'],
+    'SPORTS': ['sports', 'football', 'cricket', 'NBA'],
+    'ENTERTAINMENT': ['movies', 'celebrity', 'music', 'entertainment'],
+    'POLITICS': ['politics', 'government', 'elections'],
+    'EDUCATION': ['education', 'students', 'schools', 'university'],
+    'ENVIRONMENT': ['climate change', 'environment', 'pollution'],
+    'SCIENCE': ['science', 'research', 'NASA', 'discovery'],
+    'CRIME': ['crime', 'murder', 'theft', 'arrest'],
+    'BUSINESS': ['business', 'finance', 'stocks', 'economy'],
+    'TRAVEL': ['travel', 'tourism', 'vacation', 'flights'],
+    'STYLE & BEAUTY': ['fashion', 'style', 'makeup', 'beauty']
+}
+
+# NewsAPI fetch engine: quota in requests per second, burst size, threads and retries
+NEWSAPI_RATE_LIMIT = float(os.getenv("NEWSAPI_RATE_LIMIT", "2"))
+NEWSAPI_BURST = int(os.getenv("NEWSAPI_BURST", "4"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "3"))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", "1.0"))
+
+# Query planner: keywords of a category are OR-ed together and paged until known articles show up
+PLANNER_PAGE_SIZE = int(os.getenv("PLANNER_PAGE_SIZE", "100"))
+PLANNER_MAX_PAGES = int(os.getenv("PLANNER_MAX_PAGES", "3"))
+
+# On-disk NewsAPI response cache: time to live in seconds and size limit in megabytes
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(CACHE_DIR, "newsapi_responses.sqlite"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_MB = float(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+
+# Append-only ingestion: hashes of every stored link and per-category publishedAt watermarks
+LINK_INDEX_PATH = os.getenv("LINK_INDEX_PATH", os.path.join(CACHE_DIR, "link_index.sqlite"))
+
+# Content-addressed cache of per-text results (preprocessing, ...)
+TEXT_CACHE_PATH = os.getenv("TEXT_CACHE_PATH", os.path.join(CACHE_DIR, "text_cache.sqlite"))
+
+# Max distinct tokens kept in the process-wide token -> lemma table of the batch normalizer
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "200000"))
+
+# Process pool for preprocessing and sentiment scoring: worker processes (0 = one per core, 1 = serial) and texts per chunk
+PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", "0"))
+PARALLEL_CHUNK_SIZE = int(os.getenv("PARALLEL_CHUNK_SIZE", "5000"))
+
+# Versioned clustering artifacts (see senticonomy.model_store), how many versions to keep, and for how long
+# after a process last opened a version pruning leaves it alone (its models load lazily)
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "3"))
+MODEL_LEASE_SECONDS = int(os.getenv("MODEL_LEASE_SECONDS", "600"))
+
+# Streaming cluster updates after each ingestion run ('streaming') or only explicit retrains ('full'), and the mini-batch size
+CLUSTER_UPDATE_MODE = os.getenv("CLUSTER_UPDATE_MODE", "streaming")
+CLUSTER_BATCH_SIZE = int(os.getenv("CLUSTER_BATCH_SIZE", "1024"))
+
+# Cluster features: 'tfidf' (in-memory vocabulary) or 'hashing' (out-of-core, see senticonomy.out_of_core),
+# hash buckets of the hashing features and rows per chunk streamed from disk
+CLUSTER_FEATURES = os.getenv("CLUSTER_FEATURES", "tfidf")
+HASHING_FEATURES = int(os.getenv("HASHING_FEATURES", str(2 ** 16)))
+OUT_OF_CORE_CHUNK_SIZE = int(os.getenv("OUT_OF_CORE_CHUNK_SIZE", "100000"))
+
+# Rank of the truncated-SVD embeddings KMeans runs on (0 = cluster raw TF-IDF rows)
+CLUSTER_SVD_RANK = int(os.getenv("CLUSTER_SVD_RANK", "0"))
+
+# Cluster count selection (python -m senticonomy.k_selection): sampled rows, silhouette rows and report path
+K_SELECTION_SAMPLE = int(os.getenv("K_SELECTION_SAMPLE", "20000"))
+K_SELECTION_SILHOUETTE_ROWS = int(os.getenv("K_SELECTION_SILHOUETTE_ROWS", "3000"))
+K_SELECTION_REPORT = os.getenv("K_SELECTION_REPORT", os.path.join(MODEL_DIR, "k_selection.json"))
+
+# "Similar articles" index: rows scored per block for SVD embeddings, and results shown
+SIMILARITY_BLOCK_ROWS = int(os.getenv("SIMILARITY_BLOCK_ROWS", "65536"))
+SIMILAR_ARTICLES = int(os.getenv("SIMILAR_ARTICLES", "5"))
+
+# Near-duplicate detection in the cleaning stage: estimated Jaccard threshold (0 = off), MinHash size,
+# words per shingle and the index of stored signatures
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.6"))
+NEAR_DUP_PERMUTATIONS = int(os.getenv("NEAR_DUP_PERMUTATIONS", "64"))
+NEAR_DUP_SHINGLE = int(os.getenv("NEAR_DUP_SHINGLE", "2"))
+NEAR_DUP_INDEX_PATH = os.getenv("NEAR_DUP_INDEX_PATH", os.path.join(CACHE_DIR, "near_duplicates.sqlite"))
+
+# Transformer sentiment model (see senticonomy.transformer_sentiment): Hugging Face model and revision,
+# CPU backend ('pytorch' runs the published model; 'int8' dynamic quantization and 'onnx' through
+# optimum/onnxruntime are opt-in, after checking their agreement with benchmarks.bench_transformer),
+# texts per batch and max tokens per text
+TRANSFORMER_MODEL = os.getenv("TRANSFORMER_MODEL", "distilbert/distilbert-base-uncased-finetuned-sst-2-english")
+TRANSFORMER_REVISION = os.getenv("TRANSFORMER_REVISION", "714eb0f")
+TRANSFORMER_BACKEND = os.getenv("TRANSFORMER_BACKEND", "pytorch")
+TRANSFORMER_BATCH_SIZE = int(os.getenv("TRANSFORMER_BATCH_SIZE", "64"))
+TRANSFORMER_MAX_LENGTH = int(os.getenv("TRANSFORMER_MAX_LENGTH", "128"))
+
+# Sentiment cascade (see senticonomy.cascade): texts with |VADER compound| below the threshold are rescored by the
+# transformer (unset = the threshold recommended by the last tuning run, 0 = VADER only), the agreement with
+# transformer-only labels a recommended threshold must reach, and the tuning report
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD")) if os.getenv("CASCADE_THRESHOLD") else None
+CASCADE_TARGET_AGREEMENT = float(os.getenv("CASCADE_TARGET_AGREEMENT", "0.9"))
+CASCADE_REPORT = os.getenv("CASCADE_REPORT", os.path.join(MODEL_DIR, "cascade.json"))
+
+# Day x category x cluster sentiment sums and counts served to the Sentiment Scores page (see senticonomy.rollups)
+ROLLUP_PATH = os.getenv("ROLLUP_PATH", os.path.join(CACHE_DIR, "sentiment_rollups.sqlite"))
+
+# Sentiment Over Time chart: rolling windows offered, in days (1 = daily mean), and the EWMA half-life in days
+TIMESERIES_WINDOWS = [int(w) for w in os.getenv("TIMESERIES_WINDOWS", "1,7,30").split(',') if w.strip()]
+TIMESERIES_HALFLIFE = float(os.getenv("TIMESERIES_HALFLIFE", "7"))
+
+# Chart budgets (see senticonomy.charts): points per time-series chart (LTTB) and grid cells per location map
+CHART_POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", "2000"))
+CHART_MAP_CELLS = int(os.getenv("CHART_MAP_CELLS", "2500"))
+
+# Memory-mapped artifact bundles shared by dashboard worker processes (see senticonomy.bundle) and how many to keep
+BUNDLE_DIR = os.getenv("BUNDLE_DIR", os.path.join(CACHE_DIR, "bundles"))
+BUNDLE_KEEP_VERSIONS = int(os.getenv("BUNDLE_KEEP_VERSIONS", "2"))
+
+# Compact article frame (see senticonomy.compact): largest share of distinct values a column may have and still
+# be stored as categorical
+COMPACT_CATEGORY_RATIO = float(os.getenv("COMPACT_CATEGORY_RATIO", "0.5"))
+
+# Dataset page: rows per page, and where on-request exports are written before they are handed to the browser
+DATASET_PAGE_SIZE = int(os.getenv("DATASET_PAGE_SIZE", "50"))
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(CACHE_DIR, "exports"))
@@ -0,0 +1,73 @@
+"""Reduced document embeddings: randomized truncated SVD of the TF-IDF matrix (LSA).
+
+KMeans on a few dozen dense dimensions is much cheaper per distance than on
+the 1000-wide sparse TF-IDF rows. The reduced vector of every training text is
+kept next to the model, keyed by the text's content hash, so clustering,
+prediction and the 2-D cluster map reuse them instead of running the
+vectorizer again; only texts the model has not seen are transformed.
+"""
+import os
+
+import numpy as np
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import Normalizer
+
+from senticonomy.text_cache import text_key
+
+KEYS_FILE = 'embedding_keys.npy'
+VECTORS_FILE = 'embeddings.npy'
+
+
+def reduction_pipeline(max_features=1000, rank=100, random_state=0):
+    """TF-IDF -> randomized truncated SVD -> l2 normalisation, usable wherever the vectorizer is."""
+    return make_pipeline(TfidfVectorizer(stop_words='english', max_features=max_features),
+                         TruncatedSVD(n_components=rank, algorithm='randomized', random_state=random_state),
+                         Normalizer(copy=False))
+
+
+def fit_projection(vectors, random_state=0):
+    """2-D PCA of the reduced vectors, used for the cluster map."""
+    return PCA(n_components=2, random_state=random_state).fit(vectors)
+
+
+def text_keys(texts):
+    """Content hashes of ``texts`` as a fixed-width byte array (sortable, searchable)."""
+    return np.array([text_key(text) for text in texts], dtype='S16')
+
+
+def write_table(path, keys, vectors):
+    """Store ``vectors`` under ``path`` sorted by ``keys``, dropping duplicate keys."""
+    keys, first = np.unique(keys, return_index=True)
+    np.save(os.path.join(path, KEYS_FILE), keys)
+    np.save(os.path.join(path, VECTORS_FILE), np.asarray(vectors, dtype=np.float32)[first])
+
+
+class EmbeddingTable:
+    """Read-only, memory-mapped key -> vector table written by ``write_table``."""
+
+    def __init__(self, path):
+        self.keys = np.load(os.path.join(path, KEYS_FILE), mmap_mode='r')
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, keys):
+        """``(found, rows)``: which ``keys`` are stored, and their row in ``vectors``."""
+        rows = np.searchsorted(self.keys, keys)
+        rows = np.minimum(rows, max(0, len(self.keys) - 1))
+        found = (self.keys[rows] == keys) if len(self.keys) else np.zeros(len(keys), dtype=bool)
+        return found, rows
+
+    def embed(self, texts, transform):
+        """Vectors of ``texts``: stored rows where known, ``transform(texts)`` for the others."""
+        keys = text_keys(texts)
+        found, rows = self.lookup(keys)
+        vectors = np.empty((len(keys), self.vectors.shape[1]), dtype=np.float32)
+        vectors[found] = self.vectors[rows[found]]
+        if not found.all():
+            missing = [text for text, known in zip(texts, found) if not known]
+            vectors[~found] = transform(missing)
+        return vectors
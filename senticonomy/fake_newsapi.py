@@ -0,0 +1,161 @@
+"""Local stand-in for the NewsAPI ``/v2/everything`` endpoint.
+
+Used to benchmark ingestion offline. Every keyword draws its articles from a
+shared pool per category, so keywords of the same category overlap the way real
+NewsAPI results do, and ``OR``-ed queries return the union of their keywords. Responses can be slowed down and made to fail at random to
+exercise the rate limiter and the retry path.
+
+Run standalone with ``python -m senticonomy.fake_newsapi --port 8765``.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from senticonomy import config
+
+WORDS = ('market', 'growth', 'policy', 'record', 'team', 'season', 'launch', 'study', 'storm',
+         'court', 'rally', 'deal', 'report', 'crisis', 'award', 'trip', 'budget', 'vote', 'win',
+         'loss', 'fans', 'price', 'rate', 'school', 'climate', 'police', 'film', 'album', 'device')
+
+BASE_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed(*parts):
+    return int(hashlib.md5('|'.join(map(str, parts)).encode('utf-8')).hexdigest()[:8], 16)
+
+
+class FakeCorpus:
+    """Deterministic article pools: ``pool_size`` articles per category, each keyword sees ``coverage`` of them."""
+
+    def __init__(self, query_keywords=None, pool_size=200, coverage=0.6):
+        self.query_keywords = config.QUERY_KEYWORDS if query_keywords is None else query_keywords
+        self.pool_size = pool_size
+        self.coverage = coverage
+        self._category_of = {kw.lower(): cat for cat, kws in self.query_keywords.items() for kw in kws}
+
+    def article(self, category, n):
+        rng = random.Random(_seed(category, n))
+        words = ' '.join(rng.choice(WORDS) for _ in range(12))
+        published = BASE_DATE + timedelta(minutes=self.pool_size - n)
+        return {
+            'source': {'id': None, 'name': 'Fake Wire'},
+            'author': f"Reporter {rng.randint(1, 50)}",
+            'title': f"{category.title()} story {n}",
+            'description': f"{category.lower()} {words}",
+            'url': f"https://fake.news/{urllib.parse.quote(category.lower())}/{n}",
+            'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': words,
+        }
+
+    def articles_for(self, term):
+        """Articles matching a single keyword, newest first."""
+        term = term.strip().strip('"').lower()
+        category = self._category_of.get(term, term.upper())
+        rng = random.Random(_seed(category, term))
+        ids = sorted(rng.sample(range(self.pool_size), int(self.pool_size * self.coverage)))
+        return [self.article(category, n) for n in ids]
+
+    def search(self, q):
+        """Articles matching any ``OR``-ed keyword of ``q``, newest first."""
+        found = {}
+        for term in q.split(' OR '):
+            for article in self.articles_for(term):
+                found[article['url']] = article
+        return sorted(found.values(), key=lambda article: article['publishedAt'], reverse=True)
+
+
+class FakeNewsApiHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path != '/v2/everything':
+            return self._send(404, {'status': 'error', 'code': 'notFound', 'message': url.path})
+        time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return self._send(500, {'status': 'error', 'code': 'unexpectedError', 'message': 'injected failure'})
+
+        params = urllib.parse.parse_qs(url.query)
+        q = params.get('q', [''])[0]
+        since = params.get('from', [''])[0]
+        page = int(params.get('page', ['1'])[0])
+        page_size = int(params.get('pageSize', ['100'])[0])
+        articles = [article for article in self.server.search(q) if article['publishedAt'] >= since]
+        start = (page - 1) * page_size
+        self._send(200, {'status': 'ok', 'totalResults': len(articles),
+                         'articles': articles[start:start + page_size]})
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeNewsApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, corpus, latency=0.0, error_rate=0.0):
+        handler = type('Handler', (FakeNewsApiHandler,), {'latency': latency, 'error_rate': error_rate})
+        super().__init__(address, handler)
+        self.corpus = corpus
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def search(self, q):
+        with self._lock:
+            self.requests += 1
+        return self.corpus.search(q)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, corpus=None):
+    """Start the fake server on a background thread and return it; call ``shutdown()`` when done."""
+    server = FakeNewsApiServer((host, port), corpus or FakeCorpus(), latency, error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeNewsApiClient:
+    """Minimal ``NewsApiClient`` replacement that talks to the fake server."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get_everything(self, q=None, from_param=None, to=None, language=None, sort_by=None, page=None, page_size=None):
+        params = {'q': q, 'from': from_param, 'to': to, 'language': language,
+                  'sortBy': sort_by, 'page': page, 'pageSize': page_size}
+        query = urllib.parse.urlencode({k: v for k, v in params.items() if v is not None})
+        with urllib.request.urlopen(f"{self.base_url}/v2/everything?{query}", timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.3, help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    server = FakeNewsApiServer((args.host, args.port), FakeCorpus(), args.latency, args.error_rate)
+    print(f"Fake NewsAPI listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,170 @@
+"""Concurrent NewsAPI fetch engine.
+
+Queries run on a thread pool behind one shared token-bucket rate limiter, each
+request is retried with exponential backoff, and results are yielded as soon as
+a query finishes so the caller can build its frame while the rest are in flight.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from senticonomy import config
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per second, bursting up to ``capacity``."""
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass(frozen=True)
+class NewsQuery:
+    """A single ``get_everything`` query for one category."""
+    category: str
+    q: str
+    page_size: int = 20
+    max_pages: int = 1
+    language: str = 'en'
+    sort_by: str = 'publishedAt'
+    from_param: str = None
+
+    def params(self, page=1):
+        params = dict(q=self.q, language=self.language, sort_by=self.sort_by,
+                      page_size=self.page_size, page=page)
+        if self.from_param is not None:
+            params['from_param'] = self.from_param
+        return params
+
+
+@dataclass
+class QueryResult:
+    """Articles returned for one query, in the order the queries were planned."""
+    index: int
+    query: NewsQuery
+    articles: list = field(default_factory=list)
+    calls: int = 0
+    error: Exception = None
+
+
+def keyword_queries(query_keywords=None, page_size=20):
+    """One query per keyword, exactly as the original sequential loop issued them."""
+    query_keywords = config.QUERY_KEYWORDS if query_keywords is None else query_keywords
+    return [NewsQuery(category, keyword, page_size=page_size)
+            for category, keywords in query_keywords.items()
+            for keyword in keywords]
+
+
+def article_to_row(article, category):
+    """Map a NewsAPI article onto the master file columns."""
+    return {
+        'link': article['url'],
+        'headline': article['title'],
+        'category': category,
+        'short_description': article['description'],
+        'authors': article.get('author', 'Unknown'),
+        'date': article['publishedAt']
+    }
+
+
+def call_with_retry(fetch, params, limiter=None, max_retries=3, backoff=1.0):
+    """Call ``fetch(**params)`` under the rate limiter, retrying failures with jittered backoff."""
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fetch(**params)
+        except Exception:
+            if attempt == max_retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
+
+
+def run_query(fetch, query, limiter=None, max_retries=3, backoff=1.0, seen=None, cache=None):
+    """Fetch pages of ``query`` and return ``(articles, calls)``.
+
+    Paging stops after the last page of results, after ``query.max_pages``, or
+    after the first page holding a link from ``seen``: results are sorted newest
+    first, so everything beyond that point has been ingested already. Pages found
+    in ``cache`` (a ``ResponseCache``) cost neither an API call nor a rate-limit token.
+    """
+    articles, calls = [], 0
+    for page in range(1, query.max_pages + 1):
+        params = query.params(page)
+        response = cache.get(params) if cache is not None else None
+        if response is None:
+            try:
+                response = call_with_retry(fetch, params, limiter, max_retries, backoff)
+            except Exception as e:
+                if page == 1:
+                    raise
+                print(f"Stopped paging '{query.q}' at page {page}: {e}")
+                break
+            calls += 1
+            if cache is not None and response.get('status', 'ok') == 'ok':
+                cache.put(params, response)
+        batch = response.get('articles', [])
+        articles.extend(batch)
+        total = response.get('totalResults')
+        if len(batch) < query.page_size or (total is not None and page * query.page_size >= total):
+            break
+        if seen is not None and any(article.get('url') in seen for article in batch):
+            break
+    return articles, calls
+
+
+def fetch_news(fetch, queries, rate=None, burst=None, workers=None, max_retries=None, backoff=None, seen=None,
+               cache=None):
+    """Run ``queries`` concurrently and yield a ``QueryResult`` for each as it completes.
+
+    ``fetch`` is any callable with the ``NewsApiClient.get_everything`` signature;
+    ``seen`` (already ingested links) and ``cache`` are passed on to ``run_query``.
+    Failed queries are yielded with ``error`` set instead of raising, so one bad
+    keyword never aborts the whole run.
+    """
+    rate = config.NEWSAPI_RATE_LIMIT if rate is None else rate
+    burst = config.NEWSAPI_BURST if burst is None else burst
+    workers = config.FETCH_WORKERS if workers is None else workers
+    max_retries = config.FETCH_MAX_RETRIES if max_retries is None else max_retries
+    backoff = config.FETCH_BACKOFF if backoff is None else backoff
+
+    limiter = TokenBucket(rate, burst)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_query, fetch, query, limiter, max_retries, backoff, seen, cache): (i, query)
+                   for i, query in enumerate(queries)}
+        for future in as_completed(futures):
+            index, query = futures[future]
+            try:
+                articles, calls = future.result()
+                yield QueryResult(index, query, articles, calls)
+            except Exception as e:
+                yield QueryResult(index, query, error=e)
+
+
+def collect_rows(results):
+    """Flatten query results into master-file rows, ordered as the queries were planned."""
+    ordered = sorted(results, key=lambda result: result.index)
+    return [article_to_row(article, result.query.category)
+            for result in ordered for article in result.articles]
@@ -0,0 +1,203 @@
+"""Model selection for the number of clusters.
+
+Instead of fitting a full KMeans for every k one after another (the notebook's
+elbow cell), the sweep works on a category-stratified sample of the corpus,
+splits the k range into contiguous segments that run on separate processes,
+and inside a segment warm-starts each fit from the previous k's centroids plus
+one new k-means++ seed. Inertia and silhouette curves and the recommended k
+are written to a JSON report that the retrain path reads instead of a
+hard-coded cluster count. The sweep uses the features the retrain path is
+configured with (``CLUSTER_FEATURES``, ``CLUSTER_SVD_RANK``); with hashed
+features it streams the dataset and keeps only the sampled rows in memory.
+
+    python -m senticonomy.k_selection --k-min 2 --k-max 20
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import silhouette_score
+from sklearn.metrics.pairwise import euclidean_distances
+
+from senticonomy import config
+from senticonomy.embeddings import reduction_pipeline
+from senticonomy.out_of_core import HashingTfidf, dataset_chunks
+from senticonomy.parallel import worker_count
+
+# Cluster count used while no report exists (what the app always used)
+DEFAULT_K = 11
+
+
+def stratified_sample(categories, size, seed=0):
+    """Row positions of a sample of ``size`` rows with each category in its corpus proportion (at least one row)."""
+    categories = np.asarray(categories, dtype=object)
+    if size >= len(categories):
+        return np.arange(len(categories))
+    rng = np.random.default_rng(seed)
+    values, inverse = np.unique(categories.astype(str), return_inverse=True)
+    picked = []
+    for group in range(len(values)):
+        rows = np.flatnonzero(inverse == group)
+        take = max(1, round(size * len(rows) / len(categories)))
+        picked.append(rng.choice(rows, min(take, len(rows)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def hashed_sample(sample_size=None, n_features=None, seed=0):
+    """Hashed TF-IDF rows of a stratified sample of the cleaned dataset, featurized as ``retrain_out_of_core`` does.
+
+    Returns ``(X, categories of the sampled rows, total rows)``. The IDF statistics cover the whole dataset;
+    a second pass (preprocessed texts come from the text cache) keeps only the sampled rows.
+    """
+    sample_size = config.K_SELECTION_SAMPLE if sample_size is None else sample_size
+    vectorizer = HashingTfidf(n_features)
+    categories = []
+    for texts, chunk_categories in dataset_chunks():
+        vectorizer.partial_fit_counts(vectorizer.hasher.transform(texts))
+        categories.extend(chunk_categories)
+    rows = stratified_sample(categories, sample_size, seed)
+    parts, seen = [], 0
+    for texts, _ in dataset_chunks():
+        mine = rows[(rows >= seen) & (rows < seen + len(texts))] - seen
+        if len(mine):
+            parts.append(vectorizer.transform(texts.iloc[mine]))
+        seen += len(texts)
+    X = sp.vstack(parts, format='csr') if parts else sp.csr_matrix((0, vectorizer.n_features))
+    return X, np.asarray(categories, dtype=object)[rows], len(categories)
+
+
+def next_seed(X, centers, rng):
+    """One extra centroid drawn by k-means++ (probability proportional to squared distance)."""
+    distances = euclidean_distances(X, centers, squared=True).min(axis=1)
+    total = distances.sum()
+    row = rng.choice(X.shape[0], p=distances / total) if total > 0 else rng.integers(X.shape[0])
+    return X[row].toarray() if hasattr(X[row], 'toarray') else np.asarray(X[row]).reshape(1, -1)
+
+
+def sweep_segment(X, ks, silhouette_rows, seed=0):
+    """Fit each k of the contiguous range ``ks`` in order, warm-starting from the previous fit.
+
+    Silhouettes are computed on the same ``silhouette_rows`` rows for every k,
+    from one precomputed distance matrix. Returns ``[(k, inertia, silhouette, seconds)]``.
+    """
+    rng = np.random.default_rng(seed + ks[0])
+    scored = np.sort(np.random.default_rng(seed).choice(X.shape[0], min(silhouette_rows, X.shape[0]), replace=False))
+    distances = euclidean_distances(X[scored]).astype(np.float32)
+    results, centers = [], None
+    for k in ks:
+        start = time.perf_counter()
+        if centers is None:
+            kmeans = KMeans(n_clusters=k, random_state=seed).fit(X)
+        else:
+            init = np.vstack([centers, next_seed(X, centers, rng)])
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=seed).fit(X)
+        centers = kmeans.cluster_centers_
+        labels = kmeans.labels_[scored]
+        silhouette = None
+        if 1 < len(np.unique(labels)) < len(scored):
+            silhouette = float(silhouette_score(distances, labels, metric='precomputed'))
+        results.append((k, float(kmeans.inertia_), silhouette, time.perf_counter() - start))
+    return results
+
+
+def segments(ks, parts):
+    """Split ``ks`` into at most ``parts`` contiguous, nearly equal ranges."""
+    parts = np.array_split(np.asarray(ks), max(1, min(parts, len(ks))))
+    return [[int(k) for k in part] for part in parts if len(part)]
+
+
+def select_k(X, categories, k_min=2, k_max=15, sample_size=None, silhouette_rows=None, workers=None, seed=0):
+    """Run the sweep over ``k_min..k_max`` on a stratified sample of ``X`` and return the report dict."""
+    sample_size = config.K_SELECTION_SAMPLE if sample_size is None else sample_size
+    silhouette_rows = config.K_SELECTION_SILHOUETTE_ROWS if silhouette_rows is None else silhouette_rows
+    rows = stratified_sample(categories, sample_size, seed)
+    sample = X[rows]
+    ks = list(range(max(2, k_min), k_max + 1))
+    start = time.perf_counter()
+    parts = segments(ks, worker_count(workers))
+    if len(parts) == 1:
+        results = sweep_segment(sample, parts[0], silhouette_rows, seed)
+    else:
+        with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+            futures = [executor.submit(sweep_segment, sample, part, silhouette_rows, seed) for part in parts]
+            results = [result for future in futures for result in future.result()]
+    scored = [(silhouette, k) for k, _, silhouette, _ in results if silhouette is not None]
+    return {
+        'k': [k for k, _, _, _ in results],
+        'inertia': [inertia for _, inertia, _, _ in results],
+        'silhouette': [silhouette for _, _, silhouette, _ in results],
+        'fit_seconds': [seconds for _, _, _, seconds in results],
+        'recommended_k': max(scored)[1] if scored else DEFAULT_K,
+        'rows': X.shape[0],
+        'sample_rows': len(rows),
+        'seconds': time.perf_counter() - start,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def write_report(report, path=None):
+    path = config.K_SELECTION_REPORT if path is None else path
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_report(path=None):
+    path = config.K_SELECTION_REPORT if path is None else path
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def recommended_k(path=None, default=DEFAULT_K):
+    """Cluster count recommended by the last sweep, or ``default`` when there is no report."""
+    report = read_report(path)
+    return int(report['recommended_k']) if report else default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--k-min', type=int, default=2)
+    parser.add_argument('--k-max', type=int, default=15)
+    parser.add_argument('--sample', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if config.CLUSTER_FEATURES == 'hashing':
+        # Same features as retrain_out_of_core, without holding the corpus in memory
+        X, categories, rows = hashed_sample(args.sample)
+        report = select_k(X, categories, args.k_min, args.k_max, len(categories), workers=args.workers)
+        report['rows'] = rows
+    else:
+        texts, categories = [], []
+        for chunk_texts, chunk_categories in dataset_chunks():
+            texts.extend(chunk_texts)
+            categories.extend(chunk_categories)
+        if config.CLUSTER_SVD_RANK:
+            vectorizer = reduction_pipeline(rank=config.CLUSTER_SVD_RANK)
+        else:
+            vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+        report = select_k(vectorizer.fit_transform(texts), categories, args.k_min, args.k_max, args.sample,
+                          workers=args.workers)
+    report['features'] = config.CLUSTER_FEATURES
+    write_report(report)
+    for k, inertia, silhouette in zip(report['k'], report['inertia'], report['silhouette']):
+        print(f"k={k:>3}  inertia={inertia:>12.1f}  silhouette={silhouette if silhouette is None else round(silhouette, 4)}")
+    print(f"Recommended k: {report['recommended_k']} ({report['seconds']:.1f}s on {report['sample_rows']} sampled rows)")
+
+
+if __name__ == '__main__':
+    main()
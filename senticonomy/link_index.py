@@ -0,0 +1,110 @@
+"""Persistent index of ingested article links for append-only ingestion.
+
+Instead of reloading the whole master file, concatenating the new batch and
+deduplicating the full history on every run, the index keeps a 64-bit hash of
+every link already stored (plus the newest ``publishedAt`` per category) in a
+SQLite file. A run only looks up the links it just fetched, appends the truly
+new rows to the master dataset and hands that delta to the downstream stages,
+so its cost follows the size of the batch rather than the size of the history.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from senticonomy import config, storage
+
+MASTER_COLUMNS = ['link', 'headline', 'category', 'short_description', 'authors', 'date']
+
+# Max host parameters per SQLite statement
+_BATCH = 500
+
+
+def link_hash(link):
+    """Signed 64-bit hash of a link, small enough for a SQLite INTEGER key."""
+    digest = hashlib.blake2b(str(link).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+class LinkIndex:
+    """Set of ingested link hashes and per-category watermarks, stored on disk."""
+
+    def __init__(self, path=None):
+        self.path = config.LINK_INDEX_PATH if path is None else path
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS links (hash INTEGER PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS watermarks (category TEXT PRIMARY KEY, published TEXT)")
+        self._conn.commit()
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM links LIMIT 1").fetchone() is None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def __contains__(self, link):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM links WHERE hash = ?", (link_hash(link),)).fetchone() is not None
+
+    def contains_many(self, links):
+        """Boolean list telling which of ``links`` are already indexed."""
+        hashes = [link_hash(link) for link in links]
+        known = set()
+        with self._lock:
+            for start in range(0, len(hashes), _BATCH):
+                chunk = hashes[start:start + _BATCH]
+                placeholders = ','.join('?' * len(chunk))
+                known.update(row[0] for row in
+                             self._conn.execute(f"SELECT hash FROM links WHERE hash IN ({placeholders})", chunk))
+        return [h in known for h in hashes]
+
+    def add(self, frame):
+        """Record the links of ``frame`` and advance the per-category ``publishedAt`` watermarks."""
+        hashes = [(link_hash(link),) for link in frame['link']]
+        published = pd.to_datetime(frame['date'], utc=True, errors='coerce', format='mixed')
+        latest = (published.groupby(frame['category']).max().dropna()
+                  .dt.strftime('%Y-%m-%dT%H:%M:%SZ').to_dict()) if len(frame) else {}
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO links VALUES (?)", hashes)
+            self._conn.executemany("""INSERT INTO watermarks VALUES (?, ?) ON CONFLICT(category)
+                                      DO UPDATE SET published = MAX(published, excluded.published)""",
+                                   latest.items())
+
+    def latest_published(self):
+        """Newest ``publishedAt`` stored per category (feeds ``query_planner.plan_queries``)."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT category, published FROM watermarks"))
+
+    def bootstrap(self, dataset=storage.MASTER_DATASET):
+        """Index an existing master dataset once, reading only the columns needed."""
+        for chunk in storage.iter_batches(dataset, columns=['link', 'category', 'date']):
+            self.add(chunk.dropna(subset=['link']))
+
+    def close(self):
+        self._conn.close()
+
+
+def append_new_articles(batch, index, dataset=storage.MASTER_DATASET):
+    """Append the rows of ``batch`` whose link is not indexed yet to the master ``dataset`` and return them.
+
+    Duplicates inside the batch keep the last occurrence, as the full rewrite did;
+    a link that is already stored is never rewritten (first ingestion wins).
+    """
+    if batch.empty:
+        return pd.DataFrame(columns=MASTER_COLUMNS)
+    batch = batch.reindex(columns=MASTER_COLUMNS).dropna(subset=['link'])
+    batch = batch.drop_duplicates(subset='link', keep='last')
+    batch['category'] = batch['category'].str.upper()
+    delta = batch[[not known for known in index.contains_many(batch['link'])]].reset_index(drop=True)
+    if not delta.empty:
+        storage.write_dataset(delta, dataset)
+        index.add(delta)
+    return delta
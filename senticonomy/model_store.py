@@ -0,0 +1,309 @@
+"""Versioned store for the fitted clustering artifacts.
+
+Every fit is saved under ``models/<version>/`` (vectorizer, KMeans model and a
+``metadata.json`` holding the cluster -> category mapping, a fingerprint of the
+training corpus, its row count and the fit time), and a ``CURRENT`` file names
+the version the dashboard serves. A new Streamlit process only reads that
+version back; the models are loaded lazily, with their arrays memory-mapped,
+the first time they are used. ``retrain`` (or ``retrain_out_of_core`` for
+archives too large for memory) is the only code path that fits from scratch:
+it writes a new version next to the old ones and switches ``CURRENT`` with an
+atomic rename, so readers always see either the old or the new model. ``update``
+folds newly ingested articles into the current centroids the same way (see
+``senticonomy.streaming_clusters``), without a refit. Opening a version
+renews a lease on it, and pruning skips versions leased within
+``MODEL_LEASE_SECONDS``, so a process does not lose models it has not loaded yet.
+
+With ``CLUSTER_SVD_RANK`` set, KMeans runs on truncated-SVD embeddings instead
+of raw TF-IDF; the embeddings of the training texts and a 2-D projection for
+the cluster map are stored with the version (see ``senticonomy.embeddings``).
+"""
+import datetime
+import json
+import os
+import shutil
+import time
+import uuid
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from senticonomy import config
+from senticonomy.embeddings import (KEYS_FILE, VECTORS_FILE, EmbeddingTable, fit_projection, reduction_pipeline,
+                                    text_keys, write_table)
+from senticonomy.k_selection import recommended_k
+from senticonomy.out_of_core import fit_out_of_core
+from senticonomy.similarity import SimilarityIndex, extend_index, has_index, write_index
+from senticonomy.streaming_clusters import (category_counts, cluster_sizes, majority_category, merge_counts,
+                                            update_kmeans)
+from senticonomy.text_cache import corpus_checksum, corpus_fingerprint
+
+CURRENT = 'CURRENT'
+METADATA = 'metadata.json'
+LEASE = '.lease'
+ARTIFACTS = ('vectorizer', 'kmeans')
+
+# Files a streaming update carries over unchanged from its parent version (the similar-articles index is
+# extended with the new rows instead)
+INHERITED = ('projection.joblib', KEYS_FILE, VECTORS_FILE)
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class ClusterModel:
+    """One stored version: metadata up front, models loaded on first access."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, METADATA), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        self.version = self.metadata['version']
+        self.cluster_to_category = {int(c): category for c, category in self.metadata['cluster_to_category'].items()}
+        self.category_counts = {int(c): counts for c, counts in self.metadata.get('category_counts', {}).items()}
+        self._loaded = {}
+        try:
+            with open(os.path.join(path, LEASE), 'a'):
+                pass
+            os.utime(os.path.join(path, LEASE))
+        except OSError:  # read-only model directory: nothing prunes it either
+            pass
+
+    def _artifact(self, name):
+        if name not in self._loaded:
+            self._loaded[name] = joblib.load(os.path.join(self.path, f"{name}.joblib"), mmap_mode='r')
+        return self._loaded[name]
+
+    @property
+    def vectorizer(self):
+        return self._artifact('vectorizer')
+
+    @property
+    def kmeans(self):
+        return self._artifact('kmeans')
+
+    @property
+    def reduced(self):
+        """Whether KMeans runs on SVD embeddings rather than raw TF-IDF."""
+        return bool(self.metadata.get('svd_rank'))
+
+    def embed(self, texts):
+        """Reduced vectors of preprocessed ``texts``, read from the stored table when known."""
+        if 'embeddings' not in self._loaded:
+            self._loaded['embeddings'] = EmbeddingTable(self.path)
+        return self._loaded['embeddings'].embed(list(texts), self.vectorizer.transform)
+
+    def features(self, texts):
+        """Rows KMeans works on for ``texts``."""
+        return self.embed(texts).astype(np.float64) if self.reduced else self.vectorizer.transform(texts)
+
+    def predict(self, texts):
+        """Cluster of each preprocessed text."""
+        return self.kmeans.predict(self.features(texts))
+
+    def map_coordinates(self, texts):
+        """2-D cluster map position of each text (reduced models only)."""
+        return self.project(self.embed(texts))
+
+    def project(self, vectors):
+        """2-D cluster map position of reduced ``vectors``."""
+        return self._artifact('projection').transform(vectors)
+
+    @property
+    def has_similarity_index(self):
+        return has_index(self.path)
+
+    def similar_articles(self, text, n=None):
+        """The ``n`` stored articles most similar to the preprocessed ``text``, with their ``similarity``."""
+        n = config.SIMILAR_ARTICLES if n is None else n
+        if 'similarity' not in self._loaded:
+            self._loaded['similarity'] = SimilarityIndex(self.path)
+        return self._loaded['similarity'].similar(self.features([text]), n)
+
+
+def fit_clusters(texts, categories, n_clusters=11, max_features=1000, svd_rank=0):
+    """Fit the vectorizer and KMeans on ``texts``.
+
+    With ``svd_rank`` the vectorizer is a TF-IDF + truncated SVD pipeline and
+    KMeans runs on the dense reduced rows. Returns ``(vectorizer, kmeans, counts, X)``:
+    the category counts of each cluster and the rows KMeans was fitted on.
+    """
+    if svd_rank:
+        vectorizer = reduction_pipeline(max_features, svd_rank)
+    else:
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=max_features)
+    X = vectorizer.fit_transform(texts)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=0)
+    clusters = kmeans.fit_predict(X)
+    return vectorizer, kmeans, category_counts(clusters, categories), X
+
+
+class ModelStore:
+    """Directory of model versions plus the ``CURRENT`` pointer."""
+
+    def __init__(self, root=None):
+        self.root = config.MODEL_DIR if root is None else root
+        os.makedirs(self.root, exist_ok=True)
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        """Stored versions, oldest first (``.<version>.tmp`` staging directories are not versions yet)."""
+        return sorted(name for name in os.listdir(self.root)
+                      if not name.startswith('.') and os.path.isfile(os.path.join(self.root, name, METADATA)))
+
+    def leased(self, version, lease_seconds=None):
+        """Whether a process opened ``version`` within the last ``lease_seconds``."""
+        lease_seconds = config.MODEL_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.root, version, LEASE)) < lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def load(self, version=None):
+        """``ClusterModel`` for ``version`` (default: current), or ``None`` if nothing is stored."""
+        version = version or self.current_version()
+        if version is None:
+            return None
+        return ClusterModel(os.path.join(self.root, version))
+
+    def save(self, vectorizer, kmeans, counts, metadata, projection=None, embeddings=None, index=None,
+             inherit_from=None):
+        """Write a new version and return its name; ``CURRENT`` is left untouched.
+
+        ``embeddings`` is a ``(texts, vectors)`` pair, ``index`` a ``(rows, articles)``
+        pair for the similar-articles index; ``inherit_from`` a version directory
+        whose projection and embeddings are reused (hard-linked) as is, and whose
+        index, if any, ``index`` extends by one segment.
+        """
+        version = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        staging = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(staging)
+        for name, model in zip(ARTIFACTS, (vectorizer, kmeans)):
+            joblib.dump(model, os.path.join(staging, f"{name}.joblib"))
+        if projection is not None:
+            joblib.dump(projection, os.path.join(staging, 'projection.joblib'))
+        if embeddings is not None:
+            write_table(staging, text_keys(embeddings[0]), embeddings[1])
+        if index is not None and inherit_from is not None and has_index(inherit_from):
+            extend_index(staging, inherit_from, *index)
+        elif index is not None:
+            write_index(staging, *index)
+        if inherit_from is not None:
+            for name in INHERITED:
+                source = os.path.join(inherit_from, name)
+                if os.path.exists(source) and not os.path.exists(os.path.join(staging, name)):
+                    _link_or_copy(source, os.path.join(staging, name))
+        metadata = dict(metadata, version=version, category_counts=counts,
+                        cluster_to_category=majority_category(counts, kmeans.n_clusters),
+                        created=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                        sklearn_version=sklearn.__version__)
+        _write_atomic(os.path.join(staging, METADATA), json.dumps(metadata, indent=2))
+        os.replace(staging, os.path.join(self.root, version))
+        return version
+
+    def activate(self, version):
+        """Point ``CURRENT`` at ``version`` in one atomic rename."""
+        _write_atomic(os.path.join(self.root, CURRENT), version)
+
+    def retrain(self, texts, categories, n_clusters=None, max_features=1000, svd_rank=None, articles=None):
+        """Fit on ``texts``/``categories``, store the result as a new version, switch to it and return it.
+
+        ``n_clusters`` defaults to the cluster count recommended by the last ``k_selection`` sweep.
+        ``articles`` (a frame aligned with ``texts``: link, headline, ...) adds a similar-articles index.
+        """
+        n_clusters = recommended_k() if n_clusters is None else n_clusters
+        svd_rank = config.CLUSTER_SVD_RANK if svd_rank is None else svd_rank
+        start = time.perf_counter()
+        vectorizer, kmeans, counts, X = fit_clusters(texts, categories, n_clusters, max_features, svd_rank)
+        metadata = {'mode': 'full', 'corpus_fingerprint': corpus_fingerprint(texts),
+                    'corpus_checksum': corpus_checksum(texts), 'rows': len(texts),
+                    'fit_seconds': time.perf_counter() - start, 'n_clusters': n_clusters, 'max_features': max_features,
+                    'svd_rank': svd_rank}
+        index = (X, articles) if articles is not None else None
+        if svd_rank:
+            version = self.save(vectorizer, kmeans, counts, metadata, projection=fit_projection(X),
+                                embeddings=(texts, X), index=index)
+        else:
+            version = self.save(vectorizer, kmeans, counts, metadata, index=index)
+        self.activate(version)
+        self.prune()
+        return self.load(version)
+
+    def retrain_out_of_core(self, chunks, n_clusters=None, n_features=None):
+        """``retrain`` on hashed TF-IDF features, streaming the ``(texts, categories)`` pairs of ``chunks``.
+
+        No similar-articles index is built: it would hold the whole archive, which this path never loads.
+        """
+        n_clusters = recommended_k() if n_clusters is None else n_clusters
+        start = time.perf_counter()
+        # The distinct-text fingerprint would need every text key in memory; the checksum folds chunk by chunk
+        vectorizer, kmeans, counts, rows, checksum = fit_out_of_core(chunks, n_clusters, n_features)
+        metadata = {'mode': 'out_of_core', 'corpus_checksum': checksum, 'rows': rows,
+                    'fit_seconds': time.perf_counter() - start, 'n_clusters': n_clusters,
+                    'hash_features': vectorizer.n_features}
+        version = self.save(vectorizer, kmeans, counts, metadata)
+        self.activate(version)
+        self.prune()
+        return self.load(version)
+
+    def update(self, texts, categories, batch_size=None, articles=None):
+        """Fold new ``texts``/``categories`` into the current centroids, store the result as a new version and switch to it.
+
+        Cluster IDs are kept; the vocabulary of the current vectorizer is reused
+        as is. ``articles`` (a frame aligned with ``texts``) extends the current
+        similar-articles index; without it the new version has no index, as the
+        current one would miss the new articles. Returns the current model
+        unchanged when there is nothing to add, or ``None`` when no model has
+        been fitted yet (``retrain`` first).
+        """
+        batch_size = config.CLUSTER_BATCH_SIZE if batch_size is None else batch_size
+        current = self.load()
+        if current is None or len(texts) == 0:
+            return current
+        start = time.perf_counter()
+        n_clusters = current.kmeans.n_clusters
+        X = current.features(texts)
+        kmeans, clusters = update_kmeans(current.kmeans.cluster_centers_,
+                                         cluster_sizes(current.category_counts, n_clusters), X, batch_size)
+        counts = merge_counts(current.category_counts, category_counts(clusters, categories))
+        metadata = {key: current.metadata[key] for key in ('n_clusters', 'max_features', 'svd_rank', 'hash_features')
+                    if key in current.metadata}
+        metadata.update({'mode': 'streaming', 'parent': current.version,
+                         'rows': current.metadata.get('rows', 0) + len(texts),
+                         'fit_seconds': time.perf_counter() - start})
+        if 'corpus_checksum' in current.metadata:
+            metadata['corpus_checksum'] = corpus_checksum(texts, current.metadata['corpus_checksum'])
+        index = (X, articles) if articles is not None and current.has_similarity_index else None
+        version = self.save(current.vectorizer, kmeans, counts, metadata, index=index, inherit_from=current.path)
+        self.activate(version)
+        self.prune()
+        return self.load(version)
+
+    def prune(self, keep=None):
+        """Delete the oldest versions beyond ``keep``, never the current one or one still leased."""
+        keep = config.MODEL_KEEP_VERSIONS if keep is None else keep
+        current = self.current_version()
+        old = [v for v in self.versions() if v != current]
+        for version in old[:max(0, len(old) - max(0, keep - 1))]:
+            if not self.leased(version):
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
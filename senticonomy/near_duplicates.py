@@ -0,0 +1,223 @@
+"""Near-duplicate article detection with MinHash and LSH banding.
+
+Syndicated wire stories arrive under many URLs with small edits, so exact
+``link``/``short_description`` deduplication lets them through. Each article
+(headline + description) is reduced to a MinHash signature over its word
+shingles; signatures are cut into bands and articles sharing a band bucket
+become candidates, which are then confirmed by their estimated Jaccard
+similarity. Every bucket is represented by the first kept article that landed
+in it, and an article is dropped only when it is similar enough to one of its
+buckets' representatives itself, so a chain of small edits never collapses two
+articles that are not similar. The work stays linear in the number of articles
+even for very common stories. Bucket representatives and signatures of stored
+articles are kept in SQLite, so a new batch is also checked against the history.
+"""
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from senticonomy import config, storage
+
+_WORDS = re.compile(r'\w+')
+
+# Max host parameters per SQLite statement
+_BATCH = 500
+
+
+def shingles(text, size=None):
+    """CRC32 hashes of the word ``size``-grams (default ``NEAR_DUP_SHINGLE``) of ``text`` (the whole text if shorter)."""
+    size = config.NEAR_DUP_SHINGLE if size is None else size
+    words = _WORDS.findall(str(text).lower())
+    if len(words) <= size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))}
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+def hash_params(num_perm, seed=1):
+    """Multipliers (odd) and offsets of the ``num_perm`` multiply-shift hash functions."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def signatures(texts, num_perm=None, shingle_size=None, chunk=2000):
+    """MinHash signature (``num_perm`` uint32 values) of each text, computed ``chunk`` texts at a time."""
+    num_perm = config.NEAR_DUP_PERMUTATIONS if num_perm is None else num_perm
+    shingle_size = config.NEAR_DUP_SHINGLE if shingle_size is None else shingle_size
+    a, b = hash_params(num_perm)
+    texts = list(texts)
+    out = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for start in range(0, len(texts), chunk):
+        sets = [np.fromiter(shingles(text, shingle_size), dtype=np.uint64) for text in texts[start:start + chunk]]
+        offsets = np.cumsum([0] + [len(s) for s in sets[:-1]])
+        values = np.concatenate(sets)
+        # (a * x + b) mod 2**64, top 32 bits: a universal hash family without overflow checks
+        hashed = ((values[:, None] * a + b) >> np.uint64(32)).astype(np.uint32)
+        out[start:start + len(sets)] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return out
+
+
+def lsh_params(threshold, num_perm):
+    """``(bands, rows)`` whose LSH threshold ``(1/bands) ** (1/rows)`` is closest to ``threshold``."""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm // rows >= 1]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+def band_keys(sigs, bands, rows):
+    """Signed 64-bit key of each band of each signature, shape ``(n, bands)``."""
+    weights = np.uint64(0x100000001B3) ** np.arange(rows, dtype=np.uint64)
+    keys = np.empty((len(sigs), bands), dtype=np.uint64)
+    for band in range(bands):
+        keys[:, band] = (sigs[:, band * rows:(band + 1) * rows].astype(np.uint64) * weights).sum(axis=1)
+    return keys.view(np.int64)
+
+
+def similarity(sig, other):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig == other))
+
+
+def article_texts(frame):
+    """Headline and description of each row, the text that is compared."""
+    headline = frame['headline'] if 'headline' in frame.columns else ''
+    return (headline.fillna('').astype(str) + ' ' + frame['short_description'].fillna('').astype(str)).tolist()
+
+
+@dataclass
+class NearDuplicateReport:
+    """Rows of a batch collapsed as near-duplicates of another row of the batch or of a stored article."""
+    rows: int
+    within_batch: int
+    of_stored: int
+
+    @property
+    def collapsed(self):
+        return self.within_batch + self.of_stored
+
+    def seconds_saved(self, seconds_per_row):
+        """Downstream compute not spent on the collapsed rows, given the per-row cost of those stages."""
+        return self.collapsed * seconds_per_row
+
+    def as_dict(self):
+        return {'rows': self.rows, 'collapsed': self.collapsed, 'within_batch': self.within_batch,
+                'of_stored': self.of_stored, 'kept': self.rows - self.collapsed}
+
+
+class NearDuplicateIndex:
+    """Signatures and LSH bucket representatives of stored articles, in SQLite."""
+
+    def __init__(self, path=None, threshold=None, num_perm=None):
+        self.path = config.NEAR_DUP_INDEX_PATH if path is None else path
+        self.threshold = config.NEAR_DUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = config.NEAR_DUP_PERMUTATIONS if num_perm is None else num_perm
+        self.bands, self.rows = lsh_params(self.threshold, self.num_perm)
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS signatures (id INTEGER PRIMARY KEY, link TEXT, sig BLOB)")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS buckets (band INTEGER, key INTEGER, id INTEGER,
+                                      PRIMARY KEY (band, key)) WITHOUT ROWID""")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+            stored = dict(self._conn.execute("SELECT name, value FROM settings"))
+            current = {'num_perm': str(self.num_perm), 'bands': str(self.bands), 'rows': str(self.rows)}
+            # Signatures and buckets of other parameters cannot be compared: start over
+            if stored and stored != current:
+                self._conn.execute("DELETE FROM signatures")
+                self._conn.execute("DELETE FROM buckets")
+            self._conn.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)", current.items())
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM signatures LIMIT 1").fetchone() is None
+
+    def representatives(self, keys):
+        """``{(band, key): stored id}`` for the band keys already in the index."""
+        pairs = [(band, int(key)) for row in keys for band, key in enumerate(row)]
+        found = {}
+        with self._lock:
+            for start in range(0, len(pairs), _BATCH // 2):
+                chunk = pairs[start:start + _BATCH // 2]
+                placeholders = ','.join(['(?, ?)'] * len(chunk))
+                found.update(((band, key), id_) for band, key, id_ in self._conn.execute(
+                    f"SELECT band, key, id FROM buckets WHERE (band, key) IN (VALUES {placeholders})",
+                    [value for pair in chunk for value in pair]))
+        return found
+
+    def signatures_of(self, ids):
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _BATCH):
+                chunk = ids[start:start + _BATCH]
+                found.update((id_, np.frombuffer(sig, dtype=np.uint32)) for id_, sig in self._conn.execute(
+                    f"SELECT id, sig FROM signatures WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def add(self, links, sigs, keys):
+        """Store articles; each bucket keeps the first article that landed in it as representative."""
+        with self._lock, self._conn:
+            for link, sig, row in zip(links, sigs, keys):
+                id_ = self._conn.execute("INSERT INTO signatures (link, sig) VALUES (?, ?)",
+                                         (link, sig.tobytes())).lastrowid
+                self._conn.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)",
+                                       [(band, int(key), id_) for band, key in enumerate(row)])
+
+    def bootstrap(self, dataset=storage.CLEANED_DATASET):
+        """Index the articles of an existing dataset once (without removing anything)."""
+        for chunk in storage.iter_batches(dataset, columns=['link', 'headline', 'short_description']):
+            sigs = signatures(article_texts(chunk), self.num_perm)
+            self.add(chunk['link'].tolist(), sigs, band_keys(sigs, self.bands, self.rows))
+
+    def close(self):
+        self._conn.close()
+
+
+def drop_near_duplicates(frame, index=None, threshold=None, num_perm=None):
+    """Drop rows of ``frame`` that are near-duplicates of an earlier row or of an article in ``index``.
+
+    Returns ``(kept rows, NearDuplicateReport)``; the kept rows are added to ``index``.
+    """
+    threshold = (index.threshold if index is not None else config.NEAR_DUP_THRESHOLD) if threshold is None else threshold
+    num_perm = (index.num_perm if index is not None else config.NEAR_DUP_PERMUTATIONS) if num_perm is None else num_perm
+    if frame.empty or not threshold:
+        return frame, NearDuplicateReport(len(frame), 0, 0)
+    bands, rows = (index.bands, index.rows) if index is not None else lsh_params(threshold, num_perm)
+    sigs = signatures(article_texts(frame), num_perm)
+    keys = band_keys(sigs, bands, rows)
+
+    # Within the batch: compare each row with the representatives (first kept rows) of its buckets; only kept
+    # rows become representatives, so every dropped row is similar to a kept one, not merely linked to it
+    representative = [{} for _ in range(bands)]
+    duplicate = np.zeros(len(frame), dtype=bool)
+    for i, row in enumerate(keys.tolist()):
+        candidates = {representative[band].get(key) for band, key in enumerate(row)} - {None}
+        if any(similarity(sigs[i], sigs[j]) >= threshold for j in candidates):
+            duplicate[i] = True
+            continue
+        for band, key in enumerate(row):
+            representative[band].setdefault(key, i)
+
+    # Against stored articles: compare with the representative of every shared bucket
+    of_stored = np.zeros(len(frame), dtype=bool)
+    if index is not None:
+        found = index.representatives(keys[~duplicate])
+        stored = index.signatures_of({id_ for id_ in found.values()})
+        for i in np.flatnonzero(~duplicate):
+            candidates = {found.get((band, int(key))) for band, key in enumerate(keys[i])} - {None}
+            of_stored[i] = any(similarity(sigs[i], stored[id_]) >= threshold for id_ in candidates)
+
+    keep = ~duplicate & ~of_stored
+    kept = frame[keep]
+    if index is not None:
+        index.add(kept['link'].tolist() if 'link' in kept.columns else [None] * len(kept), sigs[keep], keys[keep])
+    return kept.reset_index(drop=True), NearDuplicateReport(len(frame), int(duplicate.sum()), int(of_stored.sum()))
@@ -0,0 +1,128 @@
+"""Out-of-core clustering: hashed TF-IDF features and mini-batch KMeans over chunks streamed from disk.
+
+``TfidfVectorizer`` needs the whole corpus and its vocabulary in memory. Here
+the features come from a stateless ``HashingVectorizer``; the only state is a
+document-frequency count per hash bucket, accumulated chunk by chunk. The
+corpus is read and tokenized once: each chunk's hashed term counts are spilled
+to a temporary ``.npz`` file while the IDF statistics are collected, and the
+spilled chunks are then replayed to fit ``MiniBatchKMeans`` with
+``partial_fit`` and to count the categories of each cluster. Memory stays
+bounded by the chunk size and the number of hash buckets, whatever the size of
+the archive.
+"""
+import os
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from senticonomy import config, storage
+from senticonomy.parallel import preprocess_parallel
+from senticonomy.preprocessing import PREPROCESS_VERSION
+from senticonomy.streaming_clusters import category_counts, merge_counts
+from senticonomy.text_cache import cached_apply, corpus_checksum, shared_cache
+
+
+class HashingTfidf:
+    """TF-IDF over hashed features, with IDF statistics updated by ``partial_fit``.
+
+    Uses the same smoothed IDF and l2 normalisation as ``TfidfVectorizer``, so
+    its output can be used wherever the vectorizer's is.
+    """
+
+    def __init__(self, n_features=None, stop_words='english'):
+        self.n_features = config.HASHING_FEATURES if n_features is None else n_features
+        self.hasher = HashingVectorizer(n_features=self.n_features, stop_words=stop_words,
+                                        alternate_sign=False, norm=None)
+        self.document_counts = np.zeros(self.n_features, dtype=np.int64)
+        self.n_documents = 0
+
+    def partial_fit(self, texts):
+        self.partial_fit_counts(self.hasher.transform(texts))
+        return self
+
+    def partial_fit_counts(self, counts):
+        """Update the IDF statistics from a matrix of hashed term counts."""
+        self.document_counts += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+
+    @property
+    def idf_(self):
+        return np.log((1 + self.n_documents) / (1 + self.document_counts)) + 1
+
+    def transform(self, texts):
+        return self.weight(self.hasher.transform(texts))
+
+    def weight(self, counts):
+        """TF-IDF rows for a matrix of hashed term counts."""
+        X = counts.astype(np.float64)
+        X.data *= self.idf_[X.indices]
+        return normalize(X)
+
+
+def dataset_chunks(name=storage.CLEANED_DATASET, chunk_size=None):
+    """Yield ``(cleaned texts, categories)`` chunks of dataset ``name``, preprocessed through the text cache."""
+    chunk_size = config.OUT_OF_CORE_CHUNK_SIZE if chunk_size is None else chunk_size
+    cache = shared_cache('preprocess', PREPROCESS_VERSION)
+    for batch in storage.iter_batches(name, columns=['short_description', 'category'], batch_size=chunk_size,
+                                      use_threads=False):
+        batch = batch.dropna(subset=['short_description'])
+        yield cached_apply(batch['short_description'].astype(str), preprocess_parallel, cache), batch['category']
+
+
+def fit_out_of_core(chunks, n_clusters=11, n_features=None, batch_size=None, random_state=0):
+    """Fit ``HashingTfidf`` and ``MiniBatchKMeans`` on the ``(texts, categories)`` pairs of ``chunks``.
+
+    Returns ``(vectorizer, kmeans, counts, rows, checksum)``: the category counts of each cluster,
+    the number of texts and their ``corpus_checksum``.
+    """
+    batch_size = config.CLUSTER_BATCH_SIZE if batch_size is None else batch_size
+    vectorizer = HashingTfidf(n_features)
+    rows, checksum = 0, None
+    with tempfile.TemporaryDirectory(prefix='senticonomy-ooc-') as spill:
+        paths = []
+        for texts, categories in chunks:
+            term_counts = vectorizer.hasher.transform(texts)
+            vectorizer.partial_fit_counts(term_counts)
+            rows += len(texts)
+            checksum = corpus_checksum(texts, checksum)
+            path = os.path.join(spill, f"{len(paths)}.npz")
+            sp.save_npz(path, term_counts.astype(np.int32))
+            np.save(path + '.categories.npy', np.asarray(categories, dtype=str))
+            paths.append(path)
+
+        def spilled():
+            for path in paths:
+                yield vectorizer.weight(sp.load_npz(path)), np.load(path + '.categories.npy')
+
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=1, compute_labels=False,
+                                 random_state=random_state)
+        for batch in row_batches((X for X, _ in spilled()), batch_size):
+            kmeans.partial_fit(batch)
+
+        counts = {}
+        for X, categories in spilled():
+            counts = merge_counts(counts, category_counts(kmeans.predict(X), categories))
+    return vectorizer, kmeans, counts, rows, checksum
+
+
+def row_batches(matrices, batch_size):
+    """Re-slice a stream of sparse matrices into batches of exactly ``batch_size`` rows (the last one may be short).
+
+    Parquet fragments can be tiny, and the first ``partial_fit`` step needs at
+    least one row per cluster; fixed batches also make the fit independent of the
+    file layout.
+    """
+    pending = None
+    for X in matrices:
+        if pending is not None:
+            X = sp.vstack([pending, X], format='csr')
+        full = X.shape[0] - X.shape[0] % batch_size
+        for start in range(0, full, batch_size):
+            yield X[start:start + batch_size]
+        pending = X[full:] if full < X.shape[0] else None
+    if pending is not None:
+        yield pending
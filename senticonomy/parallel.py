@@ -0,0 +1,87 @@
+"""Multi-core execution of the per-text stages (lemmatization, VADER scoring).
+
+Both stages are pure Python and bound to one core by the GIL, so a corpus is
+split into contiguous chunks that run on a process pool. Each worker loads the
+NLTK resources and the VADER lexicon once, in its initializer, and
+``Executor.map`` returns the chunks in submission order, so the output is the
+same, element for element, as the single-process functions.
+
+The pool is created once per process and reused by every call. Its workers
+start from a fork server (spawned on platforms without one) rather than by
+forking the caller: the Streamlit server is multithreaded, and a child forked
+while another thread holds a lock can deadlock.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from senticonomy import config
+from senticonomy.preprocessing import lemma_table, nltk_resources, preprocess_batch
+from senticonomy.sentiment import polarity_batch, vader_analyzer
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker():
+    nltk_resources()
+    lemma_table()
+    vader_analyzer()
+
+
+def process_pool(workers):
+    """Process-wide pool of ``workers`` processes, started on first use."""
+    with _pools_lock:
+        if workers not in _pools:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                  mp_context=multiprocessing.get_context(method))
+        return _pools[workers]
+
+
+def worker_count(workers=None):
+    """Configured number of processes; 0 means one per CPU core."""
+    workers = config.PARALLEL_WORKERS if workers is None else workers
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def chunked(items, chunk_size):
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def map_chunks(func, items, workers=None, chunk_size=None):
+    """``func(items)`` for a batch function ``func``, computed chunk by chunk on a process pool.
+
+    Runs in-process when one worker is configured or ``items`` fits in a single chunk.
+    """
+    items = list(items)
+    workers = worker_count(workers)
+    chunk_size = config.PARALLEL_CHUNK_SIZE if chunk_size is None else chunk_size
+    chunks = chunked(items, max(1, chunk_size))
+    if workers == 1 or len(chunks) <= 1:
+        return func(items)
+    results = []
+    executor = process_pool(workers)
+    try:
+        for chunk_result in executor.map(func, chunks):
+            results.extend(chunk_result)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); the next call starts a fresh pool
+        with _pools_lock:
+            if _pools.get(workers) is executor:
+                del _pools[workers]
+        raise
+    return results
+
+
+def preprocess_parallel(texts, workers=None, chunk_size=None):
+    """``preprocess_batch`` over ``texts`` on all configured cores."""
+    return map_chunks(preprocess_batch, texts, workers, chunk_size)
+
+
+def polarity_parallel(texts, workers=None, chunk_size=None):
+    """``polarity_batch`` over ``texts`` on all configured cores."""
+    return map_chunks(polarity_batch, texts, workers, chunk_size)
@@ -0,0 +1,85 @@
+"""Text preprocessing shared by the dashboard, the caches and the batch jobs.
+
+``preprocess_text`` is the reference, one-text-at-a-time implementation.
+``normalize_series``/``normalize_chunks`` produce exactly the same output for a
+whole Series (or a stream of chunks) with fewer, precompiled regex passes run
+through pandas string methods, and a bounded token -> lemma table in front of
+WordNet since news vocabulary is Zipfian.
+"""
+import re
+import string
+from functools import lru_cache
+
+import pandas as pd
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+from senticonomy import config
+
+# Bump whenever the rules below change their output: cached results of other versions are discarded
+PREPROCESS_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def nltk_resources():
+    """Stopwords and lemmatizer, loaded once per process."""
+    return set(stopwords.words('english')), WordNetLemmatizer()
+
+
+# Text preprocessing function
+def preprocess_text(text):
+    stop_words, lemmatizer = nltk_resources()
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[%s]' % re.escape(string.punctuation), '', text)
+    text = re.sub(r'\d+', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    tokens = text.split()
+    cleaned_tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words]
+    return ' '.join(cleaned_tokens)
+
+
+# Precompiled passes for the batch normalizer. URLs must go before HTML tags (a URL can
+# swallow a tag's closing bracket), but punctuation and digits are plain character
+# deletions and can share one pass. Collapsing whitespace, stripping and splitting on
+# single spaces is the same as ``str.split()``.
+_URLS = re.compile(r'http\S+|www\S+|https\S+')
+_TAGS = re.compile(r'<.*?>')
+_PUNCTUATION_AND_DIGITS = re.compile(r'[%s\d]+' % re.escape(string.punctuation))
+
+
+@lru_cache(maxsize=None)
+def lemma_table(maxsize=None):
+    """Bounded token -> lemma lookup (``None`` for stopwords), shared by the whole process."""
+    stop_words, lemmatizer = nltk_resources()
+
+    @lru_cache(maxsize=config.LEMMA_CACHE_SIZE if maxsize is None else maxsize)
+    def lemma(token):
+        return None if token in stop_words else lemmatizer.lemmatize(token)
+
+    return lemma
+
+
+def normalize_series(texts, lemma_cache_size=None):
+    """``texts.map(str).apply(preprocess_text)``, computed a pass at a time over the whole Series."""
+    lemma = lemma_table(lemma_cache_size)
+    # Plain Python strings: Arrow-backed string ops lowercase some characters differently
+    texts = pd.Series([str(text) for text in texts], index=texts.index, dtype=object)
+    texts = texts.str.lower()
+    texts = texts.str.replace(_URLS, '', regex=True)
+    texts = texts.str.replace(_TAGS, '', regex=True)
+    texts = texts.str.replace(_PUNCTUATION_AND_DIGITS, '', regex=True)
+    return texts.str.split().map(
+        lambda tokens: ' '.join([l for l in map(lemma, tokens) if l is not None]))
+
+
+def normalize_chunks(chunks, lemma_cache_size=None):
+    """Normalize an iterator of Series chunks lazily, yielding one result chunk per input chunk."""
+    for chunk in chunks:
+        yield normalize_series(chunk, lemma_cache_size)
+
+
+def preprocess_batch(texts):
+    """``preprocess_text`` over a list of texts."""
+    return normalize_series(pd.Series(texts, dtype=object)).tolist()
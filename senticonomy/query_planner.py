@@ -0,0 +1,123 @@
+"""Query planner that collapses per-keyword NewsAPI calls into paginated OR-queries.
+
+Keywords of one category return heavily overlapping articles, so instead of one
+``page_size=20`` call per keyword the planner sends one boolean query per
+category (split only when it would exceed NewsAPI's query length limit),
+restricted to articles published since the newest one already stored for that
+category, and pages through it until it reaches articles already in the master
+file.
+"""
+from dataclasses import dataclass
+
+from senticonomy import config
+from senticonomy.ingestion import NewsQuery
+
+# NewsAPI rejects ``q`` values longer than this
+MAX_QUERY_LENGTH = 500
+
+# What the original strategy asked for on every keyword
+BASELINE_PAGE_SIZE = 20
+
+
+def quote_term(term):
+    """Quote multi-word keywords so they are matched as phrases."""
+    return f'"{term}"' if ' ' in term.strip() else term.strip()
+
+
+def combine_keywords(keywords, max_length=MAX_QUERY_LENGTH):
+    """Join ``keywords`` with ``OR`` into as few queries as fit in ``max_length`` characters."""
+    queries, current = [], ''
+    for term in map(quote_term, keywords):
+        candidate = f"{current} OR {term}" if current else term
+        if current and len(candidate) > max_length:
+            queries.append(current)
+            candidate = term
+        current = candidate
+    if current:
+        queries.append(current)
+    return queries
+
+
+def plan_queries(query_keywords=None, page_size=None, max_pages=None, since=None):
+    """One paginated OR-query per category (more only if the keyword list is very long).
+
+    ``since`` optionally maps a category to the ``publishedAt`` of its newest stored
+    article; the query then only asks for articles from that moment on.
+    """
+    query_keywords = config.QUERY_KEYWORDS if query_keywords is None else query_keywords
+    page_size = config.PLANNER_PAGE_SIZE if page_size is None else page_size
+    max_pages = config.PLANNER_MAX_PAGES if max_pages is None else max_pages
+    since = since or {}
+    return [NewsQuery(category, q, page_size=page_size, max_pages=max_pages, from_param=since.get(category))
+            for category, keywords in query_keywords.items()
+            for q in combine_keywords(keywords)]
+
+
+def latest_published(existing_news):
+    """Newest ``date`` (NewsAPI ``publishedAt``) stored per category in the master frame."""
+    if existing_news.empty:
+        return {}
+    dates = existing_news.dropna(subset=['date']).astype({'date': str})
+    return dates.groupby('category')['date'].max().to_dict()
+
+
+@dataclass
+class PlanReport:
+    """API calls and duplicate articles of a planned run compared with one call per keyword."""
+    baseline_calls: int
+    calls: int
+    fetched: int
+    new: int
+
+    @property
+    def duplicates(self):
+        """Fetched articles that were already known or returned by another query."""
+        return self.fetched - self.new
+
+    @property
+    def calls_saved(self):
+        return self.baseline_calls - self.calls
+
+    @property
+    def baseline_duplicates(self):
+        """Upper bound: assumes every baseline call returned a full page, holding the same new articles.
+
+        Keywords with fewer matches return short pages, so the real baseline has fewer duplicates; only running
+        the baseline measures them (``benchmarks.bench_query_planner``).
+        """
+        return max(0, self.baseline_calls * BASELINE_PAGE_SIZE - self.new)
+
+    @property
+    def duplicates_saved(self):
+        """Upper bound, like ``baseline_duplicates``."""
+        return max(0, self.baseline_duplicates - self.duplicates)
+
+    def as_dict(self):
+        return {
+            'baseline_calls': self.baseline_calls,
+            'calls': self.calls,
+            'calls_saved': self.calls_saved,
+            'fetched_articles': self.fetched,
+            'new_articles': self.new,
+            'duplicate_articles': self.duplicates,
+            'baseline_duplicates_at_most': self.baseline_duplicates,
+            'duplicates_saved_at_most': self.duplicates_saved,
+        }
+
+
+def summarize(results, seen=(), query_keywords=None):
+    """Build a ``PlanReport`` from the ``QueryResult`` objects of a run.
+
+    ``seen`` is anything supporting ``in`` for links: a set or a ``LinkIndex``.
+    """
+    query_keywords = config.QUERY_KEYWORDS if query_keywords is None else query_keywords
+    fetched, links = 0, set()
+    for result in results:
+        fetched += len(result.articles)
+        links.update(article.get('url') for article in result.articles)
+    return PlanReport(
+        baseline_calls=sum(len(keywords) for keywords in query_keywords.values()),
+        calls=sum(result.calls for result in results),
+        fetched=fetched,
+        new=sum(link not in seen for link in links),
+    )
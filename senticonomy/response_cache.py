@@ -0,0 +1,116 @@
+"""Persistent on-disk cache for NewsAPI responses.
+
+Responses are stored in a small SQLite file keyed by the request parameters
+(query, language, sort order, time window and page), expire after a TTL and are
+evicted least-recently-used once the cache grows beyond its size limit. Re-runs
+within the TTL, development iterations and recovery after a crash are then
+served from disk without touching the API.
+
+Pass a ``ResponseCache`` to ``ingestion.fetch_news`` so cached pages also skip the
+rate limiter, or wrap a client in ``CachedNewsClient`` for sequential use.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from senticonomy import config
+
+# Parameters that identify a get_everything request
+KEY_PARAMS = ('q', 'language', 'sort_by', 'from_param', 'to', 'page', 'page_size')
+
+
+def request_key(params):
+    """Stable hash of the parameters that identify a request."""
+    key = {name: params.get(name) for name in KEY_PARAMS}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """TTL + size-bounded LRU cache of JSON responses, safe to share between threads."""
+
+    def __init__(self, path=None, ttl=None, max_bytes=None):
+        self.path = config.RESPONSE_CACHE_PATH if path is None else path
+        self.ttl = config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = config.RESPONSE_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.hits = self.misses = self.evictions = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                  key TEXT PRIMARY KEY, created REAL, accessed REAL, size INTEGER, body TEXT)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, params):
+        """Cached response for ``params``, or ``None`` when missing or expired."""
+        key = request_key(params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT created, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[0] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, params, response):
+        body = json.dumps(response)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                               (request_key(params), now, now, len(body), body))
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'entries': entries, 'bytes': size}
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedNewsClient:
+    """Wraps a ``NewsApiClient`` so ``get_everything`` is answered from the cache when possible."""
+
+    def __init__(self, client, cache=None):
+        self.client = client
+        self.cache = ResponseCache() if cache is None else cache
+
+    def get_everything(self, **params):
+        response = self.cache.get(params)
+        if response is None:
+            response = self.client.get_everything(**params)
+            if response.get('status', 'ok') == 'ok':
+                self.cache.put(params, response)
+        return response
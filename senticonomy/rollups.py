@@ -0,0 +1,180 @@
+"""Incrementally maintained sentiment rollups for the dashboard charts.
+
+The Sentiment Scores page used to group the whole article frame on every
+render. Instead, each ingestion run adds its new articles to one small table
+of day x category x cluster cells holding sums and counts. Sums and counts
+merge, so an ingestion run only adds to them and a chart derives its means from
+the cells in the dashboard's date range. Render time then depends on the number
+of cells, not on the number of articles.
+
+Cluster IDs and sentiment scores depend on the cluster model version and on the
+cascade threshold, so the store records what it was built with. Streaming model
+updates keep cluster IDs stable, so deltas scored with a child of the stored
+version are accepted. Anything else marks the store stale, and the dashboard
+rebuilds it from the loaded frame. Reads share one in-memory copy of the cells
+that is reloaded only after the table changed, by this or any other process.
+The daily per-category ``SentimentSeries`` behind the time-series charts is
+updated by this process's own ingestion runs: each one publishes an updated
+copy, so sessions still reading the previous series never see it change.
+"""
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from senticonomy import config
+from senticonomy.timeseries import SentimentSeries
+
+CELL_KEYS = ['date', 'category', 'cluster']
+CELL_VALUES = ['total', 'count', 'positive', 'negative']
+
+
+def cells(dates, categories, clusters, scores):
+    """Sum/count cells of one batch of articles."""
+    dates = pd.Series(dates)
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates.astype(str).str.slice(0, 10), errors='coerce')
+    frame = pd.DataFrame({'date': dates.dt.strftime('%Y-%m-%d').to_numpy(),
+                          'category': np.asarray(categories, dtype=object),
+                          'cluster': np.asarray(clusters, dtype=np.int64),
+                          'score': np.asarray(scores, dtype=np.float64)}).dropna(subset=['date', 'category'])
+    frame['positive'] = frame['score'] > 0
+    frame['negative'] = frame['score'] < 0
+    grouped = frame.groupby(CELL_KEYS, sort=False, observed=True)
+    return grouped.agg(total=('score', 'sum'), count=('score', 'size'), positive=('positive', 'sum'),
+                       negative=('negative', 'sum')).reset_index()
+
+
+def combine_cells(added, removed=()):
+    """Cells of the articles behind the ``added`` cell frames, less those behind the ``removed`` ones."""
+    parts = [frame[CELL_KEYS + CELL_VALUES] for frame in added]
+    parts += [frame[CELL_KEYS].assign(**{column: -frame[column] for column in CELL_VALUES}) for frame in removed]
+    combined = pd.concat(parts, ignore_index=True).astype({'date': object, 'category': object})
+    combined = combined.groupby(CELL_KEYS, sort=False)[CELL_VALUES].sum().reset_index()
+    return combined[combined['count'] > 0].reset_index(drop=True)
+
+
+class SentimentRollups:
+    """Day x category x cluster sentiment sums and counts, in SQLite."""
+
+    def __init__(self, path=None):
+        self.path = config.ROLLUP_PATH if path is None else path
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._snapshot = self._series = None
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS cells (
+                                      date TEXT, category TEXT, cluster INTEGER,
+                                      total REAL, count INTEGER, positive INTEGER, negative INTEGER,
+                                      PRIMARY KEY (date, category, cluster)) WITHOUT ROWID""")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+
+    def _settings(self):
+        return dict(self._conn.execute("SELECT name, value FROM settings"))
+
+    def is_current(self, model_version, threshold):
+        """Whether the cells were built with cluster model ``model_version`` and cascade ``threshold``."""
+        with self._lock:
+            return self._settings() == {'model_version': str(model_version), 'threshold': str(float(threshold))}
+
+    def _merge(self, batch):
+        self._conn.executemany(
+            """INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(date, category, cluster) DO UPDATE SET
+                   total = total + excluded.total, count = count + excluded.count,
+                   positive = positive + excluded.positive, negative = negative + excluded.negative""",
+            batch[['date', 'category', 'cluster', 'total', 'count', 'positive', 'negative']]
+            .astype({'cluster': int, 'count': int, 'positive': int, 'negative': int})
+            .itertuples(index=False, name=None))
+
+    def _set(self, model_version, threshold):
+        self._writes += 1
+        self._conn.execute("DELETE FROM settings")
+        self._conn.executemany("INSERT INTO settings VALUES (?, ?)",
+                               [('model_version', str(model_version)), ('threshold', str(float(threshold)))])
+
+    def rebuild(self, dates, categories, clusters, scores, model_version, threshold):
+        """Replace every cell with the rollup of the given articles."""
+        self.replace(cells(dates, categories, clusters, scores), model_version, threshold)
+
+    def replace(self, batch, model_version, threshold):
+        """Replace every cell with precomputed ``cells`` (e.g. those of an artifact bundle)."""
+        batch = batch.assign(date=pd.to_datetime(batch['date']).dt.strftime('%Y-%m-%d'))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cells")
+            self._merge(batch)
+            self._set(model_version, threshold)
+
+    def add(self, dates, categories, clusters, scores, model_version, threshold, parent=None):
+        """Fold new articles into the cells.
+
+        Returns ``False`` and marks the store stale instead when the store was built for another threshold, or
+        for a model version that is neither ``model_version`` nor its streaming ``parent``.
+        """
+        batch = cells(dates, categories, clusters, scores)
+        with self._lock, self._conn:
+            stored = self._settings()
+            if stored.get('threshold') != str(float(threshold)) or \
+                    stored.get('model_version') not in (str(model_version), str(parent)):
+                self._conn.execute("DELETE FROM settings")
+                self._writes += 1
+                return False
+            before = self._token()
+            self._merge(batch)
+            self._set(model_version, threshold)
+            if self._series is not None and self._series[0] == before:
+                series = self._series[1].copy()
+                series.add(batch)
+                self._series = (self._token(), series)
+        return True
+
+    def _token(self):
+        # data_version only changes on commits of other connections; _writes counts this one's
+        return self._conn.execute("PRAGMA data_version").fetchone()[0], self._writes
+
+    def frame(self, start=None, end=None):
+        """Cells with ``start <= date <= end`` (dates or ``None`` for open ends)."""
+        with self._lock:
+            token = self._token()
+            if self._snapshot is None or self._snapshot[0] != token:
+                cells_frame = pd.read_sql_query("SELECT * FROM cells", self._conn)
+                cells_frame['date'] = pd.to_datetime(cells_frame['date'])
+                self._snapshot = (token, cells_frame)
+            frame = self._snapshot[1]
+        if start is not None:
+            frame = frame[frame['date'] >= pd.Timestamp(start)]
+        if end is not None:
+            frame = frame[frame['date'] <= pd.Timestamp(end)]
+        return frame
+
+    def rollup(self, by, start=None, end=None):
+        """Mean ``sentiment_score`` plus article, positive and negative counts per ``by`` group."""
+        grouped = self.frame(start, end).groupby(by, observed=True)[['total', 'count', 'positive', 'negative']].sum()
+        grouped['sentiment_score'] = grouped['total'] / grouped['count']
+        return grouped.drop(columns='total').reset_index()
+
+    def series(self):
+        """Daily per-category ``SentimentSeries`` of all cells."""
+        with self._lock:
+            token = self._token()
+            if self._series is not None and self._series[0] == token:
+                return self._series[1]
+        series = SentimentSeries.from_cells(self.frame())
+        with self._lock:
+            self._series = (token, series)
+        return series
+
+    def close(self):
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def rollup_store():
+    """Process-wide store, shared by ingestion and the dashboard."""
+    return SentimentRollups()
@@ -0,0 +1,61 @@
+"""VADER sentiment scoring shared by the dashboard and the batch jobs.
+
+Scores of a given text never change, so ``score_texts`` keeps them in a
+``TextCache`` (one packed ``SCORE_COLUMNS`` vector per text) and only runs the
+analyzer on texts it has not seen before.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from senticonomy.text_cache import cached_apply, shared_cache
+
+SCORE_COLUMNS = ['neg', 'neu', 'pos', 'compound']
+# Bump when the analyzer or its lexicon changes; cached scores of older versions are dropped
+SENTIMENT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def vader_analyzer():
+    """VADER analyzer; the lexicon is parsed once per process."""
+    return SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def score_cache():
+    """Process-wide disk cache of score vectors."""
+    return shared_cache('sentiment', SENTIMENT_VERSION)
+
+
+def polarity_batch(texts):
+    """``polarity_scores`` of each text, as a list of dicts."""
+    analyzer = vader_analyzer()
+    return [analyzer.polarity_scores(str(text)) for text in texts]
+
+
+def score_frame(scores, index=None):
+    """Frame with one ``SCORE_COLUMNS`` row per score dict."""
+    return pd.DataFrame(list(scores), index=index, columns=SCORE_COLUMNS)
+
+
+def pack_scores(scores):
+    """Score dict -> 32-byte float64 vector in ``SCORE_COLUMNS`` order."""
+    return np.array([scores[column] for column in SCORE_COLUMNS], dtype=np.float64).tobytes()
+
+
+def score_texts(texts, compute=polarity_batch, cache=None):
+    """Score frame aligned with ``texts`` (a Series); only texts missing from ``cache`` are scored, in one
+    call to the batch function ``compute`` (e.g. ``parallel.polarity_parallel``).
+    """
+    cache = score_cache() if cache is None else cache
+    texts = texts.astype(str)
+    packed = cached_apply(texts, lambda batch: [pack_scores(scores) for scores in compute(batch)], cache)
+    values = np.frombuffer(b''.join(packed), dtype=np.float64).reshape(-1, len(SCORE_COLUMNS))
+    return pd.DataFrame(values, index=texts.index, columns=SCORE_COLUMNS)
+
+
+def score_text(text):
+    """Score dict of a single text, through the shared cache."""
+    return score_texts(pd.Series([text])).iloc[0].to_dict()
@@ -0,0 +1,89 @@
+"""Read-only enriched article frame shared by every dashboard session.
+
+The web app used to keep its own copy of the enriched frame in each browser
+session's state, and ``st.cache_data`` unpickled yet another copy on every
+rerun, so memory grew with the number of concurrent users. ``SharedFrame``
+writes the frame once to an Arrow IPC file and memory-maps it. ``frame()``
+hands each rerun a pandas view over the mapped buffers. Building the view
+copies nothing and takes about a millisecond, and the pages are shared with
+the OS page cache rather than counted per session.
+
+Numeric buffers are read-only, so writing values in place raises instead of
+changing what other sessions see. Assigning or replacing a column only
+affects the view it is assigned on.
+
+A frame can also map several files with the same columns (the segments of an
+artifact bundle) as one table. Views of it concatenate the numeric and
+category columns of the segments; Arrow-backed string columns stay mapped.
+"""
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+def _unify(tables):
+    """``tables`` cast to one schema: dictionary indices widened to the widest, dictionaries mixed with plain
+    values decoded. Only the columns that differ are converted."""
+    schema = tables[0].schema
+    for index, field in enumerate(schema):
+        types = {table.schema.field(field.name).type for table in tables}
+        if len(types) == 1:
+            continue
+        if all(pa.types.is_dictionary(type_) for type_ in types):
+            widest = max((type_.index_type for type_ in types), key=lambda type_: type_.bit_width)
+            target = pa.dictionary(widest, field.type.value_type)
+        else:
+            values = {type_.value_type if pa.types.is_dictionary(type_) else type_ for type_ in types}
+            target = pa.large_string() if pa.large_string() in values else values.pop()
+        schema = schema.set(index, field.with_type(target))
+    return [table if table.schema.equals(schema) else table.select(schema.names).cast(schema) for table in tables]
+
+
+class SharedFrame:
+    """Memory-mapped Arrow IPC file (or files) of enriched articles."""
+
+    def __init__(self, path):
+        self.path = path
+        paths = [path] if isinstance(path, (str, os.PathLike)) else list(path)
+        tables = [ipc.open_file(pa.memory_map(p)).read_all() for p in paths]
+        self._table = tables[0] if len(tables) == 1 else pa.concat_tables(_unify(tables))
+
+    @classmethod
+    def publish(cls, frame, path):
+        """Write ``frame`` to ``path`` (atomically replacing an older file) and map it.
+
+        Processes that mapped the older file keep reading it until they publish or open again.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with pa.OSFile(tmp, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        return cls(path)
+
+    def __len__(self):
+        return self._table.num_rows
+
+    @property
+    def table(self):
+        """The mapped Arrow table."""
+        return self._table
+
+    @property
+    def columns(self):
+        return self._table.column_names
+
+    @property
+    def nbytes(self):
+        """Size of the mapped column buffers."""
+        return self._table.nbytes
+
+    def frame(self, columns=None):
+        """A new pandas view of ``columns`` (default all) over the mapped buffers."""
+        table = self._table if columns is None else self._table.select(list(columns))
+        # split_blocks keeps one array per column, so numeric columns are not consolidated into a copy
+        return table.to_pandas(split_blocks=True, date_as_object=False)
@@ -0,0 +1,215 @@
+"""Top-N similar stored articles for a query text.
+
+The index is built from the same rows KMeans was fitted on and stored with
+the model version, next to the article identifiers it points to:
+
+* raw TF-IDF models keep the document matrix in CSC layout, an inverted index:
+  a query only touches the posting columns of its own terms (a handful of the
+  1000) instead of every stored row;
+* SVD models keep the dense, l2-normalised embeddings in row order and score
+  them block by block, keeping a running top-N, so memory stays bounded by the
+  block size over a memory-mapped file.
+
+Rows are l2-normalised in both cases, so the dot product is the cosine similarity.
+
+An index is a list of segments of consecutive rows (``similarity/<name>/``,
+listed in order in ``similarity/segments.json``). A streaming model update
+hard-links its parent's segments and writes the new rows as one more segment,
+so its cost follows the batch rather than the archive. A segment no larger than
+the one after it is merged with it, as in artifact bundles, which keeps
+O(log n) segments; a query takes the top N of each segment and merges them.
+"""
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import scipy.sparse as sp
+
+from senticonomy import config
+
+MATRIX_FILE = 'index_matrix.npz'
+VECTORS_FILE = 'index_vectors.npy'
+ARTICLES_FILE = 'index_articles.arrow'
+INDEX_FILES = (MATRIX_FILE, VECTORS_FILE, ARTICLES_FILE)
+INDEX_DIR = 'similarity'
+SEGMENTS_FILE = 'segments.json'
+ARTICLE_COLUMNS = ['link', 'headline', 'category', 'short_description']
+
+
+def _write_segment(directory, X, articles):
+    """Store rows ``X`` (aligned with the ``articles`` frame) as a new segment of ``directory``; return its entry."""
+    name = uuid.uuid4().hex[:16]
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    if sp.issparse(X):
+        sp.save_npz(os.path.join(path, MATRIX_FILE), sp.csc_matrix(X, dtype=np.float32), compressed=False)
+    else:
+        np.save(os.path.join(path, VECTORS_FILE), np.asarray(X, dtype=np.float32))
+    columns = [c for c in ARTICLE_COLUMNS if c in articles.columns]
+    table = pa.Table.from_pandas(articles[columns].astype('string').reset_index(drop=True), preserve_index=False)
+    feather.write_feather(table, os.path.join(path, ARTICLES_FILE), compression='uncompressed')
+    return {'name': name, 'rows': len(table)}
+
+
+def _write_segments(directory, segments):
+    tmp = os.path.join(directory, f".{SEGMENTS_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(segments, f)
+    os.replace(tmp, os.path.join(directory, SEGMENTS_FILE))
+
+
+def index_segments(path):
+    """``[(directory, rows)]`` of the index segments of model version ``path``, in row order.
+
+    Versions written before segments hold a single segment in their own directory.
+    """
+    directory = os.path.join(path, INDEX_DIR)
+    if os.path.exists(os.path.join(directory, SEGMENTS_FILE)):
+        with open(os.path.join(directory, SEGMENTS_FILE), encoding='utf-8') as f:
+            return [(os.path.join(directory, segment['name']), segment['rows']) for segment in json.load(f)]
+    if os.path.exists(os.path.join(path, ARTICLES_FILE)):
+        return [(path, feather.read_table(os.path.join(path, ARTICLES_FILE), memory_map=True).num_rows)]
+    return []
+
+
+def _merge_segments(directory, segments):
+    """Replace consecutive ``segments`` of ``directory`` by one segment with their rows; return its entry."""
+    paths = [os.path.join(directory, segment['name']) for segment in segments]
+    if os.path.exists(os.path.join(paths[0], MATRIX_FILE)):
+        X = sp.vstack([sp.load_npz(os.path.join(path, MATRIX_FILE)) for path in paths], format='csc')
+    else:
+        X = np.vstack([np.load(os.path.join(path, VECTORS_FILE), mmap_mode='r') for path in paths])
+    articles = pa.concat_tables([feather.read_table(os.path.join(path, ARTICLES_FILE)) for path in paths])
+    merged = _write_segment(directory, X, articles.to_pandas())
+    del X, articles
+    for path in paths:
+        shutil.rmtree(path)
+    return merged
+
+
+def write_index(path, X, articles):
+    """Store the index of rows ``X`` (aligned with the ``articles`` frame) in model version ``path``."""
+    directory = os.path.join(path, INDEX_DIR)
+    os.makedirs(directory, exist_ok=True)
+    _write_segments(directory, [_write_segment(directory, X, articles)])
+
+
+def extend_index(path, source, X, articles):
+    """Store in model version ``path`` the index of version ``source`` followed by rows ``X`` and their ``articles``.
+
+    The segments of ``source`` are hard-linked (copied where links fail), not rewritten.
+    """
+    directory = os.path.join(path, INDEX_DIR)
+    os.makedirs(directory, exist_ok=True)
+    segments = []
+    for segment, rows in index_segments(source):
+        name = uuid.uuid4().hex[:16]
+        os.makedirs(os.path.join(directory, name))
+        for file in INDEX_FILES:
+            if os.path.exists(os.path.join(segment, file)):
+                try:
+                    os.link(os.path.join(segment, file), os.path.join(directory, name, file))
+                except OSError:
+                    shutil.copy2(os.path.join(segment, file), os.path.join(directory, name, file))
+        segments.append({'name': name, 'rows': rows})
+    if len(articles):
+        segments.append(_write_segment(directory, X, articles))
+    while len(segments) > 1 and segments[-2]['rows'] <= segments[-1]['rows']:
+        segments[-2:] = [_merge_segments(directory, segments[-2:])]
+    _write_segments(directory, segments)
+
+
+def has_index(path):
+    return bool(index_segments(path))
+
+
+def top_n(scores, n):
+    """Positions of the ``n`` largest ``scores``, best first."""
+    n = min(n, len(scores))
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(-scores, n - 1)[:n]
+    return best[np.argsort(-scores[best], kind='stable')]
+
+
+class SimilarityIndex:
+    """Read side of the index of a model version; each segment's files are loaded on first use."""
+
+    def __init__(self, path, block_rows=None):
+        self.path = path
+        self.block_rows = config.SIMILARITY_BLOCK_ROWS if block_rows is None else block_rows
+        segments = index_segments(path)
+        self.segments = [SegmentIndex(segment, self.block_rows) for segment, _ in segments]
+        self.offsets = np.cumsum([0] + [rows for _, rows in segments])[:-1]
+        self._articles = None
+
+    @property
+    def articles(self):
+        if self._articles is None:
+            self._articles = pa.concat_tables([segment.articles for segment in self.segments])
+        return self._articles
+
+    def search(self, query, n=5):
+        """``(rows, scores)`` of the ``n`` stored rows most similar to the single feature row ``query``."""
+        results = [segment.search(query, n) for segment in self.segments]
+        rows = np.concatenate([np.zeros(0, dtype=np.int64)] +
+                              [found + offset for (found, _), offset in zip(results, self.offsets)])
+        scores = np.concatenate([np.zeros(0, dtype=np.float32)] + [scores for _, scores in results])
+        best = top_n(scores, n)
+        return rows[best], scores[best]
+
+    def similar(self, query, n=5):
+        """Frame of the ``n`` most similar articles with a ``similarity`` column, best first."""
+        rows, scores = self.search(query, n)
+        frame = self.articles.take(pa.array(rows, type=pa.int64())).to_pandas()
+        frame['similarity'] = scores
+        return frame
+
+
+class SegmentIndex:
+    """One segment of an index; files are loaded on first use."""
+
+    def __init__(self, path, block_rows):
+        self.path = path
+        self.block_rows = block_rows
+        self._matrix = self._vectors = self._articles = None
+
+    @property
+    def articles(self):
+        if self._articles is None:
+            self._articles = feather.read_table(os.path.join(self.path, ARTICLES_FILE), memory_map=True)
+        return self._articles
+
+    def search(self, query, n=5):
+        """``(rows, scores)`` of the ``n`` segment rows most similar to the single feature row ``query``."""
+        if os.path.exists(os.path.join(self.path, MATRIX_FILE)):
+            return self._search_sparse(sp.csr_matrix(query), n)
+        return self._search_dense(np.asarray(query, dtype=np.float32).ravel(), n)
+
+    def _search_sparse(self, query, n):
+        if self._matrix is None:
+            self._matrix = sp.load_npz(os.path.join(self.path, MATRIX_FILE)).tocsc()
+        if query.nnz == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        # Only the posting lists of the query's terms are read
+        scores = self._matrix[:, query.indices] @ query.data.astype(np.float32)
+        rows = top_n(scores, n)
+        return rows, scores[rows]
+
+    def _search_dense(self, query, n):
+        if self._vectors is None:
+            self._vectors = np.load(os.path.join(self.path, VECTORS_FILE), mmap_mode='r')
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(self._vectors), self.block_rows):
+            scores = self._vectors[start:start + self.block_rows] @ query
+            rows = top_n(scores, n)
+            best_rows = np.concatenate([best_rows, rows + start])
+            best_scores = np.concatenate([best_scores, scores[rows]])
+            keep = top_n(best_scores, n)
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+        return best_rows, best_scores
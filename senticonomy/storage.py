@@ -0,0 +1,456 @@
+"""Partitioned Parquet storage for the news datasets.
+
+Each dataset (the ``updated_news`` master file, the cleaned data set, ...) is a
+directory of Parquet files partitioned by publication month and category, with
+typed columns. Reads project only the requested columns and push date/category
+predicates down to partition pruning and row-group statistics, so loading the
+recent slice of a large history does not parse the rest of it. CSV is kept as
+an export format only (``export``), written batch by batch like the
+Parquet and gzip-compressed CSV exports. ``read_page`` serves one sorted,
+filtered page without loading the rest of the dataset.
+
+    data/Cleaned_News_DataSet/month=2025-01/category=TECH/part-<uuid>-0.parquet
+"""
+import datetime
+import gzip
+import hashlib
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from senticonomy import config
+
+MASTER_DATASET = 'updated_news'
+CLEANED_DATASET = 'Cleaned_News_DataSet'
+
+# Raw NewsAPI rows keep the full publishedAt timestamp
+RAW_SCHEMA = pa.schema([
+    ('link', pa.string()),
+    ('headline', pa.string()),
+    ('category', pa.string()),
+    ('short_description', pa.string()),
+    ('authors', pa.string()),
+    ('date', pa.timestamp('s', tz='UTC')),
+])
+
+# Cleaned rows are day-resolution
+CLEANED_SCHEMA = RAW_SCHEMA.set(RAW_SCHEMA.get_field_index('date'), pa.field('date', pa.date32()))
+
+SCHEMAS = {MASTER_DATASET: RAW_SCHEMA, CLEANED_DATASET: CLEANED_SCHEMA}
+
+EXPORT_FORMATS = ('csv', 'csv.gz', 'parquet')
+
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string()), ('category', pa.string())]), flavor='hive')
+
+# Lists of the files ``compact`` replaced, one file per compaction; synced with the data files so other
+# hosts and S3 drop exactly those (names starting with '_' or '.' are not read as data)
+REPLACED_DIR = '_replaced'
+
+
+def dataset_path(name):
+    return os.path.join(config.DATA_DIR, name)
+
+
+def exists(name):
+    return any(True for _ in data_files(name))
+
+
+def signature(name):
+    """Token that changes whenever files are added to or removed from dataset ``name`` (files are immutable
+    and uniquely named, so their names are enough); a cache key for values computed from the dataset."""
+    digest = hashlib.blake2b(digest_size=8)
+    for local in data_files(name):
+        digest.update(_key(local).encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+def _key(local):
+    return os.path.relpath(local, config.DATA_DIR).replace(os.sep, '/')
+
+
+def _local(key):
+    return os.path.join(config.DATA_DIR, *key.split('/'))
+
+
+def data_files(name):
+    """Paths of the Parquet files of dataset ``name`` (staging files and ``REPLACED_DIR`` excluded)."""
+    for root, dirs, files in os.walk(dataset_path(name)):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(('.', '_')))
+        for f in sorted(files):
+            if not f.startswith(('.', '_')):
+                yield os.path.join(root, f)
+
+
+def to_table(frame, schema):
+    """Arrow table for ``frame`` with the schema's column types plus a ``month`` partition column."""
+    frame = frame.copy()
+    if 'date' in frame.columns:
+        dates = pd.to_datetime(frame['date'], utc=True, errors='coerce', format='mixed')
+        frame['date'] = dates.dt.floor('D') if pa.types.is_date(schema.field('date').type) else dates
+    for name in schema.names:
+        if name in frame.columns and name != 'date':
+            frame[name] = frame[name].astype('string')
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for field in schema:
+        if field.name in table.column_names:
+            table = table.set_column(table.column_names.index(field.name), field, table[field.name].cast(field.type))
+    month = pc.strftime(table['date'], format='%Y-%m') if 'date' in table.column_names else pa.nulls(len(table), pa.string())
+    return table.append_column('month', month)
+
+
+def write_dataset(frame, name, mode='append'):
+    """Write ``frame`` to dataset ``name``; ``append`` adds new files, ``overwrite`` replaces the dataset."""
+    path = dataset_path(name)
+    if mode == 'overwrite' and os.path.isdir(path):
+        shutil.rmtree(path)
+    if frame.empty:
+        return
+    ds.write_dataset(to_table(frame, SCHEMAS.get(name, RAW_SCHEMA)), path, format='parquet',
+                     partitioning=PARTITIONING, basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                     existing_data_behavior='overwrite_or_ignore')
+
+
+def _scalar(value, type_):
+    value = pd.Timestamp(value)
+    if pa.types.is_date(type_):
+        return pa.scalar(value.date(), type=type_)
+    return pa.scalar(value.tz_localize('UTC') if value.tzinfo is None else value, type=type_)
+
+
+def open_dataset(name):
+    return ds.dataset(dataset_path(name), format='parquet', partitioning=PARTITIONING)
+
+
+def build_filter(name, start=None, end=None, categories=None, search=None):
+    """Dataset expression for a date range (inclusive), category list and case-insensitive ``search`` in the
+    headline or description, including partition pruning."""
+    date_type = SCHEMAS.get(name, RAW_SCHEMA).field('date').type
+    expression = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if start is not None:
+        expression = both(expression, ds.field('month') >= pd.Timestamp(start).strftime('%Y-%m'))
+        expression = both(expression, ds.field('date') >= _scalar(start, date_type))
+    if end is not None:
+        expression = both(expression, ds.field('month') <= pd.Timestamp(end).strftime('%Y-%m'))
+        if pa.types.is_date(date_type):
+            expression = both(expression, ds.field('date') <= _scalar(end, date_type))
+        else:
+            expression = both(expression, ds.field('date') < _scalar(pd.Timestamp(end) + pd.Timedelta(days=1), date_type))
+    if categories is not None:
+        expression = both(expression, ds.field('category').isin(list(categories)))
+    if search:
+        expression = both(expression, pc.match_substring(ds.field('headline'), search, ignore_case=True) |
+                          pc.match_substring(ds.field('short_description'), search, ignore_case=True))
+    return expression
+
+
+def default_columns(name):
+    """Stored columns of ``name`` in schema order (the ``category`` partition key included)."""
+    order = SCHEMAS.get(name, RAW_SCHEMA).names
+    names = [n for n in open_dataset(name).schema.names if n != 'month']
+    return sorted(names, key=lambda n: order.index(n) if n in order else len(order))
+
+
+def read_table(name, columns=None, start=None, end=None, categories=None):
+    """Arrow table of dataset ``name`` restricted to ``columns`` and the given date range/categories."""
+    if not exists(name):
+        schema = SCHEMAS.get(name, RAW_SCHEMA)
+        return schema.empty_table().select(columns or schema.names)
+    columns = list(columns) if columns is not None else default_columns(name)
+    return open_dataset(name).to_table(columns=columns, filter=build_filter(name, start, end, categories))
+
+
+def read_dataset(name, columns=None, start=None, end=None, categories=None):
+    """Pandas frame of dataset ``name`` (see ``read_table``); dates come back as ``datetime64``."""
+    return read_table(name, columns, start, end, categories).to_pandas(date_as_object=False)
+
+
+def iter_batches(name, columns=None, batch_size=100_000, use_threads=True, **filters):
+    """Stream dataset ``name`` as pandas frames of at most ``batch_size`` rows.
+
+    The threaded scanner reads ahead of a slow consumer without bound; pass
+    ``use_threads=False`` to keep memory flat over a very large dataset.
+    """
+    if not exists(name):
+        return
+    columns = list(columns) if columns is not None else default_columns(name)
+    scanner = open_dataset(name).scanner(columns=columns, filter=build_filter(name, **filters), batch_size=batch_size,
+                                         use_threads=use_threads)
+    # Files and row groups come out as small batches; converting each to pandas separately costs more than the data
+    pending, rows = [], 0
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            pending.append(batch)
+            rows += batch.num_rows
+        while rows >= batch_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, batch_size).to_pandas(date_as_object=False)
+            pending, rows = table.slice(batch_size).to_batches(), rows - batch_size
+    if rows:
+        yield pa.Table.from_batches(pending).to_pandas(date_as_object=False)
+
+
+def count_rows(name, **filters):
+    """Rows of dataset ``name`` matching the filters (partition and row-group pruning apply)."""
+    if not exists(name):
+        return 0
+    return open_dataset(name).count_rows(filter=build_filter(name, **filters))
+
+
+def read_page(name, columns=None, offset=0, limit=50, sort_by=None, descending=False, **filters):
+    """Rows ``offset`` to ``offset + limit`` of dataset ``name`` in ``sort_by`` order, as a pandas frame.
+
+    Unsorted pages skip whole files by their row counts (read from Parquet metadata unless ``search`` is set)
+    and read only the files the page falls in. Sorting by ``date`` reads whole months, newest or oldest first,
+    and stops once the page is full. Other sort keys read only the sort column, sort it, and then read just the
+    files holding the page's rows. Memory holds the page plus one file, month or column, never the dataset.
+    """
+    if not exists(name):
+        return read_dataset(name, columns)
+    columns = list(columns) if columns is not None else default_columns(name)
+    dataset, expression = open_dataset(name), build_filter(name, **filters)
+    wanted = offset + limit
+    order = 'descending' if descending else 'ascending'
+
+    if sort_by is None:
+        kept, seen = [], 0
+        for fragment in dataset.get_fragments(filter=expression):
+            part = None
+            if filters.get('search'):
+                # Substring matches are only known after reading the text, so count by reading
+                part = fragment.to_table(schema=dataset.schema, columns=columns, filter=expression)
+                rows = part.num_rows
+            else:
+                rows = ds.Scanner.from_fragment(fragment, schema=dataset.schema, filter=expression).count_rows()
+            if seen + rows > offset:
+                if part is None:
+                    part = fragment.to_table(schema=dataset.schema, columns=columns, filter=expression)
+                kept.append(part.slice(max(offset - seen, 0), wanted - max(seen, offset)))
+            seen += rows
+            if seen >= wanted:
+                break
+        table = pa.concat_tables(kept) if kept else None
+
+    elif sort_by == 'date':
+        months = {ds.get_partition_keys(fragment.partition_expression).get('month')
+                  for fragment in dataset.get_fragments(filter=expression)}
+        # Unparseable dates land in a null month; their rows sort last either way, like nulls within a month
+        ordered = sorted(months - {None}, reverse=descending) + ([None] if None in months else [])
+        parts, rows = [], 0
+        for month in ordered:
+            month_filter = ds.field('month').is_null() if month is None else ds.field('month') == month
+            part = dataset.to_table(columns=columns, filter=month_filter if expression is None else
+                                    expression & month_filter)
+            parts.append(part.take(pc.sort_indices(part, sort_keys=[('date', order)])))
+            rows += part.num_rows
+            if rows >= wanted:
+                break
+        table = pa.concat_tables(parts).slice(offset, limit) if parts else None
+
+    else:
+        fragments = list(dataset.get_fragments(filter=expression))
+        keys = [fragment.to_table(schema=dataset.schema, columns=[sort_by], filter=expression)
+                for fragment in fragments]
+        table = None
+        if keys:
+            starts = np.cumsum([0] + [part.num_rows for part in keys])
+            positions = pc.sort_indices(pa.concat_tables(keys), sort_keys=[(sort_by, order)])
+            positions = positions.to_numpy().astype(np.int64)[offset:wanted]
+            owners = np.searchsorted(starts, positions, side='right') - 1
+            parts, page_rows = [], []
+            for owner in np.unique(owners):
+                mine = np.flatnonzero(owners == owner)
+                part = fragments[owner].to_table(schema=dataset.schema, columns=columns, filter=expression)
+                parts.append(part.take(positions[mine] - starts[owner]))
+                page_rows.append(mine)
+            if parts:
+                table = pa.concat_tables(parts).take(np.argsort(np.concatenate(page_rows)))
+
+    if table is None:
+        return SCHEMAS.get(name, RAW_SCHEMA).empty_table().select(columns).to_pandas(date_as_object=False)
+    return table.to_pandas(date_as_object=False)
+
+
+def _write_batches(batches, out_path, fmt):
+    """Write pandas ``batches`` to ``out_path`` as one ``EXPORT_FORMATS`` file; returns the number of rows."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    rows = 0
+    if fmt == 'parquet':
+        writer = None
+        try:
+            for batch in batches:
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema, compression='zstd')
+                writer.write_table(table.cast(writer.schema))
+                rows += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+    # zlib's default level: most of level 9's ratio at a fraction of its time
+    out = gzip.open(out_path, 'wt', compresslevel=6, newline='', encoding='utf-8') if fmt == 'csv.gz' else \
+        open(out_path, 'w', newline='', encoding='utf-8')
+    with out:
+        for batch in batches:
+            batch.to_csv(out, header=rows == 0, index=False)
+            rows += len(batch)
+    return rows
+
+
+def export(name, out_path, fmt='csv', columns=None, transform=None, batch_size=100_000, **filters):
+    """Write dataset ``name`` to ``out_path`` batch by batch and return the number of rows.
+
+    ``fmt`` is one of ``EXPORT_FORMATS``; ``transform`` (frame -> frame) can add columns to each batch.
+    """
+    batches = iter_batches(name, columns, batch_size=batch_size, use_threads=False, **filters)
+    return _write_batches(batches if transform is None else map(transform, batches), out_path, fmt)
+
+
+def export_frame(frame, out_path, fmt='csv', batch_size=100_000):
+    """Write an in-memory ``frame`` the same way, ``batch_size`` rows at a time."""
+    return _write_batches((frame.iloc[i:i + batch_size] for i in range(0, len(frame), batch_size)), out_path, fmt)
+
+
+def export_csv(name, out_path, columns=None, **filters):
+    """Write dataset ``name`` to a CSV file batch by batch and return the number of rows."""
+    return export(name, out_path, 'csv', columns, **filters)
+
+
+def import_csv(csv_path, name, chunksize=200_000):
+    """One-off migration of a legacy CSV file into dataset ``name``."""
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        write_dataset(chunk, name)
+
+
+def ensure_dataset(name, legacy_csv=None):
+    """Migrate ``legacy_csv`` into dataset ``name`` the first time it is needed."""
+    if not exists(name) and legacy_csv and os.path.exists(legacy_csv):
+        import_csv(legacy_csv, name)
+
+
+def compact(name):
+    """Rewrite every partition of ``name`` as a single file (appends leave one small file per run).
+
+    The keys of the files it replaces are recorded under ``REPLACED_DIR`` before they are removed, so
+    ``upload_dataset``/``download_dataset`` remove those files, and only those, from S3 and other hosts.
+    """
+    partitions = {}
+    for local in data_files(name):
+        partitions.setdefault(os.path.dirname(local), []).append(local)
+    replaced = []
+    for root, parts in partitions.items():
+        if len(parts) < 2:
+            continue
+        table = pa.concat_tables([pq.read_table(f, partitioning=None) for f in parts], promote_options='permissive')
+        target = f"part-{uuid.uuid4().hex}-0.parquet"
+        pq.write_table(table, os.path.join(root, '.' + target))
+        os.replace(os.path.join(root, '.' + target), os.path.join(root, target))
+        replaced.extend(parts)
+    if not replaced:
+        return
+    _write_atomic(os.path.join(dataset_path(name), REPLACED_DIR, f"{uuid.uuid4().hex}.txt"),
+                  ''.join(_key(f) + '\n' for f in replaced))
+    for f in replaced:
+        os.remove(f)
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = os.path.join(os.path.dirname(path), '.' + os.path.basename(path))
+    with open(staging, 'w') as f:
+        f.write(text)
+    os.replace(staging, path)
+
+
+def _replaced_keys(name):
+    """Keys of every file a ``compact`` run (on any host) replaced in dataset ``name``."""
+    directory = os.path.join(dataset_path(name), REPLACED_DIR)
+    if not os.path.isdir(directory):
+        return set()
+    keys = set()
+    for f in os.listdir(directory):
+        if not f.startswith('.'):
+            with open(os.path.join(directory, f)) as lines:
+                keys.update(line.strip() for line in lines if line.strip())
+    return keys
+
+
+def _download(s3_client, bucket, key):
+    local = _local(key)
+    staging = os.path.join(os.path.dirname(local), '.' + os.path.basename(local))
+    os.makedirs(os.path.dirname(local), exist_ok=True)
+    s3_client.download_file(bucket, key, staging)
+    os.replace(staging, local)
+
+
+def _sync_replaced(s3_client, bucket, name, remote):
+    """Fetch the replacement lists missing locally, drop the local files they name and return all their keys."""
+    prefix = f"{name}/{REPLACED_DIR}/"
+    for key in remote:
+        if key.startswith(prefix) and not os.path.exists(_local(key)):
+            _download(s3_client, bucket, key)
+    replaced = _replaced_keys(name)
+    for key in replaced:
+        if os.path.exists(_local(key)):
+            os.remove(_local(key))
+    return replaced
+
+
+def upload_dataset(s3_client, bucket, name):
+    """Upload the files of dataset ``name`` that S3 does not have yet.
+
+    Add-only: a remote key is deleted only when a ``compact`` replacement list names it, never because
+    this host lacks it (another host may have written it). Files are immutable once written, so existing
+    keys never need re-uploading.
+    """
+    remote = set(_list_keys(s3_client, bucket, name + '/'))
+    replaced = _sync_replaced(s3_client, bucket, name, remote)
+    directory = os.path.join(dataset_path(name), REPLACED_DIR)
+    lists = [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if not f.startswith('.')] \
+        if os.path.isdir(directory) else []
+    # Data first, then the replacement lists, then the deletions they call for
+    for local in list(data_files(name)) + lists:
+        key = _key(local)
+        if key not in remote and key not in replaced:
+            s3_client.upload_file(local, bucket, key)
+    for key in sorted(remote & replaced):
+        s3_client.delete_object(Bucket=bucket, Key=key)
+
+
+def download_dataset(s3_client, bucket, name):
+    """Download the files of dataset ``name`` missing locally.
+
+    Add-only: a local file is removed only when a ``compact`` replacement list names it, so rows written
+    locally but not uploaded yet are never lost.
+    """
+    remote = set(_list_keys(s3_client, bucket, name + '/'))
+    replaced = _sync_replaced(s3_client, bucket, name, remote)
+    for key in sorted(remote - replaced):
+        if not key.startswith(f"{name}/{REPLACED_DIR}/") and not os.path.exists(_local(key)):
+            _download(s3_client, bucket, key)
+
+
+def _list_keys(s3_client, bucket, prefix):
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get('Contents', []):
+            yield item['Key']
+
+
+def date_range(days, today=None):
+    """``(start, end)`` covering the last ``days`` days, or ``(None, None)`` for everything."""
+    if not days:
+        return None, None
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=days - 1), today
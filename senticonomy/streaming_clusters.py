@@ -0,0 +1,62 @@
+"""Online cluster updates with ``MiniBatchKMeans.partial_fit``.
+
+New articles move the centroids of the stored model instead of triggering a
+full refit. The update starts from the stored centroids in their stored order
+and never reassigns a centroid (``reassignment_ratio=0``), so cluster ``i``
+stays cluster ``i`` and the ``category_cluster`` labels do not reshuffle. The
+articles a centroid was fitted on enter the first mini-batch as one
+pseudo-point per cluster, weighted by the cluster size, which makes each step
+a running weighted mean over the whole history rather than over the new batch
+alone.
+"""
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+
+
+def category_counts(clusters, categories):
+    """``{cluster: {category: articles}}``."""
+    counts = {}
+    for cluster, category in zip(clusters, categories):
+        per_cluster = counts.setdefault(int(cluster), {})
+        per_cluster[category] = per_cluster.get(category, 0) + 1
+    return counts
+
+
+def merge_counts(counts, more):
+    merged = {cluster: dict(per_cluster) for cluster, per_cluster in counts.items()}
+    for cluster, per_cluster in more.items():
+        target = merged.setdefault(cluster, {})
+        for category, n in per_cluster.items():
+            target[category] = target.get(category, 0) + n
+    return merged
+
+
+def majority_category(counts, n_clusters):
+    """Most frequent category of each cluster (``"Unknown"`` for empty ones)."""
+    return {cluster: max(counts[cluster].items(), key=lambda item: item[1])[0] if counts.get(cluster) else "Unknown"
+            for cluster in range(n_clusters)}
+
+
+def cluster_sizes(counts, n_clusters):
+    return np.array([sum(counts.get(cluster, {}).values()) for cluster in range(n_clusters)], dtype=np.float64)
+
+
+def update_kmeans(centers, sizes, X, batch_size=1024, random_state=0):
+    """Fold the rows of ``X`` into ``centers`` (fitted on ``sizes`` articles each) and return ``(model, labels)``.
+
+    ``labels`` are the clusters of the rows of ``X`` once the update is done.
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    model = MiniBatchKMeans(n_clusters=len(centers), init=centers, n_init=1, batch_size=batch_size,
+                            reassignment_ratio=0, compute_labels=False, random_state=random_state)
+    history = sp.csr_matrix(centers) if sp.issparse(X) else centers
+    weights = np.maximum(sizes, 1)
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size]
+        if start == 0:
+            batch = sp.vstack([history, batch], format='csr') if sp.issparse(X) else np.vstack([history, batch])
+            model.partial_fit(batch, sample_weight=np.concatenate([weights, np.ones(batch.shape[0] - len(weights))]))
+        else:
+            model.partial_fit(batch)
+    return model, model.predict(X)
@@ -0,0 +1,153 @@
+"""Disk-backed, content-addressed cache for per-text results.
+
+``st.cache_data`` only lives as long as the Streamlit process, so every deploy
+or restart used to lemmatize the whole corpus again although historical
+articles never change. Results are stored in SQLite keyed by a hash of the raw
+text; each entry records the version of the rules that produced it, and the
+first process to open the cache with a newer version drops the stale entries.
+``shared_cache`` hands out one instance per namespace and process.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from senticonomy import config
+
+# Max host parameters per SQLite statement
+_BATCH = 500
+
+
+def text_key(text):
+    """128-bit content hash of ``text``."""
+    return hashlib.blake2b(str(text).encode('utf-8'), digest_size=16).digest()
+
+
+def corpus_fingerprint(texts):
+    """Order-independent hash of the distinct training texts."""
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted({text_key(text) for text in texts}):
+        digest.update(key)
+    return digest.hexdigest()
+
+
+def corpus_checksum(texts, previous=None):
+    """Order-independent checksum of the training texts (sum of their content hashes mod 2**128).
+
+    Unlike ``corpus_fingerprint`` it counts duplicates, and it folds in a corpus chunk by chunk: pass the
+    checksum of the texts seen so far as ``previous``.
+    """
+    total = int(previous, 16) if previous else 0
+    for text in texts:
+        total += int.from_bytes(text_key(text), 'little')
+    return format(total % 2 ** 128, '032x')
+
+
+class TextCache:
+    """Text -> string results for one ``namespace``, valid for one rules ``version``.
+
+    The namespace's current version is kept in ``costs``. Opening it with a newer version purges the older
+    entries once; a process still on an older version (during a deploy) reads only entries of its own
+    version and writes nothing, so the two never wipe each other's entries.
+    """
+
+    def __init__(self, namespace, version, path=None):
+        self.namespace = namespace
+        self.version = version
+        self.path = config.TEXT_CACHE_PATH if path is None else path
+        self.hits = self.misses = 0
+        self.compute_seconds = 0.0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                                      namespace TEXT, key BLOB, version INTEGER, value TEXT,
+                                      PRIMARY KEY (namespace, key)) WITHOUT ROWID""")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS costs (
+                                      namespace TEXT PRIMARY KEY, version INTEGER, entries INTEGER, seconds REAL)""")
+            row = self._conn.execute("SELECT version FROM costs WHERE namespace = ?", (namespace,)).fetchone()
+            self.stale = row is not None and row[0] > version
+            if row is None or row[0] < version:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ? AND version < ?", (namespace, version))
+                self._conn.execute("INSERT OR REPLACE INTO costs VALUES (?, ?, 0, 0.0)", (namespace, version))
+
+    def get_many(self, keys):
+        """``{key: value}`` for the ``keys`` present in the cache."""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), _BATCH):
+                chunk = keys[start:start + _BATCH]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE namespace = ? AND version = ? AND key IN ({placeholders})",
+                    [self.namespace, self.version, *chunk]))
+        return found
+
+    def put_many(self, items, seconds=0.0):
+        """Store ``(key, value)`` pairs computed in ``seconds`` (used to estimate the time hits save)."""
+        if self.stale:
+            return
+        rows = [(self.namespace, key, self.version, value) for key, value in items]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("""INSERT INTO costs VALUES (?, ?, ?, ?) ON CONFLICT(namespace)
+                                  DO UPDATE SET entries = entries + excluded.entries, seconds = seconds + excluded.seconds""",
+                               (self.namespace, self.version, len(rows), seconds))
+
+    def seconds_per_entry(self):
+        """Average time it took to compute one entry, over everything cached so far."""
+        with self._lock:
+            row = self._conn.execute("SELECT entries, seconds FROM costs WHERE namespace = ?",
+                                     (self.namespace,)).fetchone()
+        return row[1] / row[0] if row and row[0] else 0.0
+
+    def stats(self, since=None):
+        """Lookup counters, or their change since an earlier ``stats()`` result ``since``."""
+        since = since or {}
+        hits = self.hits - since.get('hits', 0)
+        misses = self.misses - since.get('misses', 0)
+        lookups = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else 0.0,
+                'compute_seconds': self.compute_seconds - since.get('compute_seconds', 0.0),
+                'seconds_saved': hits * self.seconds_per_entry()}
+
+    def close(self):
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def shared_cache(namespace, version):
+    """Process-wide ``TextCache`` for ``namespace``: one connection and one version check per process."""
+    return TextCache(namespace, version)
+
+
+def cached_apply(texts, compute, cache):
+    """Apply the batch function ``compute`` to ``texts`` (a Series), computing only texts missing from ``cache``.
+
+    Returns a Series aligned with ``texts``. Each distinct text is computed at most once.
+    """
+    keys = texts.map(text_key)
+    unique = dict(zip(keys, texts))
+    found = cache.get_many(unique)
+    missing = [key for key in unique if key not in found]
+    cache.hits += len(unique) - len(missing)
+    cache.misses += len(missing)
+
+    if missing:
+        start = time.perf_counter()
+        values = compute([unique[key] for key in missing])
+        seconds = time.perf_counter() - start
+        cache.compute_seconds += seconds
+        computed = dict(zip(missing, values))
+        cache.put_many(computed.items(), seconds)
+        found.update(computed)
+    return pd.Series([found[key] for key in keys], index=texts.index, dtype=object)
@@ -0,0 +1,215 @@
+"""Daily per-category sentiment series with rolling, EWMA and composite indices.
+
+``SentimentSeries`` keeps the daily sentiment sums and article counts of every
+category in dense day x category arrays, along with their prefix sums. A
+rolling mean over any window is then two prefix-sum differences per day. An
+exponentially weighted mean is a first-order filter whose state is extended
+only over the days that changed. Means divide summed scores by summed counts,
+so every index is weighted by article volume, and a quiet day does not move a
+rolling mean the way a daily average of averages would. Range queries slice
+the arrays, so their cost depends on the range, not on the length of history.
+
+Ingestion appends recent days, so an update only recomputes prefix sums and
+filter state from the earliest day it touched: constant work per new day.
+Dashboard sessions read a series from several threads. Updates therefore go to
+a ``copy()`` that replaces the shared one, and the lazily extended prefix sums
+and filter state are guarded by a lock of their own.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class SentimentSeries:
+    """Day x category sentiment sums and article counts."""
+
+    def __init__(self, first_day, categories, sums, counts):
+        self.first_day = _day(first_day)
+        self.categories = list(categories)
+        self.days = len(sums)
+        capacity = max(self.days, 1)
+        self._sums = np.zeros((capacity, len(self.categories)))
+        self._counts = np.zeros((capacity, len(self.categories)))
+        self._sums[:self.days], self._counts[:self.days] = sums, counts
+        self._prefix_sums = np.zeros((capacity + 1, len(self.categories)))
+        self._prefix_counts = np.zeros((capacity + 1, len(self.categories)))
+        self._clean = 0  # prefix sums are valid up to this day
+        self._ewm = {}  # halflife -> [valid days, EW sums, EW counts]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Series of rollup cells (``date``, ``category``, ``total``, ``count``; other keys are summed out)."""
+        if cells.empty:
+            return cls(pd.Timestamp.today(), [], np.zeros((0, 0)), np.zeros((0, 0)))
+        daily = cells.groupby(['date', 'category'], observed=True)[['total', 'count']].sum()
+        dates = daily.index.get_level_values('date')
+        first, last = _day(dates.min()), _day(dates.max())
+        index = pd.MultiIndex.from_product([pd.date_range(pd.Timestamp(first), pd.Timestamp(last), freq='D'),
+                                            sorted(daily.index.get_level_values('category').unique())])
+        dense = daily.reindex(index, fill_value=0)
+        categories = list(index.levels[1])
+        shape = (len(index.levels[0]), len(categories))
+        return cls(first, categories, dense['total'].to_numpy().reshape(shape),
+                   dense['count'].to_numpy().reshape(shape))
+
+    def copy(self):
+        """Independent copy to ``add`` to while readers keep using this series."""
+        other = object.__new__(SentimentSeries)
+        other.__dict__.update(self.__dict__)
+        other.categories = list(self.categories)
+        for name in ('_sums', '_counts', '_prefix_sums', '_prefix_counts'):
+            setattr(other, name, getattr(self, name).copy())
+        # Extending EW state replaces its arrays rather than writing them, so only the lists are copied
+        other._ewm = {halflife: list(state) for halflife, state in self._ewm.items()}
+        other._lock = threading.Lock()
+        return other
+
+    @property
+    def last_day(self):
+        return self.first_day + np.timedelta64(self.days - 1, 'D')
+
+    def _grow(self, days, categories):
+        """Make room for ``days`` days and ``categories`` categories, doubling capacity as needed."""
+        capacity, width = self._sums.shape
+        if days <= capacity and categories <= width:
+            return
+        capacity = max(days, 2 * capacity) if days > capacity else capacity
+        for name in ('_sums', '_counts'):
+            grown = np.zeros((capacity, categories))
+            grown[:self.days, :width] = getattr(self, name)[:self.days]
+            setattr(self, name, grown)
+        for name in ('_prefix_sums', '_prefix_counts'):
+            grown = np.zeros((capacity + 1, categories))
+            grown[:self._clean + 1, :width] = getattr(self, name)[:self._clean + 1]
+            setattr(self, name, grown)
+        if categories > width:
+            self._ewm = {}
+
+    def add(self, cells):
+        """Fold rollup cells of new articles into the series."""
+        if cells.empty:
+            return
+        daily = cells.groupby(['date', 'category'], observed=True)[['total', 'count']].sum().reset_index()
+        daily['date'] = pd.to_datetime(daily['date'])
+        first = _day(daily['date'].min())
+        if self.days and first < self.first_day:
+            # Days before the start of history only come from backfills: rebuild
+            self.__dict__.update(SentimentSeries.from_cells(pd.concat([self.frame(), daily])).__dict__)
+            return
+        if not self.days:
+            self.first_day = first
+        new = sorted(set(daily['category']) - set(self.categories))
+        self.categories.extend(new)
+        positions = {category: i for i, category in enumerate(self.categories)}
+        rows = (daily['date'].to_numpy().astype('datetime64[D]') - self.first_day).astype(np.int64)
+        columns = daily['category'].map(positions).to_numpy()
+        self._grow(max(self.days, int(rows.max()) + 1), len(self.categories))
+        np.add.at(self._sums, (rows, columns), daily['total'].to_numpy(dtype=np.float64))
+        np.add.at(self._counts, (rows, columns), daily['count'].to_numpy(dtype=np.float64))
+        self.days = max(self.days, int(rows.max()) + 1)
+        touched = int(rows.min())
+        self._clean = min(self._clean, touched)
+        for state in self._ewm.values():
+            state[0] = min(state[0], touched)
+
+    def _prefix(self):
+        with self._lock:
+            if self._clean < self.days:
+                start = self._clean
+                self._prefix_sums[start + 1:self.days + 1] = self._prefix_sums[start] + np.cumsum(
+                    self._sums[start:self.days], axis=0)
+                self._prefix_counts[start + 1:self.days + 1] = self._prefix_counts[start] + np.cumsum(
+                    self._counts[start:self.days], axis=0)
+                self._clean = self.days
+        return self._prefix_sums, self._prefix_counts
+
+    def _span(self, start, end):
+        """Day positions ``[i, j)`` of ``start``..``end`` (inclusive dates, ``None`` = open), clipped to history."""
+        i = 0 if start is None else int((_day(start) - self.first_day).astype(np.int64))
+        j = self.days if end is None else int((_day(end) - self.first_day).astype(np.int64)) + 1
+        return max(i, 0), max(min(j, self.days), max(i, 0))
+
+    def _columns(self, categories):
+        if categories is None:
+            return slice(None), self.categories
+        positions = [self.categories.index(category) for category in categories if category in self.categories]
+        return positions, [self.categories[i] for i in positions]
+
+    def _frame(self, values, i, j, names):
+        dates = pd.date_range(pd.Timestamp(self.first_day + np.timedelta64(i, 'D')), periods=j - i, freq='D')
+        return pd.DataFrame(values, index=pd.Index(dates, name='date'), columns=pd.Index(names, name='category'))
+
+    def _window(self, window, i, j, columns):
+        prefix_sums, prefix_counts = self._prefix()
+        upper = np.arange(i, j) + 1
+        lower = np.maximum(upper - window, 0)
+        return ((prefix_sums[upper] - prefix_sums[lower])[:, columns],
+                (prefix_counts[upper] - prefix_counts[lower])[:, columns])
+
+    def rolling_mean(self, window=1, start=None, end=None, categories=None):
+        """Date x category frame: mean score of the articles of the ``window`` days ending on each date."""
+        i, j = self._span(start, end)
+        columns, names = self._columns(categories)
+        sums, counts = self._window(window, i, j, columns)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._frame(np.where(counts > 0, sums / counts, np.nan), i, j, names)
+
+    def volume(self, window=1, start=None, end=None, categories=None):
+        """Date x category frame: articles of the ``window`` days ending on each date."""
+        i, j = self._span(start, end)
+        columns, names = self._columns(categories)
+        return self._frame(self._window(window, i, j, columns)[1].astype(np.int64), i, j, names)
+
+    def composite(self, window=1, start=None, end=None, categories=None):
+        """Volume-weighted rolling index across ``categories`` (default all), as a date-indexed Series."""
+        i, j = self._span(start, end)
+        columns, _ = self._columns(categories)
+        sums, counts = self._window(window, i, j, columns)
+        sums, counts = sums.sum(axis=1), counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(counts > 0, sums / counts, np.nan)
+        return self._frame(values[:, None], i, j, ['composite'])['composite']
+
+    def ewma(self, halflife, start=None, end=None, categories=None):
+        """Date x category frame: exponentially weighted mean score (weights halve every ``halflife`` days)."""
+        with self._lock:
+            if halflife not in self._ewm:
+                self._ewm[halflife] = [0, np.zeros((0, len(self.categories))), np.zeros((0, len(self.categories)))]
+            state = self._ewm[halflife]
+            valid, ew_sums, ew_counts = state
+            if valid < self.days or ew_sums.shape != (self.days, len(self.categories)):
+                decay = 0.5 ** (1 / halflife)
+                extended = []
+                for current, values in ((ew_sums, self._sums), (ew_counts, self._counts)):
+                    out = np.zeros((self.days, len(self.categories)))
+                    out[:valid] = current[:valid]
+                    initial = current[valid - 1] if valid else np.zeros(len(self.categories))
+                    out[valid:], _ = lfilter([1.0], [1.0, -decay], values[valid:self.days], axis=0,
+                                             zi=decay * initial[None, :])
+                    extended.append(out)
+                state[:] = [self.days, *extended]
+                ew_sums, ew_counts = extended
+        i, j = self._span(start, end)
+        columns, names = self._columns(categories)
+        sums, counts = ew_sums[i:j][:, columns], ew_counts[i:j][:, columns]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._frame(np.where(counts > 0, sums / counts, np.nan), i, j, names)
+
+    def frame(self):
+        """Long ``date``, ``category``, ``total``, ``count`` frame of the non-empty days."""
+        sums = self._frame(self._sums[:self.days], 0, self.days, self.categories).stack()
+        counts = self._frame(self._counts[:self.days], 0, self.days, self.categories).stack()
+        frame = pd.DataFrame({'total': sums, 'count': counts.astype(np.int64)}).reset_index()
+        return frame[frame['count'] > 0].reset_index(drop=True)
+
+
+def long_format(wide, value_name='sentiment_score'):
+    """Date x category frame -> ``date``, ``category``, ``value_name`` rows for charts and exports."""
+    return wide.stack().rename(value_name).reset_index()
@@ -0,0 +1,180 @@
+"""Batched CPU inference for the transformer sentiment model.
+
+The dashboard used to build ``pipeline("sentiment-analysis")`` at module level,
+so every Streamlit rerun loaded the model again, and texts went through it
+untruncated in arrival order. ``SentimentEngine`` loads the model once per
+process on first use and tokenizes each text once, truncated to
+``TRANSFORMER_MAX_LENGTH``. It then sorts the texts by token count, so every
+batch is padded only to the longest text among similar lengths, and restores
+input order afterwards. Backends:
+
+* ``pytorch``: the published fine-tuned model (default)
+* ``int8``: linear layers dynamically quantized to int8 (opt-in)
+* ``onnx``: exported to ONNX Runtime with ``optimum`` (opt-in, ``pip install optimum[onnxruntime]``)
+
+Corpus scores are cached per model, revision and backend, so scoring the whole
+cleaned dataset only runs the model on articles it has not seen::
+
+    python -m senticonomy.transformer_sentiment --backend int8
+"""
+import argparse
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from senticonomy import config, storage
+from senticonomy.text_cache import cached_apply, shared_cache
+
+BACKENDS = ('pytorch', 'int8', 'onnx')
+# Bump when batching or post-processing changes; cached probabilities of older versions are dropped
+TRANSFORMER_VERSION = 1
+
+
+class SentimentEngine:
+    """Sequence-classification model loaded on first use, scoring texts in length-bucketed batches."""
+
+    def __init__(self, model=None, revision=None, backend=None, batch_size=None, max_length=None):
+        self.model_name = model or config.TRANSFORMER_MODEL
+        self.revision = revision or config.TRANSFORMER_REVISION
+        self.backend = backend or config.TRANSFORMER_BACKEND
+        self.batch_size = batch_size or config.TRANSFORMER_BATCH_SIZE
+        self.max_length = max_length or config.TRANSFORMER_MAX_LENGTH
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown transformer backend {self.backend!r}, expected one of {BACKENDS}")
+        self.load_seconds = 0.0
+        self._tokenizer = self._model = self._labels = self._cache = None
+        self._lock = threading.Lock()
+
+    @property
+    def namespace(self):
+        return f"transformer:{self.model_name}@{self.revision}:{self.backend}"
+
+    @property
+    def cache(self):
+        """Disk cache of probability vectors for this model, revision and backend."""
+        if self._cache is None:
+            self._cache = shared_cache(self.namespace, TRANSFORMER_VERSION)
+        return self._cache
+
+    @property
+    def labels(self):
+        """Class labels in logit order (read from the model config, without loading the weights)."""
+        if self._labels is None:
+            from transformers import AutoConfig
+            model_config = AutoConfig.from_pretrained(self.model_name, revision=self.revision)
+            self._labels = [model_config.id2label[i] for i in range(model_config.num_labels)]
+        return self._labels
+
+    def load(self):
+        """Load tokenizer and model for the configured backend (once)."""
+        with self._lock:
+            if self._model is not None:
+                return
+            start = time.perf_counter()
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name, revision=self.revision)
+            if self.backend == 'onnx':
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                model = ORTModelForSequenceClassification.from_pretrained(self.model_name, revision=self.revision,
+                                                                          export=True)
+            else:
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_name, revision=self.revision)
+                model.eval()
+                if self.backend == 'int8':
+                    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+            self._tokenizer, self._model = tokenizer, model
+            self.load_seconds = time.perf_counter() - start
+
+    def probabilities(self, texts):
+        """``(len(texts), len(labels))`` float32 softmax probabilities, in input order."""
+        self.load()
+        import torch
+
+        texts = [str(text) for text in texts]
+        probs = np.zeros((len(texts), len(self._labels)), dtype=np.float32)
+        if not texts:
+            return probs
+        encoded = self._tokenizer(texts, truncation=True, max_length=self.max_length)
+        order = np.argsort([len(ids) for ids in encoded['input_ids']], kind='stable')
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                rows = order[start:start + self.batch_size]
+                batch = self._tokenizer.pad({key: [encoded[key][i] for i in rows] for key in encoded},
+                                            return_tensors='pt')
+                logits = self._model(**batch).logits
+                probs[rows] = torch.softmax(logits.float(), dim=-1).numpy()
+        return probs
+
+    def predict(self, texts):
+        """``pipeline``-style ``[{'label': ..., 'score': ...}]``, one dict per text."""
+        probs = self.probabilities(texts)
+        best = probs.argmax(axis=1)
+        return [{'label': self._labels[i], 'score': float(row[i])} for row, i in zip(probs, best)]
+
+    def score_texts(self, texts):
+        """Frame aligned with ``texts`` (a Series): one probability column per label plus ``label`` and ``score``.
+
+        Only texts missing from the disk cache run through the model.
+        """
+        texts = texts.astype(str)
+        packed = cached_apply(texts, lambda batch: [row.tobytes() for row in self.probabilities(batch)], self.cache)
+        labels = self.labels
+        probs = np.frombuffer(b''.join(packed), dtype=np.float32).reshape(-1, len(labels))
+        frame = pd.DataFrame(probs, index=texts.index, columns=labels)
+        best = probs.argmax(axis=1)
+        frame['label'] = np.asarray(labels, dtype=object)[best]
+        frame['score'] = probs[np.arange(len(probs)), best]
+        return frame
+
+
+@lru_cache(maxsize=None)
+def sentiment_engine(backend=None):
+    """Process-wide engine for ``backend`` (default ``TRANSFORMER_BACKEND``); the model loads on first use."""
+    return SentimentEngine(backend=backend)
+
+
+def score_corpus(engine, dataset=storage.CLEANED_DATASET, batch_rows=None, progress=None):
+    """Score every description of ``dataset`` through ``engine``'s cache, streaming it in ``batch_rows`` chunks.
+
+    ``progress(rows_done)`` is called after each chunk. Returns a throughput report.
+    """
+    batch_rows = batch_rows or config.OUT_OF_CORE_CHUNK_SIZE
+    cache = engine.cache
+    hits, misses, compute = cache.hits, cache.misses, cache.compute_seconds
+    rows = 0
+    start = time.perf_counter()
+    for batch in storage.iter_batches(dataset, columns=['short_description'], batch_size=batch_rows,
+                                      use_threads=False):
+        descriptions = batch['short_description'].dropna()
+        engine.score_texts(descriptions)
+        rows += len(descriptions)
+        if progress is not None:
+            progress(rows)
+    scored = cache.misses - misses
+    compute = cache.compute_seconds - compute
+    return {'backend': engine.backend, 'rows': rows, 'cached': cache.hits - hits, 'scored': scored,
+            'seconds': time.perf_counter() - start, 'model_seconds': compute,
+            'texts_per_second': scored / compute if compute else 0.0, 'load_seconds': engine.load_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=BACKENDS, default=None)
+    parser.add_argument('--dataset', default=storage.CLEANED_DATASET)
+    args = parser.parse_args()
+
+    engine = sentiment_engine(args.backend)
+    report = score_corpus(engine, args.dataset, progress=lambda rows: print(f"{rows} rows", flush=True))
+    print(f"{report['backend']}: {report['rows']} rows, {report['cached']} cached, {report['scored']} scored "
+          f"at {report['texts_per_second']:.0f} texts/s (model load {report['load_seconds']:.1f}s, "
+          f"{report['seconds']:.1f}s total)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from senticonomy.bundle import SEGMENTS, BundleStore
+from senticonomy.rollups import CELL_KEYS, cells
+
+
+def model(version='1', parent=None):
+    return SimpleNamespace(version=version, metadata={'parent': parent}, reduced=False,
+                           kmeans=SimpleNamespace(cluster_centers_=np.zeros((3, 8))))
+
+
+def articles(start, count, first_day='2024-01-01'):
+    rng = np.random.default_rng(start)
+    ids = np.arange(start, start + count)
+    frame = pd.DataFrame({
+        'link': [f"https://example.com/{i}" for i in ids],
+        'headline': [f"Headline {i}" for i in ids],
+        'category': rng.choice(['TECH', 'SPORTS', 'POLITICS'], count),
+        'short_description': [f"Description {i}" for i in ids],
+        'authors': rng.choice(['A', 'B'], count),
+        'date': (pd.Timestamp(first_day) + pd.to_timedelta(ids % 5, unit='D')).strftime('%Y-%m-%d'),
+        'short_description_clean': [f"description {i}" for i in ids],
+        'cluster': rng.integers(0, 3, count),
+        'sentiment_score': rng.uniform(-1, 1, count).round(3),
+        'model': 'vader',
+    })
+    frame['category_cluster'] = frame['category'] + '-' + frame['cluster'].astype(str)
+    features = sp.random(count, 8, density=0.5, format='csr', random_state=start)
+    return frame, features
+
+
+def sorted_cells(frame):
+    return frame.sort_values(CELL_KEYS).reset_index(drop=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BundleStore(str(tmp_path))
+
+
+def test_publish_and_matches(store):
+    frame, features = articles(0, 20)
+
+    bundle = store.publish(frame, features, model('1'), 0.0)
+
+    assert store.load().version == bundle.version
+    assert bundle.matches('1', 0.0) and not bundle.matches('2', 0.0) and not bundle.matches('1', 0.05)
+    assert bundle.articles.frame()['link'].tolist() == frame['link'].tolist()
+    assert (bundle.features != features).nnz == 0
+
+
+def test_append_links_old_segments_and_keeps_rows_in_order(store):
+    parts = [articles(0, 40), articles(40, 10), articles(50, 10), articles(60, 5)]
+    store.publish(*parts[0], model('1'), 0.0)
+    first_inode = os.stat(store.load().segments[0].articles_path).st_ino
+
+    for version, part in enumerate(parts[1:], start=2):
+        bundle = store.append(*part, model(str(version), parent=str(version - 1)), 0.0)
+
+    frame = pd.concat([part[0] for part in parts], ignore_index=True)
+    assert bundle.matches('4', 0.0)
+    assert bundle.articles.frame()['link'].tolist() == frame['link'].tolist()
+    assert (bundle.features != sp.vstack([part[1] for part in parts])).nnz == 0
+    # 40 | 10 + 10 merged | 5: the first segment is never rewritten
+    assert [segment.info['rows'] for segment in bundle.segments] == [40, 20, 5]
+    assert os.stat(bundle.segments[0].articles_path).st_ino == first_inode
+    expected = cells(frame['date'], frame['category'], frame['cluster'], frame['sentiment_score'])
+    pd.testing.assert_frame_equal(sorted_cells(bundle.cells()), sorted_cells(expected), check_dtype=False)
+
+
+def test_append_drops_segments_older_than_start(store):
+    old, old_features = articles(0, 10, first_day='2023-01-01')
+    new, new_features = articles(10, 10, first_day='2024-01-01')
+    store.publish(old, old_features, model('1'), 0.0)
+
+    bundle = store.append(new, new_features, model('1'), 0.0, start='2023-06-01')
+
+    assert bundle.articles.frame()['link'].tolist() == new['link'].tolist()
+    assert not any(name.startswith('2023') for name in bundle.cells()['date'])
+    assert len(os.listdir(os.path.join(bundle.path, SEGMENTS))) == 1
+
+
+def test_append_refuses_another_lineage_or_threshold(store):
+    store.publish(*articles(0, 10), model('1'), 0.0)
+
+    assert store.append(*articles(10, 5), model('3', parent='2'), 0.0) is None
+    assert store.append(*articles(10, 5), model('1'), 0.05) is None
+    assert store.load().manifest['rows'] == 10
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from senticonomy import config, storage
+from senticonomy.link_index import LinkIndex, append_new_articles
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DATA_DIR', str(tmp_path))
+    index = LinkIndex(str(tmp_path / 'links.sqlite'))
+    yield index
+    index.close()
+
+
+def batch(links, descriptions=None, category='tech', dates=None):
+    return pd.DataFrame({
+        'link': links,
+        'headline': [f"Headline {link}" for link in links],
+        'category': category,
+        'short_description': descriptions or [f"Description {link}" for link in links],
+        'authors': 'A',
+        'date': dates or ['2024-01-01T00:00:00Z'] * len(links),
+    })
+
+
+def test_append_keeps_only_links_not_stored_yet(index):
+    first = append_new_articles(batch(['a', 'b']), index)
+    second = append_new_articles(batch(['b', 'c'], descriptions=['changed', 'new']), index)
+
+    assert first['link'].tolist() == ['a', 'b']
+    assert second['link'].tolist() == ['c']
+    stored = storage.read_dataset(storage.MASTER_DATASET)
+    assert sorted(stored['link']) == ['a', 'b', 'c']
+    assert stored.set_index('link').loc['b', 'short_description'] == 'Description b'
+    assert len(index) == 3 and 'c' in index and 'd' not in index
+
+
+def test_duplicates_inside_a_batch_keep_the_last_row(index):
+    delta = append_new_articles(batch(['a', 'a', None], descriptions=['old', 'new', 'no link']), index)
+
+    assert delta['short_description'].tolist() == ['new']
+    assert delta['category'].tolist() == ['TECH']
+
+
+def test_watermarks_only_move_forward(index):
+    append_new_articles(batch(['a'], dates=['2024-03-01T10:00:00Z']), index)
+    append_new_articles(batch(['b'], dates=['2024-02-01T10:00:00Z']), index)
+    append_new_articles(batch(['c'], category='sports', dates=['2024-01-01T10:00:00Z']), index)
+
+    assert index.latest_published() == {'TECH': '2024-03-01T10:00:00Z', 'SPORTS': '2024-01-01T10:00:00Z'}
+
+
+def test_bootstrap_indexes_an_existing_master_dataset(index):
+    storage.write_dataset(batch(['a', 'b']), storage.MASTER_DATASET)
+
+    index.bootstrap()
+
+    assert index.contains_many(['a', 'b', 'c']) == [True, True, False]
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from senticonomy.near_duplicates import NearDuplicateIndex, drop_near_duplicates
+
+WORDS = [f"w{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(200)]
+
+
+def text(start, stop):
+    return ' '.join(WORDS[start:stop])
+
+
+def frame(texts):
+    return pd.DataFrame({'link': [f"https://example.com/{i}" for i in range(len(texts))], 'headline': '',
+                         'short_description': texts})
+
+
+def test_near_duplicates_above_the_threshold_are_dropped():
+    kept, report = drop_near_duplicates(frame([text(0, 40), text(2, 42), text(100, 140)]),
+                                        threshold=0.6, num_perm=128)
+
+    assert kept['short_description'].tolist() == [text(0, 40), text(100, 140)]
+    assert report.as_dict() == {'rows': 3, 'collapsed': 1, 'within_batch': 1, 'of_stored': 0, 'kept': 2}
+
+
+def test_threshold_zero_keeps_every_row():
+    rows = frame([text(0, 40), text(0, 40)])
+
+    kept, report = drop_near_duplicates(rows, threshold=0.0)
+
+    assert len(kept) == 2 and report.collapsed == 0
+
+
+def test_a_chain_of_edits_does_not_collapse_dissimilar_articles():
+    # 0-40 ~ 6-46 ~ 12-52, but 0-40 and 12-52 are below the threshold: the dropped middle
+    # row is no representative, so the last row is compared with the first and kept
+    kept, report = drop_near_duplicates(frame([text(0, 40), text(6, 46), text(12, 52)]),
+                                        threshold=0.6, num_perm=128)
+
+    assert kept['short_description'].tolist() == [text(0, 40), text(12, 52)]
+    assert report.within_batch == 1
+
+
+def test_rows_similar_to_stored_articles_are_dropped(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / 'near.sqlite'), threshold=0.6, num_perm=128)
+    drop_near_duplicates(frame([text(0, 40)]), index)
+
+    kept, report = drop_near_duplicates(frame([text(1, 41), text(100, 140)]), index)
+
+    assert kept['short_description'].tolist() == [text(100, 140)]
+    assert report.of_stored == 1 and report.within_batch == 0
+    index.close()
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.9])
+def test_changing_parameters_starts_the_index_over(tmp_path, threshold):
+    path = str(tmp_path / 'near.sqlite')
+    first = NearDuplicateIndex(path, threshold=0.6, num_perm=128)
+    drop_near_duplicates(frame([text(0, 40)]), first)
+    first.close()
+
+    index = NearDuplicateIndex(path, threshold=threshold, num_perm=64)
+
+    assert index.is_empty()
+    index.close()
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from senticonomy import preprocessing
+
+try:
+    preprocessing.nltk_resources()
+except LookupError:
+    pytest.skip('NLTK stopwords/wordnet data not installed', allow_module_level=True)
+
+TEXTS = [
+    'Stocks RALLY as investors cheer <b>earnings</b>: https://example.com/a?b=1 and www.example.org',
+    "It's 2024 -- the committees were meeting, again!!",
+    '   Tabs\tand\nnewlines   between   words   ',
+    'Unicode: Café naïve İstanbul ΣΊΣΥΦΟΣ',
+    '<a href="http://x.y/z">link</a> text',
+    '',
+    '12345 %%% ...',
+]
+
+
+def test_normalize_series_matches_preprocess_text():
+    texts = pd.Series(TEXTS + [None, 3.5], index=range(10, 10 + len(TEXTS) + 2))
+
+    normalized = preprocessing.normalize_series(texts)
+
+    assert normalized.index.tolist() == texts.index.tolist()
+    assert normalized.tolist() == [preprocessing.preprocess_text(str(text)) for text in texts]
+
+
+def test_small_lemma_table_gives_the_same_output():
+    texts = pd.Series(TEXTS * 3)
+
+    assert preprocessing.normalize_series(texts, lemma_cache_size=2).tolist() == \
+        preprocessing.normalize_series(texts).tolist()
+
+
+def test_normalize_chunks_yields_one_chunk_per_input():
+    chunks = [pd.Series(TEXTS[:3]), pd.Series(TEXTS[3:])]
+
+    results = list(preprocessing.normalize_chunks(iter(chunks)))
+
+    assert [len(result) for result in results] == [3, len(TEXTS) - 3]
+    assert preprocessing.preprocess_batch(TEXTS) == [text for result in results for text in result]
@@ -0,0 +1,72 @@
+import pytest
+
+from senticonomy.rollups import CELL_KEYS, SentimentRollups, cells, combine_cells
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SentimentRollups(str(tmp_path / 'rollups.sqlite'))
+    yield store
+    store.close()
+
+
+def articles(dates, scores, category='TECH', cluster=0):
+    return dates, [category] * len(dates), [cluster] * len(dates), scores
+
+
+def test_add_merges_into_existing_cells(store):
+    store.rebuild(*articles(['2024-01-01', '2024-01-02'], [0.5, -0.5]), model_version='1', threshold=0.0)
+
+    assert store.add(*articles(['2024-01-01'], [0.1]), model_version='1', threshold=0.0)
+
+    rollup = store.rollup(['date']).set_index('date')
+    assert rollup.loc['2024-01-01', 'count'] == 2
+    assert rollup.loc['2024-01-01', 'sentiment_score'] == pytest.approx(0.3)
+    assert rollup.loc['2024-01-01', 'positive'] == 2
+    assert rollup.loc['2024-01-02', 'negative'] == 1
+
+
+def test_add_accepts_a_streaming_child_of_the_stored_model(store):
+    store.rebuild(*articles(['2024-01-01'], [0.5]), model_version='1', threshold=0.0)
+
+    assert store.add(*articles(['2024-01-01'], [0.5]), model_version='2', threshold=0.0, parent='1')
+    assert store.is_current('2', 0.0)
+
+
+@pytest.mark.parametrize('model_version, threshold', [('3', 0.0), ('1', 0.05)])
+def test_add_for_another_model_or_threshold_marks_the_store_stale(store, model_version, threshold):
+    store.rebuild(*articles(['2024-01-01'], [0.5]), model_version='1', threshold=0.0)
+
+    assert not store.add(*articles(['2024-01-01'], [0.5]), model_version=model_version, threshold=threshold)
+    assert not store.is_current('1', 0.0)
+    assert store.frame()['count'].sum() == 1
+
+
+def test_replace_drops_every_previous_cell(store):
+    store.rebuild(*articles(['2024-01-01'], [0.5]), model_version='1', threshold=0.0)
+
+    store.replace(cells(*articles(['2024-02-01'], [-0.2], category='SPORTS')), model_version='2', threshold=0.0)
+
+    frame = store.frame()
+    assert frame['category'].tolist() == ['SPORTS'] and frame['count'].tolist() == [1]
+    assert store.is_current('2', 0.0)
+
+
+def test_series_follows_adds(store):
+    store.rebuild(*articles(['2024-01-01'], [0.5]), model_version='1', threshold=0.0)
+    before = store.series()
+
+    store.add(*articles(['2024-01-01'], [-0.5]), model_version='1', threshold=0.0)
+
+    assert store.series() is not before
+    assert store.rollup(['category'])['sentiment_score'].tolist() == [0.0]
+
+
+def test_combine_cells_subtracts_removed_articles_and_drops_empty_cells():
+    old = cells(*articles(['2024-01-01', '2024-01-02'], [0.5, 0.2]))
+    new = cells(*articles(['2024-01-02'], [0.4]))
+
+    combined = combine_cells([old, new], [cells(*articles(['2024-01-01'], [0.5]))])
+
+    assert combined[CELL_KEYS + ['count']].values.tolist() == [['2024-01-02', 'TECH', 0, 2]]
+    assert combined['total'].tolist() == [pytest.approx(0.6)]
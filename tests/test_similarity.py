@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from senticonomy.similarity import (ARTICLES_FILE, MATRIX_FILE, SimilarityIndex, extend_index, index_segments,
+                                    write_index)
+
+
+def articles(start, count):
+    return pd.DataFrame({'link': [f"https://example.com/{i}" for i in range(start, start + count)],
+                         'headline': [f"Headline {i}" for i in range(start, start + count)]})
+
+
+def rows(count, seed, sparse):
+    X = normalize(sp.random(count, 20, density=0.3, format='csr', random_state=seed))
+    return X if sparse else X.toarray()
+
+
+def versions(root, sizes, sparse):
+    """Version directories holding an index written with ``sizes[0]`` rows and extended by the other sizes."""
+    parts, paths, start = [], [], 0
+    for number, size in enumerate(sizes):
+        parts.append((rows(size, number, sparse), articles(start, size)))
+        paths.append(os.path.join(root, str(number)))
+        os.makedirs(paths[-1])
+        if number == 0:
+            write_index(paths[-1], *parts[-1])
+        else:
+            extend_index(paths[-1], paths[-2], *parts[-1])
+        start += size
+    return paths, parts
+
+
+@pytest.mark.parametrize('sparse', [True, False])
+def test_extended_index_finds_the_same_rows_as_one_written_at_once(tmp_path, sparse):
+    paths, parts = versions(str(tmp_path / 'extended'), [30, 10, 5, 5], sparse)
+    whole = str(tmp_path / 'whole')
+    os.makedirs(whole)
+    X = sp.vstack([X for X, _ in parts]) if sparse else np.vstack([X for X, _ in parts])
+    write_index(whole, X, pd.concat([frame for _, frame in parts], ignore_index=True))
+
+    extended, written = SimilarityIndex(paths[-1]), SimilarityIndex(whole)
+    for query in range(0, 50, 7):
+        found, scores = extended.search(X[query], n=5)
+        expected, expected_scores = written.search(X[query], n=5)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+        assert found[0] == query
+    assert extended.similar(X[42], n=1)['link'].tolist() == ['https://example.com/42']
+
+
+def test_extend_links_the_parent_segments_and_merges_small_ones(tmp_path):
+    paths, _ = versions(str(tmp_path), [30, 10, 10, 5], sparse=True)
+
+    # 30 | 10 + 10 merged | 5: the first segment is never rewritten
+    assert [size for _, size in index_segments(paths[-1])] == [30, 20, 5]
+    first, last = index_segments(paths[0])[0][0], index_segments(paths[-1])[0][0]
+    assert os.stat(os.path.join(first, MATRIX_FILE)).st_ino == os.stat(os.path.join(last, MATRIX_FILE)).st_ino
+    assert [size for _, size in index_segments(paths[1])] == [30, 10]
+
+
+def test_single_file_index_of_older_versions_is_read_and_extended(tmp_path):
+    legacy, extended = str(tmp_path / 'legacy'), str(tmp_path / 'extended')
+    os.makedirs(legacy)
+    os.makedirs(extended)
+    write_index(legacy, rows(10, 0, sparse=True), articles(0, 10))
+    segment = index_segments(legacy)[0][0]
+    for name in os.listdir(segment):
+        os.replace(os.path.join(segment, name), os.path.join(legacy, name))
+    os.remove(os.path.join(legacy, 'similarity', 'segments.json'))
+
+    assert index_segments(legacy) == [(legacy, 10)]
+    extend_index(extended, legacy, rows(10, 1, sparse=True), articles(10, 10))
+
+    assert SimilarityIndex(extended).articles.num_rows == 20
+    assert os.path.exists(os.path.join(legacy, ARTICLES_FILE))
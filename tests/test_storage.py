@@ -0,0 +1,128 @@
+import pandas as pd
+import pytest
+
+from senticonomy import config, storage
+
+
+@pytest.fixture
+def cleaned(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DATA_DIR', str(tmp_path))
+    frame = pd.DataFrame({
+        'link': [f"https://example.com/{i}" for i in range(5)],
+        'headline': [f"Headline {i}" for i in range(5)],
+        'category': ['TECH', 'TECH', 'SPORTS', 'TECH', 'SPORTS'],
+        'short_description': [f"Description {i}" for i in range(5)],
+        'authors': ['A', 'B', 'C', 'D', 'E'],
+        'date': ['2024-01-05', '2024-03-02', 'not a date', '2024-02-10', '2024-01-20'],
+    })
+    storage.write_dataset(frame, storage.CLEANED_DATASET)
+    return frame
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_read_page_by_date_puts_null_dates_last(cleaned, descending):
+    page = storage.read_page(storage.CLEANED_DATASET, limit=10, sort_by='date', descending=descending)
+
+    assert len(page) == len(cleaned)
+    assert page['date'].iloc[-1] is pd.NaT
+    dates = page['date'].iloc[:-1]
+    assert dates.is_monotonic_decreasing if descending else dates.is_monotonic_increasing
+
+
+def test_read_page_by_date_pages_past_null_month(cleaned):
+    first = storage.read_page(storage.CLEANED_DATASET, offset=0, limit=3, sort_by='date')
+    rest = storage.read_page(storage.CLEANED_DATASET, offset=3, limit=3, sort_by='date')
+
+    assert first['link'].tolist() + rest['link'].tolist() == [cleaned['link'][i] for i in (0, 4, 3, 1, 2)]
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls storage makes."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {'Contents': [{'Key': key} for key in sorted(self.objects) if key.startswith(Prefix)]}
+
+    def upload_file(self, local, bucket, key):
+        with open(local, 'rb') as f:
+            self.objects[key] = f.read()
+
+    def download_file(self, bucket, key, local):
+        with open(local, 'wb') as f:
+            f.write(self.objects[key])
+
+    def delete_object(self, Bucket, Key):
+        del self.objects[Key]
+
+
+def links(name=storage.CLEANED_DATASET):
+    return sorted(storage.read_dataset(name, columns=['link'])['link'])
+
+
+def host(monkeypatch, path):
+    monkeypatch.setattr(config, 'DATA_DIR', str(path))
+
+
+def test_download_keeps_local_files_not_uploaded(cleaned, tmp_path, monkeypatch):
+    s3 = FakeS3()
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    unuploaded = cleaned.assign(link=cleaned['link'] + '/new')
+    storage.write_dataset(unuploaded, storage.CLEANED_DATASET)
+
+    storage.download_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+
+    assert links() == sorted(cleaned['link'].tolist() + unuploaded['link'].tolist())
+
+
+def test_upload_keeps_remote_files_of_other_hosts(cleaned, tmp_path, monkeypatch):
+    s3 = FakeS3()
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    uploaded = dict(s3.objects)
+    host(monkeypatch, tmp_path / 'other')
+    storage.write_dataset(cleaned.assign(link=cleaned['link'] + '/other'), storage.CLEANED_DATASET)
+
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+
+    assert set(uploaded) < set(s3.objects)
+
+
+def test_compaction_replaces_only_its_files_everywhere(cleaned, tmp_path, monkeypatch):
+    s3 = FakeS3()
+    storage.write_dataset(cleaned.assign(link=cleaned['link'] + '/2'), storage.CLEANED_DATASET)
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    expected = links()
+    host(monkeypatch, tmp_path / 'other')
+    storage.download_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    late = cleaned.assign(link=cleaned['link'] + '/late')
+    storage.write_dataset(late, storage.CLEANED_DATASET)
+
+    host(monkeypatch, tmp_path)
+    storage.compact(storage.CLEANED_DATASET)
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    host(monkeypatch, tmp_path / 'other')
+    storage.download_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    storage.upload_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+
+    assert links() == sorted(expected + late['link'].tolist())
+    host(monkeypatch, tmp_path / 'fresh')
+    storage.download_dataset(s3, 'bucket', storage.CLEANED_DATASET)
+    assert links() == sorted(expected + late['link'].tolist())
+    data_keys = [key for key in s3.objects if f"/{storage.REPLACED_DIR}/" not in key]
+    assert len(data_keys) < len(s3.objects)
+    assert len(data_keys) == len(list(storage.data_files(storage.CLEANED_DATASET)))
+
+
+def test_signature_changes_when_rows_are_appended_or_compacted(cleaned):
+    before = storage.signature(storage.CLEANED_DATASET)
+    assert storage.signature(storage.CLEANED_DATASET) == before
+
+    storage.write_dataset(cleaned.assign(link=cleaned['link'] + '/new'), storage.CLEANED_DATASET)
+    appended = storage.signature(storage.CLEANED_DATASET)
+    storage.compact(storage.CLEANED_DATASET)
+
+    assert len({before, appended, storage.signature(storage.CLEANED_DATASET)}) == 3
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from senticonomy.text_cache import TextCache, cached_apply, text_key
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache.sqlite')
+
+
+def upper(texts):
+    return [text.upper() for text in texts]
+
+
+def test_cached_apply_computes_each_distinct_text_once(path):
+    cache = TextCache('test', 1, path=path)
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return upper(texts)
+
+    first = cached_apply(pd.Series(['a', 'b', 'a']), compute, cache)
+    second = cached_apply(pd.Series(['b', 'c'], index=[7, 8]), compute, cache)
+
+    assert first.tolist() == ['A', 'B', 'A']
+    assert second.to_dict() == {7: 'B', 8: 'C'}
+    assert calls == [['a', 'b'], ['c']]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 3
+    assert cache.stats(since={'hits': 1, 'misses': 2, 'compute_seconds': 0.0})['misses'] == 1
+
+
+def test_entries_survive_reopening_with_the_same_version(path):
+    cached_apply(pd.Series(['a']), upper, TextCache('test', 1, path=path))
+
+    assert TextCache('test', 1, path=path).get_many([text_key('a')]) == {text_key('a'): 'A'}
+
+
+def test_newer_version_purges_older_entries_of_its_namespace_only(path):
+    cached_apply(pd.Series(['a']), upper, TextCache('test', 1, path=path))
+    cached_apply(pd.Series(['a']), upper, TextCache('other', 1, path=path))
+
+    assert TextCache('test', 2, path=path).get_many([text_key('a')]) == {}
+    assert TextCache('test', 1, path=path).get_many([text_key('a')]) == {}
+    assert TextCache('other', 1, path=path).get_many([text_key('a')]) == {text_key('a'): 'A'}
+
+
+def test_older_version_neither_purges_nor_overwrites_newer_entries(path):
+    newer = TextCache('test', 2, path=path)
+    cached_apply(pd.Series(['a']), upper, newer)
+
+    older = TextCache('test', 1, path=path)
+    assert older.stale
+    assert cached_apply(pd.Series(['a']), list, older).tolist() == ['a']
+
+    assert TextCache('test', 2, path=path).get_many([text_key('a')]) == {text_key('a'): 'A'}